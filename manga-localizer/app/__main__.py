@@ -1,4 +1,16 @@
-from app.main import main
+import multiprocessing
+import sys
 
 if __name__ == "__main__":
+    # Needed for process pools in the frozen (PyInstaller) build. The import stays
+    # under the guard so spawned workers don't pull in Qt.
+    multiprocessing.freeze_support()
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        # Headless path: never imports Qt.
+        from app.cli import main as batch_main
+
+        raise SystemExit(batch_main(sys.argv[2:]))
+
+    from app.main import main
+
     raise SystemExit(main())
@@ -0,0 +1,235 @@
+"""
+Headless batch runner: `python -m app batch FOLDER [FOLDER ...]`.
+
+Built only on app.core (no Qt anywhere in this import path), so it works on
+servers without a display and starts in a fraction of the GUI's time.
+"""
+from __future__ import annotations
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(
+        prog="python -m app batch",
+        description="Translate one or more manga folders (or CBZ / ZIP archives) without the GUI. "
+        "Settings come from the GUI's saved settings unless overridden here.",
+    )
+    ap.add_argument("inputs", nargs="+", type=Path, help="input folders or .cbz / .zip archives (one chapter each)")
+    ap.add_argument("-o", "--output-root", type=Path, help="outputs go to OUTPUT_ROOT/<folder name>")
+    ap.add_argument("--json", action="store_true", help="JSON-lines progress events on stdout (logs go to stderr)")
+    ap.add_argument("-q", "--quiet", action="store_true", help="don't echo engine log lines")
+
+    eng = ap.add_argument_group("engine overrides")
+    eng.add_argument("--engine-dir")
+    eng.add_argument("--python", dest="python_exe", help="python executable with manga-image-translator")
+    eng.add_argument("--config-file")
+    eng.add_argument("--font-path")
+    eng.add_argument("--target-lang")
+    eng.add_argument("--detector")
+    eng.add_argument("--ocr")
+    eng.add_argument("--inpainter")
+    eng.add_argument("--gpu", dest="use_gpu", action=argparse.BooleanOptionalAction, default=None)
+    eng.add_argument("--incremental", action=argparse.BooleanOptionalAction, default=None)
+    eng.add_argument("--persistent", dest="persistent_engine", action=argparse.BooleanOptionalAction, default=None,
+                     help="keep one warm engine across all folders")
+    eng.add_argument("--stage-cache", action=argparse.BooleanOptionalAction, default=None,
+                     help="reuse cached OCR/translation/inpainting results (persistent engine only)")
+    eng.add_argument("--normalize", dest="normalize_inputs", action=argparse.BooleanOptionalAction, default=None,
+                     help="convert pages (RGB, size cap, no metadata) into a cache before the engine reads them")
+    eng.add_argument("--shards", type=int, help="parallel engine processes (0 = auto)")
+    eng.add_argument("--threads-per-shard", type=int)
+    eng.add_argument("--pin-shards", action=argparse.BooleanOptionalAction, default=None)
+    eng.add_argument("--backend", dest="engine_backend", choices=["mit", "stub"])
+    eng.add_argument("--set", dest="extra", action="append", default=[], metavar="FIELD=VALUE",
+                     help="any other EngineConfig field (repeatable)")
+
+    pkg = ap.add_argument_group("packaging")
+    pkg.add_argument("--package", dest="package_enabled", action=argparse.BooleanOptionalAction, default=None,
+                     help="pack each folder's outputs into OUTPUT_ROOT/<folder name>.cbz")
+    pkg.add_argument("--package-format", choices=["webp", "jpeg", "png", "keep"])
+    pkg.add_argument("--package-quality", type=int)
+    pkg.add_argument("--archive", dest="package_archive", choices=["cbz", "zip"])
+    return ap
+
+
+def _coerce(value: str) -> Any:
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def engine_config(ns: argparse.Namespace, base):
+    """The saved EngineConfig with command-line overrides applied (validated by pydantic)."""
+    from app.core.config import EngineConfig
+
+    data: Dict[str, Any] = base.model_dump()
+    for name in ("engine_dir", "python_exe", "config_file", "font_path", "target_lang", "detector", "ocr",
+                 "inpainter", "use_gpu", "incremental", "persistent_engine", "stage_cache", "normalize_inputs",
+                 "shards", "threads_per_shard", "pin_shards", "engine_backend"):
+        value = getattr(ns, name)
+        if value is not None:
+            data[name] = value
+    for item in ns.extra:
+        key, sep, value = item.partition("=")
+        if not sep or key not in EngineConfig.model_fields:
+            raise SystemExit(f"--set expects FIELD=VALUE with an EngineConfig field, got {item!r}")
+        data[key] = _coerce(value)
+    return EngineConfig.model_validate(data)
+
+
+def _round(v: Optional[float]) -> Optional[float]:
+    return None if v is None else round(v, 1)
+
+
+def output_root(ns: argparse.Namespace, cfg) -> Path:
+    root = ns.output_root or Path(cfg.output_root or "output").expanduser()
+    if not root.is_absolute():
+        root = REPO_ROOT / root if ns.output_root is None else Path.cwd() / root
+    return root.resolve()
+
+
+class Reporter:
+    """Progress on stdout: JSON lines with --json, short human lines otherwise."""
+
+    def __init__(self, as_json: bool, quiet: bool, out: TextIO = sys.stdout, err: TextIO = sys.stderr):
+        self.as_json = as_json
+        self.quiet = quiet
+        self.out = out
+        self.err = err
+
+    def event(self, kind: str, **fields: Any) -> None:
+        if self.as_json:
+            self.out.write(json.dumps({"event": kind, "time": round(time.time(), 3), **fields}, ensure_ascii=False) + "\n")
+            self.out.flush()
+            return
+        detail = " ".join(f"{k}={v}" for k, v in fields.items() if k not in ("folder",))
+        self.out.write(f"[{kind}] {detail}\n")
+        self.out.flush()
+
+    def log(self, line: str) -> None:
+        if not self.quiet:
+            (self.err if self.as_json else self.out).write(line + "\n")
+
+
+def package_config(ns: argparse.Namespace, base):
+    """The saved PackageConfig with command-line overrides applied."""
+    data: Dict[str, Any] = base.model_dump()
+    for name in ("enabled", "format", "quality", "archive"):
+        value = getattr(ns, f"package_{name}")
+        if value is not None:
+            data[name] = value
+    return type(base).model_validate(data)
+
+
+def run_folder(cfg, folder: Path, out_root: Path, rep: Reporter, clients, package=None) -> int:
+    from app.core.archive import source_name
+    from app.core.log_pipeline import RotatingLogFile
+    from app.core.mit_runner import execute_plan, prepare_run
+    from app.core.progress import EtaEstimator, PageFailed, PageFinished, PageStarted, ProgressParser, StageChanged
+
+    out_dir = out_root / source_name(folder)
+    try:
+        plan = prepare_run(cfg, folder, out_dir, rep.log)
+    except OSError as e:
+        rep.event("folder_failed", folder=str(folder), error=str(e))
+        return 1
+    rep.event("plan", folder=str(folder), output=str(out_dir), todo=len(plan.pages),
+              skipped=plan.skipped, removed=len(plan.removed), resumed=plan.resumed, discarded=len(plan.discarded))
+    if not plan.pages:
+        if package is not None and package.enabled:
+            execute_plan(cfg, plan, rep.log, package=package)  # repacks if the archive is out of date
+        plan.finish()
+        rep.event("folder_done", folder=str(folder), code=0, done=0, failed=0, seconds=0.0)
+        return 0
+
+    eta = EtaEstimator(len(plan.pages))
+    parser = ProgressParser()
+    log_file = RotatingLogFile(out_dir / ".logs" / "run.log")
+    t0 = time.monotonic()
+
+    def emit(ev) -> None:
+        fields = {"folder": str(folder), **{k: round(v, 3) if isinstance(v, float) else v for k, v in asdict(ev).items()}}
+        if isinstance(ev, PageStarted):
+            rep.event("page_started", **fields)
+        elif isinstance(ev, StageChanged):
+            rep.event("stage", **fields)
+        elif isinstance(ev, (PageFinished, PageFailed)):
+            eta.page_done(failed=isinstance(ev, PageFailed))
+            rep.event("page_done" if isinstance(ev, PageFinished) else "page_failed",
+                      **fields, done=eta.done, total=eta.total, eta_seconds=_round(eta.eta_seconds()))
+
+    def on_log(line: str) -> None:
+        log_file.write_lines([line])
+        rep.log(line)
+        for ev in parser.feed(line):
+            emit(ev)
+
+    code = 1
+    try:
+        code = execute_plan(cfg, plan, on_log, clients=clients, package=package)
+    except Exception as e:
+        on_log(f"Engine run failed: {e}")
+    finally:
+        for ev in parser.close(code):
+            emit(ev)
+        recorded = plan.finish()
+        log_file.close()
+    rep.event("folder_done", folder=str(folder), code=code, done=eta.done, failed=eta.failed,
+              recorded=recorded, seconds=round(time.monotonic() - t0, 2))
+    return code
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ns = build_parser().parse_args(argv)
+
+    from app.core.settings_store import load_settings
+
+    app_cfg = load_settings()
+    cfg = engine_config(ns, app_cfg.engine)
+    package = package_config(ns, app_cfg.package)
+    out_root = output_root(ns, app_cfg)
+    rep = Reporter(ns.json, ns.quiet)
+
+    from app.core.archive import is_archive
+
+    folders = [p.expanduser().resolve() for p in ns.inputs]
+    missing = [str(p) for p in folders if not (p.is_dir() or is_archive(p))]
+    if missing:
+        rep.event("error", error="not a folder or archive: " + ", ".join(missing))
+        return 2
+
+    clients = None
+    if cfg.persistent_engine:
+        from app.core.engine_client import EngineClient
+        from app.core.mit_runner import make_engine_clients
+
+        if EngineClient.available():
+            clients = make_engine_clients(cfg)  # warm across folders
+
+    t0 = time.monotonic()
+    codes: List[int] = []
+    try:
+        for folder in folders:
+            codes.append(run_folder(cfg, folder, out_root, rep, clients, package))
+    except KeyboardInterrupt:
+        rep.event("interrupted")
+        codes.append(130)
+    finally:
+        for c in clients or []:
+            c.shutdown()
+    failed = sum(1 for c in codes if c != 0)
+    rep.event("summary", folders=len(folders), failed=failed, seconds=round(time.monotonic() - t0, 2))
+    return next((c for c in codes if c != 0), 0)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
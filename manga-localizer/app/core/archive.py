@@ -0,0 +1,195 @@
+from __future__ import annotations
+import io
+import mmap
+import os
+import shutil
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from app.core.pages import IMAGE_EXTS, natural_key
+
+# CBZ / ZIP chapters are read in place. A page inside an archive is addressed
+# as `<archive>/<name>`, so it has the same file name (and output name) it
+# would have had in an extracted folder; `open_page` / `stat_page` accept both
+# kinds of path. Entries in subfolders are flattened into unique names.
+
+ARCHIVE_EXTS = {".cbz", ".zip"}
+_MAX_OPEN = 8
+
+
+@dataclass(frozen=True)
+class PageStat:
+    st_size: int
+    st_mtime_ns: int  # zip timestamps have 2 s resolution and are often fixed by the packer,
+    crc: int = -1     # so the entry's CRC-32 is what tells an edited page apart
+
+
+class _Mapped(mmap.mmap):
+    # zipfile wants a seekable() file object; mmap has every other method it uses.
+    def seekable(self) -> bool:
+        return True
+
+
+class ComicArchive:
+    """
+    An open CBZ / ZIP: the image entries from its central directory (nothing is
+    decompressed to list them), read through one shared memory map.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        st = os.stat(self.path)
+        self.key = (st.st_size, st.st_mtime_ns)
+        self.users = 0        # open_archive() blocks currently using it
+        self.retired = False  # dropped from the cache; closed once unused
+        self._file = open(self.path, "rb")
+        try:
+            self._map = _Mapped(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._zip = zipfile.ZipFile(self._map)
+        except (ValueError, zipfile.BadZipFile) as e:  # empty file, not a zip
+            self._file.close()
+            raise OSError(f"{self.path.name}: not a readable archive ({e})") from None
+        except Exception:
+            self._file.close()
+            raise
+        self.entries: Dict[str, zipfile.ZipInfo] = OrderedDict()
+        infos = [i for i in self._zip.infolist()
+                 if not i.is_dir() and os.path.splitext(i.filename)[1].lower() in IMAGE_EXTS
+                 and not i.filename.startswith("__MACOSX/") and not i.filename.rsplit("/", 1)[-1].startswith(".")]
+        infos.sort(key=lambda i: natural_key(i.filename))
+        for info in infos:
+            name = info.filename.rsplit("/", 1)[-1]
+            if name in self.entries:
+                name = info.filename.replace("/", "_")  # same name in two folders
+            self.entries[name] = info
+
+    def names(self) -> List[str]:
+        return list(self.entries)
+
+    def stat(self, name: str) -> PageStat:
+        info = self.entries[name]
+        try:
+            mtime = time.mktime(info.date_time + (0, 0, -1))
+        except (OverflowError, ValueError):
+            mtime = 0
+        return PageStat(info.file_size, int(mtime) * 1_000_000_000, info.CRC)
+
+    def read(self, name: str) -> bytes:
+        return self._zip.read(self.entries[name])
+
+    def extract(self, name: str, dst: Path) -> Path:
+        with self._zip.open(self.entries[name]) as src, open(dst, "wb") as out:
+            shutil.copyfileobj(src, out, 1 << 20)
+        return dst
+
+    def close(self) -> None:
+        self._zip.close()
+        self._map.close()
+        self._file.close()
+
+
+_open: "OrderedDict[Path, ComicArchive]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def is_archive(path: Path) -> bool:
+    path = Path(path)
+    return path.suffix.lower() in ARCHIVE_EXTS and path.is_file()
+
+
+def _retire(arc: ComicArchive) -> None:
+    # Caller holds _lock. An archive still in use is closed by its last user instead.
+    arc.retired = True
+    if arc.users == 0:
+        arc.close()
+
+
+@contextmanager
+def open_archive(path: Path) -> Iterator[ComicArchive]:
+    """
+    Use the cached open archive for `path` (reopened if the file changed). It
+    stays open for the duration of the block even if it is evicted meanwhile.
+    """
+    path = Path(path)
+    st = os.stat(path)
+    with _lock:
+        arc = _open.get(path)
+        if arc is None or arc.key != (st.st_size, st.st_mtime_ns):
+            if arc is not None:
+                del _open[path]
+                _retire(arc)
+            arc = ComicArchive(path)
+            _open[path] = arc
+            while len(_open) > _MAX_OPEN:
+                _retire(_open.popitem(last=False)[1])
+        _open.move_to_end(path)
+        arc.users += 1
+    try:
+        yield arc
+    finally:
+        with _lock:
+            arc.users -= 1
+            if arc.retired and arc.users == 0:
+                arc.close()
+
+
+def close_archives() -> None:
+    """Close every cached archive (ones in use close when their block ends), e.g. before deleting one."""
+    with _lock:
+        while _open:
+            _retire(_open.popitem()[1])
+
+
+def split_page(page: Path) -> Optional[Tuple[Path, str]]:
+    """(archive, entry name) when `page` lives inside an archive, else None."""
+    page = Path(page)
+    if page.parent.suffix.lower() not in ARCHIVE_EXTS or not page.parent.is_file():
+        return None
+    return page.parent, page.name
+
+
+def list_archive_pages(path: Path) -> List[Path]:
+    path = Path(path)
+    with open_archive(path) as arc:
+        return [path / name for name in arc.names()]
+
+
+def stat_page(page: Path) -> "os.stat_result | PageStat":
+    inner = split_page(page)
+    if inner is None:
+        return os.stat(page)
+    try:
+        with open_archive(inner[0]) as arc:
+            return arc.stat(inner[1])
+    except KeyError:
+        raise FileNotFoundError(str(page)) from None
+
+
+def read_page(page: Path) -> bytes:
+    inner = split_page(page)
+    if inner is None:
+        return Path(page).read_bytes()
+    try:
+        with open_archive(inner[0]) as arc:
+            return arc.read(inner[1])
+    except KeyError:
+        raise FileNotFoundError(str(page)) from None
+
+
+def open_page(page: Path) -> BinaryIO:
+    """A file, or an archived page read into memory (pages are a few MB), so no stream pins the archive."""
+    if split_page(page) is None:
+        return open(page, "rb")
+    return io.BytesIO(read_page(page))
+
+
+def source_name(folder: Path) -> str:
+    """Name of the output folder for an input folder or archive ("vol1.cbz" -> "vol1")."""
+    folder = Path(folder)
+    return folder.stem if folder.suffix.lower() in ARCHIVE_EXTS else folder.name
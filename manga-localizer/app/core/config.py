@@ -18,6 +18,30 @@ class EngineConfig(BaseModel):
     font_path: str = ""            # optional
     overwrite: bool = True
     verbose: bool = True
+    incremental: bool = True          # only send new/changed pages (see manifest.py)
+
+    # Persistent engine worker (models stay loaded between runs)
+    persistent_engine: bool = True
+    engine_backend: str = "mit"       # "mit" or "stub" (protocol testing without models)
+    engine_idle_timeout: int = 600    # seconds before an idle worker exits
+    stage_cache: bool = False         # worker keeps per-page stage results, so render-only changes skip OCR/inpainting
+    stage_cache_gb: float = 20.0      # least recently used stage results are evicted past this size
+
+    # Sharded execution (CPU boxes): N engine processes, each with its own thread budget
+    shards: int = 1                   # 0 = auto (cores / free RAM)
+    threads_per_shard: int = 0        # 0 = cores / shards
+    pin_shards: bool = False          # sched_setaffinity per shard (Linux)
+    shard_ram_gb: float = 4.0         # RAM one engine process needs (for auto)
+
+    # Long-strip (webtoon) pages: cut into tiles at blank gutters, stitched back after the engine
+    slice_tall: bool = True
+    slice_height: int = 4096          # max tile height; strips taller than this (and 2x their width) are cut
+    slice_overlap: int = 128          # extra rows of context each tile gets above / below its cut
+
+    # Input normalization: pages are converted (RGB, EXIF rotation, size cap, no metadata) into a cache
+    normalize_inputs: bool = False
+    normalize_short_side: int = 2400  # shorter side is scaled down to this (0 = keep size)
+    normalize_cache_gb: float = 10.0  # least recently used normalized pages are evicted past this size
 
     def ensure_valid(self) -> None:
         if self.font_path:
@@ -25,7 +49,19 @@ class EngineConfig(BaseModel):
             if not p.exists():
                 raise ValueError(f"Font path does not exist: {p}")
 
+class PackageConfig(BaseModel):
+    # After a run: output pages re-encoded into <output>/<chapter>.cbz (or .zip)
+    enabled: bool = False
+    archive: str = "cbz"              # "cbz" or "zip"
+    format: str = "webp"              # "webp", "jpeg", "png" or "keep" (pages as the engine wrote them)
+    quality: int = 85                 # webp / jpeg
+    workers: int = 0                  # encoder processes; 0 = one per core
+
 class AppConfig(BaseModel):
     last_open_dir: str = ""
     output_root: str = "output"
+    thumbnail_view: bool = False
+    thumb_cache_mb: int = 500         # thumbnail cache cap; least recently used are evicted on exit
+    queue_concurrency: int = 1        # queue jobs run side by side (each with its own engine workers)
     engine: EngineConfig = Field(default_factory=EngineConfig)
+    package: PackageConfig = Field(default_factory=PackageConfig)
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import queue
+import subprocess
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from app.core.sharding import pin_process
+
+DAEMON_SCRIPT = Path(__file__).with_name("engine_daemon.py")
+
+LogFn = Callable[[str], None]
+
+
+class EngineError(RuntimeError):
+    pass
+
+
+class EngineClient:
+    """
+    Owns one persistent engine worker (see engine_daemon.py) and sends jobs to it.
+    The worker is spawned on first use, health-checked before each job and
+    restarted if it crashed or shut itself down after being idle.
+    """
+
+    def __init__(
+        self,
+        python_exe: str,
+        engine_dir: str = "",
+        engine: str = "mit",
+        idle_timeout: float = 600.0,
+        env: Optional[Dict[str, str]] = None,
+        start_timeout: float = 120.0,
+        max_restarts: int = 1,
+        extra_args: Optional[List[str]] = None,
+        cpus: Optional[List[int]] = None,
+    ):
+        self.python_exe = python_exe
+        self.engine_dir = engine_dir
+        self.engine = engine
+        self.idle_timeout = idle_timeout
+        self.env = dict(env or {})
+        self.start_timeout = start_timeout
+        self.max_restarts = max_restarts
+        self.extra_args = list(extra_args or [])
+        self.cpus = list(cpus) if cpus else None
+
+        self._proc: Optional[subprocess.Popen] = None
+        self._ids = itertools.count(1)
+        self._waiters: Dict[str, "queue.Queue[Optional[dict]]"] = {}
+        self._waiters_lock = threading.Lock()
+        self._job_lock = threading.Lock()
+
+    @staticmethod
+    def available() -> bool:
+        return DAEMON_SCRIPT.exists()
+
+    # ---------- lifecycle ----------
+    def _spawn_cmd(self) -> List[str]:
+        cmd = [
+            self.python_exe, "-u", str(DAEMON_SCRIPT),
+            "--engine", self.engine,
+            "--idle-timeout", str(self.idle_timeout),
+        ]
+        if self.engine_dir:
+            cmd += ["--engine-dir", self.engine_dir]
+        return cmd + self.extra_args
+
+    def same_setup(self, other: "EngineClient") -> bool:
+        return self._spawn_cmd() == other._spawn_cmd() and self.env == other.env and self.cpus == other.cpus
+
+    def is_alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def start(self) -> None:
+        if self.is_alive():
+            return
+
+        env = os.environ.copy()
+        env["PYTHONUTF8"] = "1"
+        env["PYTHONIOENCODING"] = "utf-8"
+        env.update(self.env)
+
+        engine_dir = Path(self.engine_dir).expanduser() if self.engine_dir else None
+        # Fresh queues per process so a late EOF from a dead worker can't leak into the new one.
+        ready: "queue.Queue[Optional[dict]]" = queue.Queue()
+        waiters: Dict[str, "queue.Queue[Optional[dict]]"] = {}
+        with self._waiters_lock:
+            self._waiters = waiters
+        self._proc = subprocess.Popen(
+            self._spawn_cmd(),
+            cwd=str(engine_dir) if engine_dir and engine_dir.exists() else None,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            env=env,
+        )
+        pin_process(self._proc.pid, self.cpus)
+        threading.Thread(target=self._read_events, args=(self._proc, ready, waiters), daemon=True).start()
+
+        try:
+            msg = ready.get(timeout=self.start_timeout)
+        except queue.Empty:
+            self.kill()
+            raise EngineError("Engine worker did not become ready in time.")
+        if not msg or msg.get("event") != "ready":
+            self.kill()
+            err = (msg or {}).get("error") or "worker exited during startup"
+            raise EngineError(f"Engine worker failed to start: {err}")
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        proc = self._proc
+        if proc is None:
+            return
+        if proc.poll() is None:
+            try:
+                self._send({"id": "shutdown", "op": "shutdown"})
+                proc.wait(timeout=timeout)
+            except Exception:
+                self.kill()
+        self._proc = None
+
+    def kill(self) -> None:
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.kill()
+            self._proc.wait()
+        self._proc = None
+
+    # ---------- protocol ----------
+    def _send(self, obj: dict) -> None:
+        assert self._proc is not None and self._proc.stdin is not None
+        self._proc.stdin.write(json.dumps(obj, ensure_ascii=False) + "\n")
+        self._proc.stdin.flush()
+
+    def _read_events(
+        self,
+        proc: subprocess.Popen,
+        ready: "queue.Queue[Optional[dict]]",
+        waiters: Dict[str, "queue.Queue[Optional[dict]]"],
+    ) -> None:
+        assert proc.stdout is not None
+        for raw in proc.stdout:
+            try:
+                msg = json.loads(raw)
+            except ValueError:
+                # Anything the worker printed before redirecting its streams.
+                msg = {"id": None, "event": "log", "line": raw.rstrip()}
+            rid = msg.get("id")
+            if rid is None and msg.get("event") in ("ready", "error"):
+                ready.put(msg)
+                continue
+            with self._waiters_lock:
+                q = waiters.get(str(rid)) if rid is not None else None
+            if q is not None:
+                q.put(msg)
+
+        # Worker exited: wake up everyone still waiting.
+        ready.put(None)
+        with self._waiters_lock:
+            for q in waiters.values():
+                q.put(None)
+
+    def _request(self, op: str, **payload) -> "tuple[str, queue.Queue]":
+        rid = str(next(self._ids))
+        q: "queue.Queue[Optional[dict]]" = queue.Queue()
+        with self._waiters_lock:
+            self._waiters[rid] = q
+        self._send({"id": rid, "op": op, **payload})
+        return rid, q
+
+    def _release(self, rid: str) -> None:
+        with self._waiters_lock:
+            self._waiters.pop(rid, None)
+
+    def ping(self, timeout: float = 5.0) -> bool:
+        if not self.is_alive():
+            return False
+        try:
+            rid, q = self._request("ping")
+        except (OSError, ValueError):
+            return False
+        try:
+            msg = q.get(timeout=timeout)
+            return bool(msg) and msg.get("event") == "pong"
+        except queue.Empty:
+            return False
+        finally:
+            self._release(rid)
+
+    def ensure_healthy(self) -> None:
+        if self.is_alive() and self.ping():
+            return
+        self.kill()
+        self.start()
+
+    # ---------- jobs ----------
+    def run(
+        self,
+        args: List[str],
+        input_dir: Path,
+        output_dir: Path,
+        on_log: Optional[LogFn] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> int:
+        """Run one job on the worker. Setting `cancel` kills the worker (it is respawned for the next job)."""
+        log = on_log or (lambda _line: None)
+        attempts = 0
+        with self._job_lock:
+            while True:
+                if cancel is not None and cancel.is_set():
+                    raise EngineError("Job cancelled.")
+                self.ensure_healthy()
+                rid, q = self._request("run", args=list(args), input=str(input_dir), output=str(output_dir))
+                try:
+                    while True:
+                        if cancel is not None and cancel.is_set():
+                            self.kill()
+                            raise EngineError("Job cancelled.")
+                        try:
+                            msg = q.get(timeout=0.25 if cancel is not None else None)
+                        except queue.Empty:
+                            continue
+                        if msg is None:
+                            break
+                        ev = msg.get("event")
+                        if ev == "log":
+                            log(msg.get("line", ""))
+                        elif ev == "done":
+                            if msg.get("error"):
+                                log(f"[engine] {msg['error']}")
+                            return int(msg.get("code", 1))
+                        elif ev == "error":
+                            log(f"[engine] {msg.get('error')}")
+                finally:
+                    self._release(rid)
+
+                # The worker died mid-job.
+                code = None
+                if self._proc is not None:
+                    try:
+                        code = self._proc.wait(timeout=5.0)
+                    except subprocess.TimeoutExpired:
+                        self._proc.kill()
+                self._proc = None
+                if attempts >= self.max_restarts:
+                    raise EngineError(f"Engine worker crashed (exit code {code}).")
+                attempts += 1
+                log(f"[engine] worker crashed (exit code {code}); restarting and retrying job")
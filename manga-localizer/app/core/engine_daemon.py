@@ -0,0 +1,503 @@
+"""
+Long-lived engine worker.
+
+Runs inside the *engine* python (the one that has manga-image-translator
+installed), so it must only depend on the standard library. Jobs arrive as
+JSON lines on stdin and events go back as JSON lines on stdout:
+
+    -> {"id": "1", "op": "ping"}
+    <- {"id": "1", "event": "pong", "busy": false, "jobs": 0, "uptime": 1.2}
+    -> {"id": "2", "op": "run", "args": [...], "input": "...", "output": "..."}
+    <- {"id": "2", "event": "log", "line": "..."}
+    <- {"id": "2", "event": "done", "code": 0, "error": null}
+    -> {"id": "3", "op": "shutdown"}
+    <- {"id": "3", "event": "bye", "reason": "shutdown"}
+
+"args" are the same arguments `build_mit_args` produces for the CLI. Models
+stay loaded between jobs; the worker exits on its own after `--idle-timeout`
+seconds without requests.
+
+With `--stage-cache DIR` the worker keeps each page's intermediate results
+(detected text regions, OCR, translations, masks, inpainted background) on
+disk, so a run whose settings differ only in what later stages read (e.g.
+the `render` section or the font) only redoes those stages.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import queue
+import shutil
+import sys
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".webp"}
+THREAD_BUDGET_ENV = "MLUI_ENGINE_THREADS"  # app.core.sharding.thread_env
+_DRAIN_MARKER = "\x00engine-daemon-drain\x00"
+
+LogFn = Callable[[str], None]
+
+# Cached pipeline stages: (MangaTranslator method, config fields it reads,
+# stage whose output it consumes). A stage's key covers its own fields and,
+# through the parent chain, everything upstream. Rendering is never cached:
+# it is what typesetting tweaks change, and it is cheap.
+STAGES: List[Tuple[str, Tuple[str, ...], Optional[str]]] = [
+    ("_run_colorizer", ("colorizer",), None),
+    ("_run_upscaling", ("upscale",), "_run_colorizer"),
+    ("_run_detection", ("detector",), "_run_upscaling"),
+    ("_run_ocr", ("ocr",), "_run_detection"),
+    ("_run_textline_merge", (), "_run_ocr"),
+    ("_run_text_translation", ("translator",), "_run_textline_merge"),
+    # Untranslated regions are dropped before the mask is refined, so the mask depends on the translation.
+    ("_run_mask_refinement", ("mask_dilation_offset", "kernel_size"), "_run_text_translation"),
+    ("_run_inpainting", ("inpainter",), "_run_mask_refinement"),
+]
+_STAGE_INFO = {name: (fields, parent) for name, fields, parent in STAGES}
+_CACHE_FORMAT = 1
+
+
+def _config_field(config: Any, name: str) -> str:
+    value = config.get(name) if isinstance(config, dict) else getattr(config, name, None)
+    dump = getattr(value, "model_dump_json", None)  # the engine's pydantic config sections
+    if dump is not None:
+        return dump()
+    try:
+        return json.dumps(value, sort_keys=True, default=repr)
+    except (TypeError, ValueError):
+        return repr(value)
+
+
+class StageCache:
+    """
+    On-disk memo of per-page stage results, addressed by a hash of the page
+    content and the config fields of the stage and every stage before it.
+    Least recently used entries are evicted past `max_bytes`.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def stage_key(self, page: str, stage: str, config: Any) -> str:
+        fields, parent = _STAGE_INFO[stage]
+        h = hashlib.blake2b(digest_size=20)
+        h.update(f"{_CACHE_FORMAT}\0{stage}\0".encode())
+        h.update((self.stage_key(page, parent, config) if parent else page).encode())
+        for name in fields:
+            h.update(b"\0" + name.encode() + b"=" + _config_field(config, name).encode("utf-8"))
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.pkl"
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        path = self._path(key)
+        try:
+            value = pickle.loads(path.read_bytes())
+            os.utime(path)  # recency for eviction
+        except FileNotFoundError:
+            self.misses += 1
+            return False, None
+        except Exception:
+            path.unlink(missing_ok=True)  # torn or from an incompatible engine version
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, value
+
+    def put(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return  # not picklable: this stage just isn't cached
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def trim(self) -> int:
+        """Evict least recently used entries until the cache fits; returns bytes freed."""
+        entries = []
+        total = 0
+        for p in self.root.glob("*/*.pkl"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        freed = 0
+        for _mtime, size, p in sorted(entries):
+            if total - freed <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            freed += size
+        return freed
+
+    def take_stats(self) -> Tuple[int, int]:
+        stats = (self.hits, self.misses)
+        self.hits = self.misses = 0
+        return stats
+
+
+def _page_hash(data: bytes, *extra: object) -> str:
+    h = hashlib.blake2b(data, digest_size=20)
+    for x in extra:
+        h.update(repr(x).encode())
+    return h.hexdigest()
+
+
+def _stub_config(args: List[str]) -> dict:
+    if "--config-file" not in args:
+        return {}
+    try:
+        return json.loads(Path(args[args.index("--config-file") + 1]).read_text(encoding="utf-8"))
+    except (IndexError, OSError, ValueError):
+        return {}
+
+
+class StubEngine:
+    """Copies pages through unchanged, printing engine-like log lines."""
+
+    name = "stub"
+
+    # Printed stage name -> the engine stage it stands in for (None: never cached).
+    STAGES = (
+        ("text detection", "_run_detection"),
+        ("ocr", "_run_ocr"),
+        ("inpainting", "_run_inpainting"),
+        ("text translation", "_run_text_translation"),
+        ("rendering", None),
+    )
+
+    def __init__(self, delay: float = 0.0, cpu_bound: bool = False, stage_cache: Optional[StageCache] = None):
+        self.delay = delay
+        self.cpu_bound = cpu_bound
+        self.stage_cache = stage_cache
+
+    def _work(self, seconds: float) -> None:
+        if not seconds:
+            return
+        if not self.cpu_bound:
+            time.sleep(seconds)
+            return
+        # Spin instead of sleeping so shard scaling benchmarks see real CPU contention.
+        end = time.process_time() + seconds
+        x = 0
+        while time.process_time() < end:
+            for i in range(10_000):
+                x += i * i
+
+    def run(self, args: List[str], input_dir: Path, output_dir: Path) -> int:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        files = sorted(p for p in input_dir.iterdir() if p.suffix.lower() in IMAGE_EXTS)
+        cache = self.stage_cache
+        config = _stub_config(args) if cache is not None else {}
+        for p in files:
+            print(f'Translating: "{p}"', flush=True)
+            page = _page_hash(p.read_bytes()) if cache is not None else ""
+            # Same phrasing as manga_translator's progress hook, so progress.py parses both.
+            for stage, cached_as in self.STAGES:
+                print(f"Running {stage}", flush=True)
+                if cache is not None and cached_as is not None:
+                    key = cache.stage_key(page, cached_as, config)
+                    if cache.get(key)[0]:
+                        continue
+                    self._work(self.delay / 5)
+                    cache.put(key, stage)
+                    continue
+                self._work(self.delay / 5)
+            dest = output_dir / p.name
+            shutil.copyfile(p, dest)
+            print(f'Saved "{dest}"', flush=True)
+        return 0
+
+
+class MitEngine:
+    """Drives manga_translator in-process so loaded models are reused."""
+
+    name = "mit"
+
+    def __init__(self, engine_dir: str = "", stage_cache: Optional[StageCache] = None):
+        if engine_dir and engine_dir not in sys.path:
+            sys.path.insert(0, engine_dir)
+        # Import up front so a broken install fails the handshake, not the first job.
+        from manga_translator.args import parser  # noqa: F401
+        from manga_translator.mode.local import MangaTranslatorLocal  # noqa: F401
+        apply_thread_budget()
+        self._loop = asyncio.new_event_loop()
+        self.stage_cache = stage_cache
+        self._pages: Dict[int, Tuple[weakref.ref, str]] = {}
+
+    def _page_key(self, ctx: Any) -> str:
+        # Hashed once per page context; the weak reference guards against a recycled id().
+        ref, key = self._pages.get(id(ctx), (None, ""))
+        if ref is None or ref() is not ctx:
+            img = ctx.input  # the page as loaded, before any stage touched it
+            key = _page_hash(img.tobytes(), img.mode, img.size)
+            self._pages[id(ctx)] = (weakref.ref(ctx), key)
+        return key
+
+    def _cached_stage(self, stage: str, run: Callable) -> Callable:
+        cache = self.stage_cache
+
+        def lookup(config, ctx) -> Tuple[str, bool, Any]:
+            key = cache.stage_key(self._page_key(ctx), stage, config)
+            return (key,) + cache.get(key)
+
+        if inspect.iscoroutinefunction(run):
+            async def cached(config, ctx, *args, **kwargs):
+                key, hit, value = lookup(config, ctx)
+                if not hit:
+                    value = await run(config, ctx, *args, **kwargs)
+                    cache.put(key, value)
+                return value
+        else:
+            def cached(config, ctx, *args, **kwargs):
+                key, hit, value = lookup(config, ctx)
+                if not hit:
+                    value = run(config, ctx, *args, **kwargs)
+                    cache.put(key, value)
+                return value
+        return cached
+
+    def _install_stage_cache(self, translator) -> None:
+        # Stage methods missing from this engine version simply run uncached.
+        for stage, _fields, _parent in STAGES:
+            run = getattr(translator, stage, None)
+            if run is not None:
+                setattr(translator, stage, self._cached_stage(stage, run))
+
+    def run(self, args: List[str], input_dir: Path, output_dir: Path) -> int:
+        from manga_translator.args import parser
+        from manga_translator.mode.local import MangaTranslatorLocal
+
+        ns = parser.parse_args(args)
+        params = vars(ns)
+        # Mirrors the engine's own `local` dispatch. The detector/OCR/inpainter
+        # caches are module level, so a fresh translator still gets warm models.
+        translator = MangaTranslatorLocal(params)
+        if self.stage_cache is not None:
+            self._install_stage_cache(translator)
+        inputs = params.get("input") or [str(input_dir)]
+        dest = params.get("dest") or str(output_dir)
+        try:
+            for path in sorted(inputs):
+                self._loop.run_until_complete(translator.translate_path(path, dest, params))
+        finally:
+            self._pages.clear()
+        return 0
+
+
+class EngineDaemon:
+    def __init__(self, engine, idle_timeout: float, proto) -> None:
+        self.engine = engine
+        self.idle_timeout = idle_timeout
+        self.proto = proto
+        self.started = time.monotonic()
+        self.jobs_done = 0
+        self.current_id: Optional[str] = None
+        self._write_lock = threading.Lock()
+        self._jobs: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._drained = threading.Event()
+
+    # ---------- protocol ----------
+    def send(self, obj: dict) -> None:
+        data = json.dumps(obj, ensure_ascii=False)
+        with self._write_lock:
+            self.proto.write(data + "\n")
+            self.proto.flush()
+
+    def _read_requests(self) -> None:
+        for raw in sys.stdin:
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                req = json.loads(raw)
+            except ValueError:
+                self.send({"id": None, "event": "error", "error": f"bad request: {raw[:200]}"})
+                continue
+            op = req.get("op")
+            if op == "ping":
+                # Answered from the reader thread so health checks work mid-job.
+                self.send({
+                    "id": req.get("id"),
+                    "event": "pong",
+                    "busy": self.current_id is not None,
+                    "jobs": self.jobs_done,
+                    "uptime": round(time.monotonic() - self.started, 3),
+                })
+            else:
+                self._jobs.put(req)
+        self._jobs.put(None)  # stdin closed: client went away
+
+    def _pump_output(self, fd: int) -> None:
+        with os.fdopen(fd, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.rstrip("\r\n")
+                if line == _DRAIN_MARKER:
+                    self._drained.set()
+                    continue
+                self.send({"id": self.current_id, "event": "log", "line": line})
+
+    def _drain(self) -> None:
+        # Wait until everything the engine printed for this job has been relayed.
+        self._drained.clear()
+        sys.stderr.flush()
+        print(_DRAIN_MARKER, flush=True)
+        self._drained.wait(timeout=5.0)
+
+    # ---------- main loop ----------
+    def serve(self, pipe_read_fd: int) -> int:
+        threading.Thread(target=self._pump_output, args=(pipe_read_fd,), daemon=True).start()
+        threading.Thread(target=self._read_requests, daemon=True).start()
+        self.send({"id": None, "event": "ready", "engine": self.engine.name, "pid": os.getpid()})
+
+        while True:
+            try:
+                req = self._jobs.get(timeout=self.idle_timeout if self.idle_timeout > 0 else None)
+            except queue.Empty:
+                self.send({"id": None, "event": "bye", "reason": "idle"})
+                return 0
+            if req is None:
+                return 0
+
+            op = req.get("op")
+            rid = req.get("id")
+            if op == "shutdown":
+                self.send({"id": rid, "event": "bye", "reason": "shutdown"})
+                return 0
+            if op != "run":
+                self.send({"id": rid, "event": "error", "error": f"unknown op: {op}"})
+                continue
+
+            self.current_id = rid
+            code, error = 1, None
+            try:
+                code = int(self.engine.run(
+                    list(req.get("args") or []),
+                    Path(req["input"]),
+                    Path(req["output"]),
+                ) or 0)
+            except SystemExit as e:  # argparse errors
+                code = e.code if isinstance(e.code, int) else 2
+                error = f"engine exited: {e.code}"
+            except Exception as e:
+                import traceback
+                traceback.print_exc()
+                error = f"{type(e).__name__}: {e}"
+            cache = getattr(self.engine, "stage_cache", None)
+            if cache is not None:
+                hits, misses = cache.take_stats()
+                print(f"Stage cache: {hits} stages reused, {misses} computed", flush=True)
+                try:
+                    cache.trim()
+                except OSError:
+                    pass
+            self._drain()
+            self.current_id = None
+            self.jobs_done += 1
+            self.send({"id": rid, "event": "done", "code": code, "error": error})
+
+
+def apply_thread_budget() -> None:
+    """Size torch's and opencv's thread pools, which ignore OMP_NUM_THREADS and friends."""
+    try:
+        threads = int(os.environ.get(THREAD_BUDGET_ENV) or 0)
+    except ValueError:
+        return
+    if threads <= 0:
+        return
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    try:
+        import cv2
+        cv2.setNumThreads(threads)
+    except ImportError:
+        pass
+
+
+def run_oneshot(engine_dir: str, args: List[str]) -> int:
+    """`python -m manga_translator <args>`, with the thread budget applied first."""
+    engine_dir = engine_dir or os.getcwd()  # what -m would put on sys.path
+    if engine_dir not in sys.path:
+        sys.path.insert(0, engine_dir)
+    apply_thread_budget()
+    import runpy
+
+    sys.argv = ["manga_translator", *args]
+    try:
+        runpy.run_module("manga_translator", run_name="__main__", alter_sys=True)
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    return 0
+
+
+def _redirect_std_streams():
+    """Keep the real stdout for the protocol; route fd 1/2 into a pipe we relay."""
+    proto = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+    r, w = os.pipe()
+    os.dup2(w, 1)
+    os.dup2(w, 2)
+    os.close(w)
+    sys.stdout = open(1, "w", encoding="utf-8", errors="replace", buffering=1, closefd=False)
+    sys.stderr = open(2, "w", encoding="utf-8", errors="replace", buffering=1, closefd=False)
+    return proto, r
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Persistent manga-image-translator worker")
+    ap.add_argument("--engine", choices=["mit", "stub"], default="mit")
+    ap.add_argument("--engine-dir", default="")
+    ap.add_argument("--idle-timeout", type=float, default=600.0)
+    ap.add_argument("--stub-delay", type=float, default=0.0, help="seconds of simulated work per page")
+    ap.add_argument("--stub-cpu", action="store_true", help="burn CPU for --stub-delay instead of sleeping")
+    ap.add_argument("--stage-cache", default="", help="directory for per-page stage results (off if empty)")
+    ap.add_argument("--stage-cache-gb", type=float, default=20.0, help="evict least recently used results past this size")
+    ap.add_argument("--oneshot", nargs=argparse.REMAINDER, metavar="ARGS",
+                    help="run the engine once with these arguments instead of serving jobs")
+    ns = ap.parse_args(argv)
+
+    if ns.oneshot is not None:
+        if ns.engine == "stub":
+            # build_mit_args always ends with `local -i <input> -o <output>`.
+            args = ns.oneshot
+            src, dst = args[args.index("-i") + 1], args[args.index("-o") + 1]
+            return StubEngine(ns.stub_delay, ns.stub_cpu).run(args, Path(src), Path(dst))
+        return run_oneshot(ns.engine_dir, ns.oneshot)
+
+    proto, pipe_r = _redirect_std_streams()
+
+    try:
+        cache = StageCache(Path(ns.stage_cache), int(ns.stage_cache_gb * 1e9)) if ns.stage_cache else None
+        if ns.engine == "stub":
+            engine = StubEngine(ns.stub_delay, ns.stub_cpu, cache)
+        else:
+            engine = MitEngine(ns.engine_dir, cache)
+    except Exception as e:
+        proto.write(json.dumps({"id": None, "event": "error", "error": f"engine failed to load: {e}"}) + "\n")
+        proto.flush()
+        return 3
+
+    return EngineDaemon(engine, ns.idle_timeout, proto).serve(pipe_r)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
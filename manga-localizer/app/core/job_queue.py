@@ -0,0 +1,270 @@
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_PAUSED = "paused"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+ACTIVE_STATES = (JOB_QUEUED, JOB_RUNNING, JOB_PAUSED)
+FINAL_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+
+@dataclass
+class Job:
+    folder: str
+    output_dir: str
+    priority: int = 0                  # higher runs first; ties keep queue order
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    state: str = JOB_QUEUED
+    seq: int = 0                       # position within the queue
+    added: float = field(default_factory=time.time)
+    started: float = 0.0
+    finished: float = 0.0
+    code: Optional[int] = None
+    message: str = ""
+    done: int = 0                      # pages finished in the current/last attempt
+    failed: int = 0
+    total: int = 0
+
+    @property
+    def name(self) -> str:
+        return Path(self.folder).name
+
+    @property
+    def active(self) -> bool:
+        return self.state in ACTIVE_STATES
+
+
+class JobQueue:
+    """
+    Ordered list of folder jobs, saved as JSON after every change so it
+    survives restarts. Jobs that were running when the app went away come back
+    queued (the output manifest makes the rerun skip finished pages).
+
+    Thread-safe: the runner claims and finishes jobs from worker threads while
+    the UI edits the queue. `on_change` is called (from whichever thread made
+    the change) after every mutation.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Optional[Path] = None, on_change: Optional[Callable[[], None]] = None):
+        self.path = Path(path) if path else None
+        self.on_change = on_change
+        self.paused = False            # queue-wide: don't start new jobs
+        self._jobs: List[Job] = []
+        self._lock = threading.RLock()
+        self.cond = threading.Condition(self._lock)
+        self._load()
+
+    # ---------- persistence ----------
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            known = {f.name for f in fields(Job)}
+            jobs = [Job(**{k: v for k, v in d.items() if k in known}) for d in data.get("jobs", [])]
+        except (OSError, ValueError, TypeError):
+            return  # corrupted queue file: start empty rather than refuse to launch
+        self.paused = bool(data.get("paused", False))
+        for job in jobs:
+            if job.state == JOB_RUNNING:
+                job.state = JOB_QUEUED
+                job.message = "interrupted; requeued"
+        self._jobs = jobs
+        self._renumber()
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            data = {"version": self.VERSION, "paused": self.paused, "jobs": [asdict(j) for j in self._jobs]}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def _changed(self, persist: bool = True) -> None:
+        if persist:
+            self.save()
+        self.cond.notify_all()
+        if self.on_change is not None:
+            self.on_change()
+
+    # ---------- reading ----------
+    def _sorted(self) -> List[Job]:
+        return sorted(self._jobs, key=lambda j: (-j.priority, j.seq))
+
+    def _renumber(self) -> None:
+        self._jobs = self._sorted()
+        for i, job in enumerate(self._jobs):
+            job.seq = i
+
+    def jobs(self) -> List[Job]:
+        """All jobs in run order (the same objects the runner updates)."""
+        with self._lock:
+            return list(self._jobs)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return next((j for j in self._jobs if j.id == job_id), None)
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for j in self._jobs if j.state == JOB_QUEUED)
+
+    def running(self) -> List[Job]:
+        with self._lock:
+            return [j for j in self._jobs if j.state == JOB_RUNNING]
+
+    def peek(self, skip: Iterable[str] = ()) -> Optional[Job]:
+        """Next job `claim` would return, ignoring jobs whose id or output dir is in `skip`."""
+        skip = set(skip)
+        with self._lock:
+            busy = {j.output_dir for j in self._jobs if j.state == JOB_RUNNING}
+            for job in self._jobs:
+                if job.state == JOB_QUEUED and job.id not in skip and job.output_dir not in skip | busy:
+                    return job
+        return None
+
+    # ---------- editing ----------
+    def add(self, folder: Path, output_dir: Path, priority: int = 0) -> Job:
+        """Queue a folder; a folder that is already queued or running is returned as is."""
+        folder_s = str(Path(folder).resolve())
+        with self._lock:
+            for job in self._jobs:
+                if job.folder == folder_s and job.active:
+                    return job
+            job = Job(folder_s, str(Path(output_dir).resolve()), priority=priority, seq=len(self._jobs))
+            self._jobs.append(job)
+            self._renumber()
+            self._changed()
+            return job
+
+    def move(self, job_id: str, offset: int) -> None:
+        """Move a job up (negative) or down the run order. Passing a job of another priority adopts its priority."""
+        with self._lock:
+            order = self._sorted()
+            i = next((k for k, j in enumerate(order) if j.id == job_id), None)
+            if i is None:
+                return
+            k = max(0, min(len(order) - 1, i + offset))
+            if k == i:
+                return
+            job = order.pop(i)
+            order.insert(k, job)
+            passed = order[k + 1] if offset < 0 else order[k - 1]
+            job.priority = passed.priority
+            for n, j in enumerate(order):
+                j.seq = n
+            self._renumber()
+            self._changed()
+
+    def set_priority(self, job_id: str, priority: int) -> None:
+        with self._lock:
+            job = self.get(job_id)
+            if job is None or job.priority == priority:
+                return
+            job.priority = priority
+            self._renumber()
+            self._changed()
+
+    def pause(self, job_id: str) -> None:
+        self._transition(job_id, (JOB_QUEUED,), JOB_PAUSED)
+
+    def resume(self, job_id: str) -> None:
+        """Resume a paused job, or requeue a finished one."""
+        self._transition(job_id, (JOB_PAUSED,) + FINAL_STATES, JOB_QUEUED)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a waiting job. Returns True if the job is running (the runner has to stop it)."""
+        with self._lock:
+            job = self.get(job_id)
+            if job is None:
+                return False
+            if job.state == JOB_RUNNING:
+                return True
+            self._transition(job_id, (JOB_QUEUED, JOB_PAUSED), JOB_CANCELLED)
+            return False
+
+    def _transition(self, job_id: str, allowed: tuple, state: str) -> None:
+        with self._lock:
+            job = self.get(job_id)
+            if job is None or job.state not in allowed:
+                return
+            job.state = state
+            if state == JOB_QUEUED:
+                job.code = None
+                job.message = ""
+            self._changed()
+
+    def remove(self, job_id: str) -> bool:
+        with self._lock:
+            job = self.get(job_id)
+            if job is None or job.state == JOB_RUNNING:
+                return False
+            self._jobs.remove(job)
+            self._renumber()
+            self._changed()
+            return True
+
+    def clear_finished(self) -> int:
+        with self._lock:
+            keep = [j for j in self._jobs if j.active]
+            removed = len(self._jobs) - len(keep)
+            if removed:
+                self._jobs = keep
+                self._renumber()
+                self._changed()
+            return removed
+
+    def set_paused(self, paused: bool) -> None:
+        with self._lock:
+            if self.paused != paused:
+                self.paused = paused
+                self._changed()
+
+    # ---------- runner side ----------
+    def claim(self, skip: Iterable[str] = ()) -> Optional[Job]:
+        """Mark the next runnable job as running and return it (None if the queue is paused or has none)."""
+        with self._lock:
+            if self.paused:
+                return None
+            job = self.peek(skip)
+            if job is None:
+                return None
+            job.state = JOB_RUNNING
+            job.started = time.time()
+            job.finished = 0.0
+            job.code = None
+            job.message = ""
+            job.done = job.failed = job.total = 0
+            self._changed()
+            return job
+
+    def progress(self) -> None:
+        """A running job's page counts changed (not persisted)."""
+        with self._lock:
+            self._changed(persist=False)
+
+    def finish(self, job_id: str, state: str, code: Optional[int] = None, message: str = "") -> None:
+        with self._lock:
+            job = self.get(job_id)
+            if job is None:
+                return
+            job.state = state
+            job.code = code
+            job.message = message
+            job.finished = time.time() if state in FINAL_STATES else 0.0
+            self._changed()
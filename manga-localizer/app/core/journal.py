@@ -0,0 +1,239 @@
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.archive import stat_page
+
+JOURNAL_NAME = ".mlui-journal.jsonl"
+
+
+def _fsync_file(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def output_complete(path: Path) -> bool:
+    """
+    Cheap truncation check for an engine output: the file must end like a
+    complete PNG / JPEG / WebP. Other formats only need to be non-empty.
+    """
+    try:
+        size = path.stat().st_size
+        if size == 0:
+            return False
+        ext = path.suffix.lower()
+        with open(path, "rb") as f:
+            head = f.read(12)
+            f.seek(max(0, size - 12))
+            tail = f.read(12)
+    except OSError:
+        return False
+    if ext == ".png":
+        return head.startswith(b"\x89PNG") and tail.endswith(b"IEND\xaeB`\x82")
+    if ext in (".jpg", ".jpeg"):
+        return head.startswith(b"\xff\xd8") and tail.rstrip(b"\x00").endswith(b"\xff\xd9")
+    if ext == ".webp":
+        return head[:4] == b"RIFF" and int.from_bytes(head[4:8], "little") + 8 <= size
+    return True
+
+
+@dataclass
+class DoneRecord:
+    name: str
+    input_hash: str
+    input_size: int
+    input_mtime_ns: int
+    output_size: int
+    output_mtime_ns: int
+
+
+def _done_record(name: str, ih: str, isize: int, imtime: int, osize: int, omtime: int) -> dict:
+    return {"op": "done", "page": name, "ih": ih, "is": isize, "im": imtime, "os": osize, "om": omtime}
+
+
+@dataclass
+class JournalState:
+    """What an interrupted run's journal says about each page."""
+    settings: str = ""
+    done: Dict[str, DoneRecord] = field(default_factory=dict)
+    started: Dict[str, int] = field(default_factory=dict)   # name -> start time (ns), not finished
+    clean: bool = False                                     # the run ended and was accounted for
+
+
+def read_journal(path: Path) -> Optional[JournalState]:
+    """Replay a journal; a torn last line (crash mid-append) is ignored."""
+    try:
+        raw = path.read_bytes()
+    except OSError:
+        return None
+    state = JournalState()
+    for line in raw.splitlines():
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            continue
+        op = rec.get("op")
+        name = rec.get("page", "")
+        if op == "begin":
+            state.settings = rec.get("settings", "")
+        elif op == "start":
+            state.started[name] = int(rec.get("t", 0))
+            state.done.pop(name, None)
+        elif op == "done":
+            state.started.pop(name, None)
+            state.done[name] = DoneRecord(
+                name, rec.get("ih", ""), int(rec.get("is", -1)), int(rec.get("im", -1)),
+                int(rec.get("os", -1)), int(rec.get("om", -1)),
+            )
+        elif op == "fail":
+            state.started[name] = int(rec.get("t", 0))
+            state.done.pop(name, None)
+        elif op == "end":
+            state.clean = True
+    return state
+
+
+@dataclass
+class Recovery:
+    verified: List[DoneRecord] = field(default_factory=list)   # finished pages whose outputs are intact
+    discarded: List[str] = field(default_factory=list)         # partial outputs deleted
+
+
+def recover(output_folder: Path) -> Tuple[Optional[JournalState], Recovery]:
+    """
+    Look for the journal of a run that never finished in `output_folder`.
+    Outputs of pages that were started but not finished (or whose output is
+    missing, changed or truncated) are deleted; the rest are returned as
+    verified so the caller can skip them.
+    """
+    output_folder = Path(output_folder)
+    path = output_folder / JOURNAL_NAME
+    state = read_journal(path) if path.exists() else None
+    rec = Recovery()
+    if state is None or state.clean:
+        return state, rec
+
+    def discard(name: str, since_ns: int = 0) -> None:
+        out = output_folder / name
+        try:
+            if out.stat().st_mtime_ns >= since_ns:
+                out.unlink()
+                rec.discarded.append(name)
+        except OSError:
+            pass
+
+    for name, started_ns in state.started.items():
+        discard(name, started_ns)  # only what this run wrote; an older output is left alone
+    for name, d in state.done.items():
+        out = output_folder / name
+        try:
+            st = out.stat()
+        except OSError:
+            continue
+        if not output_complete(out):
+            discard(name)
+        elif st.st_size == d.output_size and st.st_mtime_ns == d.output_mtime_ns:
+            rec.verified.append(d)
+    return state, rec
+
+
+class RunJournal:
+    """
+    Write-ahead journal of one engine run, kept in the output folder. Every
+    page start / finish / failure is appended as a JSON line and fsync'd; a
+    finished page's output is fsync'd before its "done" record, so the journal
+    never claims more than what is on disk. `close()` marks a clean end and
+    deletes the journal; if it is still there, the run was interrupted.
+    """
+
+    def __init__(self, output_folder: Path, settings: str, inputs: Iterable[Path],
+                 hashes: Optional[Dict[str, "tuple[str, int, int]"]] = None, carried: Iterable[DoneRecord] = ()):
+        self.output_folder = Path(output_folder)
+        self.path = self.output_folder / JOURNAL_NAME
+        self._inputs = {Path(p).name: Path(p) for p in inputs}
+        self._hashes = dict(hashes or {})
+        self._lock = threading.Lock()
+        self.in_flight: Dict[str, int] = {}
+        self.output_folder.mkdir(parents=True, exist_ok=True)
+        self._fd: Optional[int] = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+        self._append({"op": "begin", "settings": settings, "t": time.time_ns(), "pages": len(self._inputs)})
+        for d in carried:  # pages an interrupted run already finished stay on record until this one ends
+            self._append(_done_record(d.name, d.input_hash, d.input_size, d.input_mtime_ns, d.output_size, d.output_mtime_ns))
+
+    def _append(self, rec: dict) -> None:
+        data = (json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            if self._fd is None:
+                return
+            os.write(self._fd, data)
+            os.fsync(self._fd)
+
+    def started(self, name: str) -> None:
+        t = time.time_ns()
+        self.in_flight[name] = t
+        self._append({"op": "start", "page": name, "t": t})
+
+    def finished(self, name: str) -> None:
+        self.in_flight.pop(name, None)
+        out = self.output_folder / name
+        try:
+            ost = out.stat()
+        except OSError:
+            return  # no output to vouch for: leave it unfinished
+        _fsync_file(out)
+        ih, isize, imtime = self._hashes.get(name, ("", -1, -1))
+        if isize < 0 and name in self._inputs:
+            try:
+                ist = stat_page(self._inputs[name])
+                isize, imtime = ist.st_size, ist.st_mtime_ns
+            except OSError:
+                pass
+        self._append(_done_record(name, ih, isize, imtime, ost.st_size, ost.st_mtime_ns))
+
+    def failed(self, name: str) -> None:
+        t = self.in_flight.pop(name, time.time_ns())
+        self._append({"op": "fail", "page": name, "t": t})
+
+    def discard_partial(self) -> List[str]:
+        """Delete outputs of pages that were still being written (run killed or cancelled)."""
+        dropped = []
+        for name, t in list(self.in_flight.items()):
+            out = self.output_folder / name
+            try:
+                if out.stat().st_mtime_ns >= t:
+                    out.unlink()
+                    dropped.append(name)
+            except OSError:
+                pass
+        self.in_flight.clear()
+        return dropped
+
+    def close(self) -> None:
+        """Clean end of the run (its results are in the manifest / output folder by now)."""
+        self._append({"op": "end", "t": time.time_ns()})
+        with self._lock:
+            if self._fd is None:
+                return
+            os.close(self._fd)
+            self._fd = None
+        remove_journal(self.output_folder)
+
+
+def remove_journal(output_folder: Path) -> None:
+    try:
+        (Path(output_folder) / JOURNAL_NAME).unlink()
+    except OSError:
+        pass
@@ -0,0 +1,122 @@
+from __future__ import annotations
+import re
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Deque, List, Optional, Tuple
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVEL_NAMES = {DEBUG: "Debug", INFO: "Info", WARNING: "Warning", ERROR: "Error"}
+
+_RE_ERROR = re.compile(r"\b(ERROR|CRITICAL|Traceback|Exception)\b|Page failed|failed:", re.IGNORECASE)
+_RE_WARNING = re.compile(r"\bWARN(ING)?\b", re.IGNORECASE)
+_RE_DEBUG = re.compile(r"\bDEBUG\b")
+
+LogLine = Tuple[int, str]
+
+
+def classify(line: str) -> int:
+    if _RE_ERROR.search(line):
+        return ERROR
+    if _RE_WARNING.search(line):
+        return WARNING
+    if _RE_DEBUG.search(line):
+        return DEBUG
+    return INFO
+
+
+class RotatingLogFile:
+    """Plain buffered text log that rolls over to `name.1`, `name.2`, … at `max_bytes`."""
+
+    def __init__(self, path: Path, max_bytes: int = 5 * 1024 * 1024, backups: int = 3):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.path, "a", encoding="utf-8", errors="replace")
+        self._size = self.path.stat().st_size
+
+    def write_lines(self, lines: List[str]) -> None:
+        if not lines:
+            return
+        data = "\n".join(lines) + "\n"
+        if self._size and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        self._f.write(data)
+        self._size += len(data)
+
+    def _rotate(self) -> None:
+        self._f.close()
+        for i in range(self.backups - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                src.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backups > 0:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        self._f = open(self.path, "w", encoding="utf-8", errors="replace")
+        self._size = 0
+
+    def flush(self) -> None:
+        self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class LogSink:
+    """
+    Thread-safe collector the engine threads write into. Lines are only
+    handed to the UI in batches via `drain()`, and every line (including the
+    ones that have scrolled out of the on-screen history) is spilled to an
+    optional rotating file.
+    """
+
+    def __init__(self, history: int = 20000):
+        self._lock = threading.Lock()
+        self._pending: List[LogLine] = []
+        self.history: Deque[LogLine] = deque(maxlen=history)
+        self._file: Optional[RotatingLogFile] = None
+        self.dropped = 0
+
+    def append(self, line: str) -> None:
+        entry = (classify(line), line)
+        with self._lock:
+            self._pending.append(entry)
+
+    def extend(self, lines: List[str]) -> None:
+        entries = [(classify(l), l) for l in lines]
+        with self._lock:
+            self._pending.extend(entries)
+
+    def open_file(self, path: Path, max_bytes: int = 5 * 1024 * 1024, backups: int = 3) -> None:
+        self.close_file()
+        self._file = RotatingLogFile(path, max_bytes, backups)
+
+    def close_file(self) -> None:
+        with self._lock:
+            pending_file, self._file = self._file, None
+        if pending_file is not None:
+            pending_file.close()
+
+    def drain(self) -> List[LogLine]:
+        with self._lock:
+            batch, self._pending = self._pending, []
+            f = self._file
+        if not batch:
+            return batch
+        overflow = len(self.history) + len(batch) - (self.history.maxlen or 0)
+        if overflow > 0:
+            self.dropped += overflow
+        self.history.extend(batch)
+        if f is not None:
+            try:
+                f.write_lines([l for _lvl, l in batch])
+                f.flush()
+            except (OSError, ValueError):
+                pass
+        return batch
+
+    def filtered(self, min_level: int) -> List[str]:
+        return [l for lvl, l in self.history if lvl >= min_level]
@@ -0,0 +1,102 @@
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Iterator, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class ByteLRU(Generic[K, V]):
+    """
+    Least-recently-used map bounded by the total "cost" of its values (usually
+    bytes) rather than by entry count. Thread-safe; `on_evict` runs outside the lock.
+    """
+
+    def __init__(
+        self,
+        budget: int,
+        cost: Callable[[V], int],
+        on_evict: Optional[Callable[[K, V], None]] = None,
+    ):
+        self.budget = budget
+        self._cost = cost
+        self._on_evict = on_evict
+        self._data: "OrderedDict[K, Tuple[V, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def peek(self, key: K) -> Optional[V]:
+        with self._lock:
+            item = self._data.get(key)
+            return item[0] if item is not None else None
+
+    def __contains__(self, key: K) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def put(self, key: K, value: V) -> bool:
+        """Insert/replace. Values larger than the whole budget are not cached."""
+        cost = max(0, int(self._cost(value)))
+        if cost > self.budget:
+            return False
+        evicted = []
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.used -= old[1]
+            self._data[key] = (value, cost)
+            self.used += cost
+            while self.used > self.budget and self._data:
+                k, (v, c) = self._data.popitem(last=False)
+                self.used -= c
+                evicted.append((k, v))
+        self._notify(evicted)
+        return True
+
+    def pop(self, key: K) -> Optional[V]:
+        with self._lock:
+            item = self._data.pop(key, None)
+            if item is None:
+                return None
+            self.used -= item[1]
+        self._notify([(key, item[0])])
+        return item[0]
+
+    def discard_where(self, pred: Callable[[K], bool]) -> int:
+        with self._lock:
+            keys = [k for k in self._data if pred(k)]
+            removed = []
+            for k in keys:
+                v, c = self._data.pop(k)
+                self.used -= c
+                removed.append((k, v))
+        self._notify(removed)
+        return len(removed)
+
+    def clear(self) -> None:
+        self.discard_where(lambda _k: True)
+
+    def keys(self) -> Iterator[K]:
+        with self._lock:
+            return iter(list(self._data.keys()))
+
+    def _notify(self, items) -> None:
+        if self._on_evict is not None:
+            for k, v in items:
+                self._on_evict(k, v)
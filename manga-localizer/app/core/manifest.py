@@ -0,0 +1,176 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+from app.core.archive import PageStat, open_page, stat_page
+from app.core.config import EngineConfig
+
+if TYPE_CHECKING:
+    from app.core.journal import DoneRecord
+
+MANIFEST_NAME = ".mlui-manifest.json"
+MANIFEST_VERSION = 1
+
+# EngineConfig fields that don't change what the engine writes.
+_NON_OUTPUT_FIELDS = {
+    "python_exe",
+    "verbose",
+    "overwrite",
+    "incremental",
+    "persistent_engine",
+    "engine_idle_timeout",
+    "stage_cache",
+    "stage_cache_gb",
+    "normalize_cache_gb",
+    "shards",
+    "threads_per_shard",
+    "pin_shards",
+    "shard_ram_gb",
+}
+
+
+def file_hash(path: Path, chunk: int = 1 << 20) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with open_page(path) as f:  # a file, or an entry of a CBZ / ZIP
+        while True:
+            buf = f.read(chunk)
+            if not buf:
+                break
+            h.update(buf)
+    return h.hexdigest()
+
+
+def settings_hash(cfg: EngineConfig) -> str:
+    """Hash of everything that affects engine output: EngineConfig + mit-config.json contents."""
+    data = cfg.model_dump()
+    for k in _NON_OUTPUT_FIELDS:
+        data.pop(k, None)
+
+    cfg_file = (getattr(cfg, "config_file", "") or "").strip()
+    config_text = ""
+    if cfg_file:
+        p = Path(cfg_file).expanduser()
+        try:
+            # Canonicalize so whitespace/key order edits don't invalidate every page.
+            config_text = json.dumps(json.loads(p.read_text(encoding="utf-8")), sort_keys=True)
+        except (OSError, ValueError):
+            config_text = p.read_text(encoding="utf-8", errors="replace") if p.exists() else ""
+
+    blob = json.dumps({"engine": data, "config": config_text}, sort_keys=True)
+    return hashlib.blake2b(blob.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class PageEntry:
+    hash: str
+    size: int
+    mtime_ns: int
+    settings: str
+    output: str
+    crc: int = -1  # CRC-32 of a page inside a CBZ / ZIP; -1 for plain files
+
+
+@dataclass
+class IncrementalPlan:
+    todo: List[Path] = field(default_factory=list)
+    unchanged: List[Path] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    settings: str = ""
+    # content hashes computed while planning, reused when recording results
+    hashes: Dict[str, "tuple[str, int, int]"] = field(default_factory=dict)
+    crcs: Dict[str, int] = field(default_factory=dict)  # archived pages only
+
+
+class Manifest:
+    """Per-output-folder record of which input content produced which output, under which settings."""
+
+    def __init__(self, output_folder: Path):
+        self.output_folder = Path(output_folder)
+        self.path = self.output_folder / MANIFEST_NAME
+        self.pages: Dict[str, PageEntry] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") != MANIFEST_VERSION:
+                return
+            self.pages = {name: PageEntry(**e) for name, e in (data.get("pages") or {}).items()}
+        except Exception:
+            # Corrupted manifest: treat as empty, everything gets re-run once.
+            self.pages = {}
+
+    def save(self) -> None:
+        self.output_folder.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        data = {"version": MANIFEST_VERSION, "pages": {k: asdict(v) for k, v in sorted(self.pages.items())}}
+        tmp.write_text(json.dumps(data, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def _hash_of(self, page: Path, st: "os.stat_result | PageStat") -> str:
+        e = self.pages.get(page.name)
+        if e and e.size == st.st_size and e.mtime_ns == st.st_mtime_ns and e.crc == getattr(st, "crc", -1):
+            return e.hash  # stat unchanged: skip re-reading the file
+        return file_hash(page)
+
+    def plan(self, pages: List[Path], settings: str, delete_stale: bool = True) -> IncrementalPlan:
+        plan = IncrementalPlan(settings=settings)
+        names = set()
+        for p in pages:
+            names.add(p.name)
+            st = stat_page(p)
+            h = self._hash_of(p, st)
+            plan.hashes[p.name] = (h, st.st_size, st.st_mtime_ns)
+            if getattr(st, "crc", -1) >= 0:
+                plan.crcs[p.name] = st.crc
+
+            e = self.pages.get(p.name)
+            out = self.output_folder / p.name
+            if e and e.hash == h and e.settings == settings and out.exists():
+                plan.unchanged.append(p)
+            else:
+                plan.todo.append(p)
+
+        for name in sorted(set(self.pages) - names):
+            plan.removed.append(name)
+            if delete_stale:
+                entry = self.pages.pop(name)
+                out = Path(entry.output) if entry.output else self.output_folder / name
+                try:
+                    out.unlink()
+                except FileNotFoundError:
+                    pass
+        return plan
+
+    def adopt(self, finished: Iterable["DoneRecord"], settings: str) -> int:
+        """Take over pages an interrupted run finished (see journal.recover) so they aren't redone."""
+        n = 0
+        for d in finished:
+            if d.input_hash and d.input_size >= 0:
+                out = self.output_folder / d.name
+                self.pages[d.name] = PageEntry(d.input_hash, d.input_size, d.input_mtime_ns, settings, str(out))
+                n += 1
+        return n
+
+    def record(self, plan: IncrementalPlan, since_ns: Optional[int] = None) -> int:
+        """Register pages from `plan.todo` whose output now exists (and was written after `since_ns`)."""
+        done = 0
+        for p in plan.todo:
+            out = self.output_folder / p.name
+            try:
+                ost = out.stat()
+            except FileNotFoundError:
+                self.pages.pop(p.name, None)
+                continue
+            if since_ns is not None and ost.st_mtime_ns < since_ns:
+                continue  # engine didn't rewrite it; leave for the next run
+            h, size, mtime_ns = plan.hashes[p.name]
+            self.pages[p.name] = PageEntry(h, size, mtime_ns, plan.settings, str(out), plan.crcs.get(p.name, -1))
+            done += 1
+        self.save()
+        return done
@@ -1,15 +1,53 @@
 from __future__ import annotations
 import os
 import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List
-from app.core.config import EngineConfig
+from typing import Callable, Dict, List, Optional
+from app.core.archive import is_archive, list_archive_pages, stat_page
+from app.core.config import EngineConfig, PackageConfig
+from app.core.engine_client import DAEMON_SCRIPT, EngineClient, EngineError
+from app.core.journal import DoneRecord, RunJournal, recover, remove_journal
+from app.core.manifest import IncrementalPlan, Manifest, settings_hash
+from app.core.normalize import NormalizeCache, NormalizeStats
+from app.core.packaging import Packager, archive_path
+from app.core.pages import list_pages
+from app.core.progress import PageFailed, PageFinished, PageStarted, ProgressParser
+from app.core.settings_store import data_dir
+from app.core.sharding import (
+    THREAD_BUDGET_ENV, cpu_sets, pin_process, resolve_shards, slot_share, split_round_robin, thread_budget, thread_env,
+)
+from app.core.staging import link_or_copy, make_staging_dir, remove_staging_dir
+from app.core.webtoon import SlicedPage, image_size, is_tall, remove_tile_outputs, slice_page, stitching_log
+
+LogFn = Callable[[str], None]
+
+CANCELLED = 130  # exit code of a run stopped through `cancel` (as for SIGINT)
 
 def build_mit_command(cfg: EngineConfig, input_folder: Path, output_folder: Path) -> List[str]:
+    return [cfg.python_exe, "-m", "manga_translator"] + build_mit_args(cfg, input_folder, output_folder)
+
+
+def build_oneshot_command(cfg: EngineConfig, input_folder: Path, output_folder: Path) -> List[str]:
+    """
+    The same run through engine_daemon.py, which sizes torch's and opencv's
+    thread pools first, or runs the stub engine for `engine_backend="stub"`.
+    """
+    engine_dir = str(getattr(cfg, "engine_dir", "") or "").strip()
+    cmd = [cfg.python_exe, str(DAEMON_SCRIPT), "--engine", cfg.engine_backend]
+    if engine_dir:
+        cmd += ["--engine-dir", str(Path(engine_dir).expanduser().resolve())]
+    return cmd + ["--oneshot"] + build_mit_args(cfg, input_folder, output_folder)
+
+
+def build_mit_args(cfg: EngineConfig, input_folder: Path, output_folder: Path) -> List[str]:
+    """Engine arguments without the interpreter prefix (shared by the CLI and the persistent worker)."""
     input_folder = Path(input_folder).expanduser().resolve()
     output_folder = Path(output_folder).expanduser().resolve()
 
-    cmd: List[str] = [cfg.python_exe, "-m", "manga_translator"]
+    cmd: List[str] = []
 
     if cfg.verbose:
         cmd.append("-v")
@@ -44,16 +82,281 @@ def build_mit_command(cfg: EngineConfig, input_folder: Path, output_folder: Path
     return cmd
 
 
-def run_mit_blocking(cfg: EngineConfig, input_folder: Path, output_folder: Path) -> int:
+@dataclass
+class RunPlan:
+    source_folder: Path
+    input_folder: Path             # what the engine reads (source folder or a staging subset)
+    output_folder: Path
+    pages: List[Path]              # pages the engine will process
+    all_pages: List[Path] = field(default_factory=list)
+    manifest: Optional[Manifest] = None
+    incremental: Optional[IncrementalPlan] = None
+    staging: Optional[Path] = None
+    shard_staging: List[Path] = field(default_factory=list)
+    started_ns: int = 0
+    settings: str = ""
+    journal: Optional[RunJournal] = None
+    recovered: List[DoneRecord] = field(default_factory=list)  # finished by an interrupted run, skipped now
+    resumed: int = 0
+    discarded: List[str] = field(default_factory=list)         # partial outputs deleted
+    slices: Dict[str, SlicedPage] = field(default_factory=dict)  # page name -> its tiles (in `staging`)
+    normalized: Optional[NormalizeStats] = None
+
+    @property
+    def skipped(self) -> int:
+        return len(self.all_pages) - len(self.pages)
+
+    @property
+    def removed(self) -> List[str]:
+        return self.incremental.removed if self.incremental else []
+
+    def summary(self) -> str:
+        parts = [f"{len(self.pages)} to process", f"{self.skipped} unchanged"]
+        if self.resumed:
+            parts.append(f"{self.resumed} recovered from an interrupted run")
+        if self.discarded:
+            parts.append(f"{len(self.discarded)} partial outputs discarded")
+        if self.removed:
+            parts.append(f"{len(self.removed)} stale outputs removed")
+        if self.normalized is not None:
+            parts.append(self.normalized.summary())
+        if self.slices:
+            tiles = sum(len(s.tiles) for s in self.slices.values())
+            parts.append(f"{len(self.slices)} long strips cut into {tiles} tiles")
+        return ", ".join(parts)
+
+    def engine_inputs(self, pages: List[Path]) -> List[Path]:
+        """What the engine gets for `pages`: their staged (possibly normalized) copy, or a long strip's tiles."""
+        if self.staging is None:
+            return list(pages)
+        out: List[Path] = []
+        for p in pages:
+            sliced = self.slices.get(p.name)
+            out += sliced.tile_paths(self.staging) if sliced is not None else [self.staging / p.name]
+        return out
+
+    def finish(self) -> int:
+        """Record finished pages in the manifest and drop the staging folder. Returns pages recorded."""
+        done = 0
+        try:
+            if self.journal is not None:
+                # Pages cut off mid-write (engine killed or crashed) must not be recorded as done.
+                self.discarded += self.journal.discard_partial()
+            for sliced in self.slices.values():
+                remove_tile_outputs(sliced, self.output_folder)  # tiles of strips that never got stitched
+            if self.manifest is not None and self.incremental is not None:
+                done = self.manifest.record(self.incremental, since_ns=self.started_ns)
+        finally:
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
+            elif self.recovered:
+                remove_journal(self.output_folder)  # nothing was left to run after recovering
+            self.discard()
+        return done
+
+    def discard(self) -> None:
+        """Drop the staging folders of a plan that is not going to run (the manifest is left alone)."""
+        remove_staging_dir(self.staging)
+        self.staging = None
+        for stage in self.shard_staging:
+            remove_staging_dir(stage)
+        self.shard_staging = []
+
+
+def prepare_run(cfg: EngineConfig, input_folder: Path, output_folder: Path,
+                on_log: Optional[LogFn] = None) -> RunPlan:
+    """
+    Decide which pages need the engine. With `cfg.incremental`, pages whose content
+    and effective settings match the output manifest are skipped and only the rest
+    are staged into a temporary input folder. Slow preparation steps are announced
+    on `on_log`; call this off the GUI thread.
+    """
+    input_folder = Path(input_folder).expanduser().resolve()
     output_folder = Path(output_folder).expanduser().resolve()
     output_folder.mkdir(parents=True, exist_ok=True)
+    packed = is_archive(input_folder)
+    pages = list_archive_pages(input_folder) if packed else list_pages(input_folder)
+
+    settings = settings_hash(cfg)
+    plan = RunPlan(input_folder, input_folder, output_folder, pages, all_pages=pages, started_ns=time.time_ns(),
+                   settings=settings)
+    # A journal left behind means the last run here was interrupted: drop its half-written
+    # outputs and keep the pages it verifiably finished.
+    state, rec = recover(output_folder)
+    plan.discarded = rec.discarded
+    if state is not None and state.settings == settings:
+        plan.recovered = rec.verified
+
+    if not cfg.incremental:
+        if plan.recovered:
+            finished = {d.name: d for d in plan.recovered}
+            keep = []
+            for p in pages:
+                d = finished.get(p.name)
+                st = stat_page(p)
+                if d is None or (d.input_size, d.input_mtime_ns) != (st.st_size, st.st_mtime_ns):
+                    keep.append(p)
+            plan.resumed = len(pages) - len(keep)
+            plan.pages = keep
+            if keep and plan.resumed:
+                plan.staging = make_staging_dir(keep)
+                plan.input_folder = plan.staging
+    else:
+        plan.manifest = Manifest(output_folder)
+        plan.resumed = plan.manifest.adopt(plan.recovered, settings)
+        plan.incremental = plan.manifest.plan(pages, settings)
+        plan.manifest.save()
+        plan.pages = list(plan.incremental.todo)
+        if plan.pages and len(plan.pages) < len(pages):
+            plan.staging = make_staging_dir(plan.pages)
+            plan.input_folder = plan.staging
 
+    if packed and plan.staging is None and plan.pages:
+        # Only the pages that are going to run are extracted, and only into staging.
+        if on_log is not None:
+            on_log(f"Extracting {len(plan.pages)} pages from {input_folder.name}...")
+        plan.staging = make_staging_dir(plan.pages)
+        plan.input_folder = plan.staging
+    if cfg.normalize_inputs and plan.pages:
+        _normalize_pages(cfg, plan, on_log)
+    if cfg.slice_tall:
+        _slice_tall_pages(cfg, plan)
+    return plan
+
+
+def _staged(plan: RunPlan, page: Path) -> Path:
+    """The copy of `page` the engine will read."""
+    return plan.staging / page.name if plan.staging is not None else page
+
+
+def _normalize_pages(cfg: EngineConfig, plan: RunPlan, on_log: Optional[LogFn] = None) -> None:
+    """Swap pages that need it for normalized copies from the cache (see normalize.py)."""
+    cache = NormalizeCache(data_dir("normalized"), int(cfg.normalize_cache_gb * 1e9))
+    todo = cache.select([_staged(plan, p) for p in plan.pages], cfg.normalize_short_side)
+    if not todo:
+        return
+    if plan.staging is None:
+        plan.staging = make_staging_dir(plan.pages)
+        plan.input_folder = plan.staging
+    hashes = plan.incremental.hashes if plan.incremental is not None else None
+    if on_log is not None:
+        on_log(f"Normalizing {len(todo)} pages...")
+    plan.normalized = cache.stage(todo, plan.staging, cfg.normalize_short_side, hashes)
+
+
+def _slice_tall_pages(cfg: EngineConfig, plan: RunPlan) -> None:
+    """Swap long strips in the engine input for tiles (see webtoon.py); staging is created if needed."""
+    tall = []
+    for p in plan.pages:
+        try:
+            w, h = image_size(_staged(plan, p))
+        except Exception:
+            continue  # unreadable: let the engine report it
+        if is_tall(w, h, cfg.slice_height):
+            tall.append(p)
+    if not tall:
+        return
+    if plan.staging is None:
+        plan.staging = make_staging_dir([p for p in plan.pages if p not in tall])
+        plan.input_folder = plan.staging
+    for p in tall:
+        staged = plan.staging / p.name
+        sliced = slice_page(staged if staged.exists() else p, plan.staging, cfg.slice_height, cfg.slice_overlap)
+        if sliced is None:
+            if not staged.exists():
+                link_or_copy(p, staged)
+            continue
+        if staged.exists():
+            staged.unlink()
+        remove_tile_outputs(sliced, plan.output_folder)  # left over by an interrupted run
+        plan.slices[p.name] = sliced
+
+
+def engine_env(api_key: str = "", extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
     env = os.environ.copy()
     env["PYTHONUTF8"] = "1"
     env["PYTHONIOENCODING"] = "utf-8"
+    if api_key:
+        env["OPENAI_API_KEY"] = api_key
+    env.update(extra or {})
+    return env
+
+
+@dataclass
+class ShardLayout:
+    shards: int
+    threads: int                       # 0 = leave the engine's own defaults alone
+    cpus: List[Optional[List[int]]]
+
+
+def shard_layout(cfg: EngineConfig, pages: Optional[int] = None, slot: int = 0, slots: int = 1) -> ShardLayout:
+    """
+    Shard count and per-shard thread budget. Computed without the page cap when
+    `pages` is None so warm workers can be reused across chapters of any size.
+    With `slots` runs going at once (queue concurrency), run `slot` is sized
+    for, and pinned to, its share of the cores and RAM.
+    """
+    cap = pages if pages is not None else 1 << 16
+    if slots <= 1:
+        n = resolve_shards(cfg.shards, cap, cfg.shard_ram_gb)
+        if n <= 1 and cfg.threads_per_shard <= 0:
+            return ShardLayout(1, 0, [None])
+        threads = thread_budget(n, cfg.threads_per_shard)
+        cpus = cpu_sets(n, threads) if cfg.pin_shards else [None] * n
+        return ShardLayout(n, threads, cpus)
+    first, cores, ram = slot_share(slot, slots)
+    n = resolve_shards(cfg.shards, cap, cfg.shard_ram_gb, cores=cores, ram_bytes=ram)
+    threads = thread_budget(n, cfg.threads_per_shard, cores=cores)  # never the engine default (all cores)
+    cpus = cpu_sets(n, threads, first=first) if cfg.pin_shards else [None] * n
+    return ShardLayout(n, threads, cpus)
+
+
+def make_engine_client(
+    cfg: EngineConfig,
+    api_key: str = "",
+    threads: int = 0,
+    cpus: Optional[List[int]] = None,
+) -> EngineClient:
+    env = {"OPENAI_API_KEY": api_key} if api_key else {}
+    if threads:
+        env.update(thread_env(threads))
+    engine_dir = Path(getattr(cfg, "engine_dir", "") or "").expanduser()
+    extra: List[str] = []
+    if cfg.stage_cache:
+        # One cache for all workers and folders: entries are keyed by page content, not path.
+        extra += ["--stage-cache", str(data_dir("stage-cache")), "--stage-cache-gb", str(cfg.stage_cache_gb)]
+    return EngineClient(
+        cfg.python_exe,
+        engine_dir=str(engine_dir.resolve()) if str(engine_dir).strip() else "",
+        engine=cfg.engine_backend,
+        idle_timeout=cfg.engine_idle_timeout,
+        env=env,
+        extra_args=extra,
+        cpus=cpus,
+    )
 
+
+def make_engine_clients(cfg: EngineConfig, api_key: str = "", slot: int = 0, slots: int = 1) -> List[EngineClient]:
+    layout = shard_layout(cfg, slot=slot, slots=slots)
+    return [make_engine_client(cfg, api_key, layout.threads, layout.cpus[i]) for i in range(layout.shards)]
+
+
+def run_engine_process(
+    cfg: EngineConfig,
+    input_folder: Path,
+    output_folder: Path,
+    on_log: LogFn = print,
+    env: Optional[Dict[str, str]] = None,
+    cpus: Optional[List[int]] = None,
+    cancel: Optional[threading.Event] = None,
+) -> int:
+    """One-shot `python -m manga_translator` run (cold start). Setting `cancel` terminates it."""
     engine_dir = Path(getattr(cfg, "engine_dir", "") or "").expanduser().resolve()
-    cmd = build_mit_command(cfg, input_folder, output_folder)
+    if cfg.engine_backend == "stub" or (env is not None and env.get(THREAD_BUDGET_ENV) and DAEMON_SCRIPT.exists()):
+        cmd = build_oneshot_command(cfg, input_folder, output_folder)
+    else:
+        cmd = build_mit_command(cfg, input_folder, output_folder)
 
     proc = subprocess.Popen(
         cmd,
@@ -63,11 +366,209 @@ def run_mit_blocking(cfg: EngineConfig, input_folder: Path, output_folder: Path)
         text=True,
         encoding="utf-8",
         errors="replace",
-        env=env,
+        env=env if env is not None else engine_env(),
     )
+    pin_process(proc.pid, cpus)
+    if cancel is not None:
+        def watch() -> None:
+            while proc.poll() is None:
+                if cancel.wait(0.25):
+                    proc.terminate()
+                    return
+        threading.Thread(target=watch, daemon=True).start()
 
     assert proc.stdout is not None
     for line in proc.stdout:
-        print(line.rstrip())
+        on_log(line.rstrip())
 
     return proc.wait()
+
+
+def _run_shard(
+    cfg: EngineConfig,
+    input_folder: Path,
+    output_folder: Path,
+    on_log: LogFn,
+    client: Optional[EngineClient],
+    env: Dict[str, str],
+    cpus: Optional[List[int]],
+    cancel: Optional[threading.Event] = None,
+) -> int:
+    if client is not None:
+        try:
+            args = build_mit_args(cfg, input_folder, output_folder)
+            return client.run(args, input_folder, output_folder, on_log=on_log, cancel=cancel)
+        except (EngineError, OSError) as e:
+            if cancel is not None and cancel.is_set():
+                on_log("Cancelled.")
+                return CANCELLED
+            on_log(f"Persistent engine unavailable ({e}); falling back to a one-shot process.")
+    if cancel is not None and cancel.is_set():
+        return CANCELLED
+    return run_engine_process(cfg, input_folder, output_folder, on_log, env=env, cpus=cpus, cancel=cancel)
+
+
+def _journaled(on_log: LogFn, journal: RunJournal) -> LogFn:
+    """Wrap `on_log` so page starts / finishes are written to the run journal as they are logged."""
+    parser = ProgressParser()
+
+    def emit(line: str) -> None:
+        for ev in parser.feed(line):
+            if isinstance(ev, PageStarted):
+                journal.started(ev.name)
+            elif isinstance(ev, PageFinished):
+                journal.finished(ev.name)
+            elif isinstance(ev, PageFailed):
+                journal.failed(ev.name)
+        on_log(line)
+
+    return emit
+
+
+def _packaging(on_log: LogFn, packager: Packager) -> LogFn:
+    """Wrap `on_log` so each page is handed to the packager as soon as its output is saved."""
+    parser = ProgressParser()
+
+    def emit(line: str) -> None:
+        on_log(line)
+        for ev in parser.feed(line):
+            if isinstance(ev, PageFinished):
+                packager.page_ready(ev.name)
+
+    return emit
+
+
+def _start_packager(plan: RunPlan, package: PackageConfig) -> Optional[Packager]:
+    names = [p.name for p in plan.all_pages]
+    if not plan.pages:
+        # Nothing ran: only repack if an output is newer than the archive.
+        try:
+            packed = archive_path(plan.output_folder, package).stat().st_mtime_ns
+            outputs = [plan.output_folder / n for n in names]
+            if packed >= max(o.stat().st_mtime_ns for o in outputs if o.exists()):
+                return None
+        except (OSError, ValueError):
+            pass
+    todo = {p.name for p in plan.pages}
+    return Packager(plan.output_folder, names, package, ready=[n for n in names if n not in todo])
+
+
+def execute_plan(
+    cfg: EngineConfig,
+    plan: RunPlan,
+    on_log: LogFn = print,
+    clients: Optional[List[EngineClient]] = None,
+    api_key: str = "",
+    cancel: Optional[threading.Event] = None,
+    package: Optional[PackageConfig] = None,
+    slot: int = 0,
+    slots: int = 1,
+) -> int:
+    """
+    Run the engine over `plan.pages`. With more than one shard, pages are split
+    round-robin into per-shard staging folders, each processed by its own engine
+    process (with its own thread budget) writing into the shared output folder.
+    Log lines from all shards are merged into `on_log`. Setting `cancel` stops
+    the engine processes; the run then returns CANCELLED. `slot` / `slots`
+    size the run for its share of the machine (see shard_layout).
+
+    With `package.enabled`, the chapter's outputs are re-encoded and packed
+    into an archive while the run goes on (see packaging.py); the archive is
+    only written if the run succeeds.
+    """
+    packager = _start_packager(plan, package) if package is not None and package.enabled else None
+    code = 1
+    try:
+        code = _execute(cfg, plan, on_log if packager is None else _packaging(on_log, packager),
+                        clients, api_key, cancel, slot, slots)
+    finally:
+        if packager is not None:
+            if code != 0:
+                packager.abort()
+                on_log(f"Not packaged: the run ended with code {code}.")
+            else:
+                try:
+                    on_log(packager.close().summary())
+                except Exception as e:
+                    on_log(f"Packaging failed: {e}")
+    return code
+
+
+def _execute(
+    cfg: EngineConfig,
+    plan: RunPlan,
+    on_log: LogFn,
+    clients: Optional[List[EngineClient]],
+    api_key: str,
+    cancel: Optional[threading.Event],
+    slot: int = 0,
+    slots: int = 1,
+) -> int:
+    if not plan.pages:
+        return 0
+
+    if plan.journal is None:
+        hashes = plan.incremental.hashes if plan.incremental is not None else None
+        plan.journal = RunJournal(plan.output_folder, plan.settings, plan.pages, hashes, carried=plan.recovered)
+    on_log = _journaled(on_log, plan.journal)
+    if plan.slices:
+        on_log = stitching_log(on_log, plan.slices, plan.output_folder)
+
+    layout = shard_layout(cfg, len(plan.pages), slot, slots)
+    clients = list(clients or [])
+    if cfg.stage_cache and not clients:
+        on_log("Stage cache needs the persistent engine; running the full pipeline.")
+
+    if layout.shards <= 1:
+        env = engine_env(api_key, thread_env(layout.threads) if layout.threads else None)
+        client = clients[0] if clients else None
+        code = _run_shard(cfg, plan.input_folder, plan.output_folder, on_log, client, env, layout.cpus[0], cancel)
+        return CANCELLED if cancel is not None and cancel.is_set() else code
+
+    groups = split_round_robin(plan.pages, layout.shards)
+    on_log(f"Sharded run: {len(groups)} engine processes x {layout.threads} threads")
+
+    lock = threading.Lock()
+    codes: List[int] = [1] * len(groups)
+
+    def shard_log(i: int) -> LogFn:
+        def emit(line: str) -> None:
+            with lock:
+                on_log(f"[shard {i + 1}] {line}")
+        return emit
+
+    def work(i: int, group: List[Path]) -> None:
+        stage = make_staging_dir(plan.engine_inputs(group), prefix=f"mlui-shard{i + 1}-")
+        plan.shard_staging.append(stage)
+        env = engine_env(api_key, thread_env(layout.threads))
+        client = clients[i] if i < len(clients) else None
+        try:
+            codes[i] = _run_shard(cfg, stage, plan.output_folder, shard_log(i), client, env, layout.cpus[i], cancel)
+        except Exception as e:
+            shard_log(i)(f"Shard failed: {e}")
+        finally:
+            remove_staging_dir(stage)
+
+    threads = [threading.Thread(target=work, args=(i, g), daemon=True) for i, g in enumerate(groups)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    if cancel is not None and cancel.is_set():
+        return CANCELLED
+    return next((c for c in codes if c != 0), 0)
+
+
+def run_mit_blocking(
+    cfg: EngineConfig,
+    input_folder: Path,
+    output_folder: Path,
+    client: Optional[EngineClient] = None,
+) -> int:
+    plan = prepare_run(cfg, input_folder, output_folder, print)
+    print(f"Plan: {plan.summary()}")
+    try:
+        return execute_plan(cfg, plan, print, clients=[client] if client else None)
+    finally:
+        plan.finish()
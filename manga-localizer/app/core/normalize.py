@@ -0,0 +1,165 @@
+from __future__ import annotations
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.manifest import file_hash
+from app.core.staging import link_or_copy
+
+NORMALIZE_VERSION = 1   # bump when normalize_page's output changes
+_EXIF_ORIENTATION = 0x0112
+
+
+def needs_normalizing(path: Path, short_side: int) -> bool:
+    """Header-only check: odd colour mode, rotated by EXIF, or bigger than the engine needs."""
+    from PIL import Image
+
+    with Image.open(path) as im:
+        if im.mode not in ("RGB", "L"):
+            return True
+        if short_side and min(im.size) > short_side:
+            return True
+        return im.getexif().get(_EXIF_ORIENTATION, 1) != 1
+
+
+def normalize_page(src: str, dst: str, short_side: int) -> int:
+    """
+    Runs in a worker process. Applies the EXIF rotation, converts to RGB (or
+    keeps greyscale), scales the shorter side down to `short_side` and writes
+    a PNG without metadata. Returns the size written.
+    """
+    from PIL import Image, ImageOps
+
+    dst_p = Path(dst)
+    dst_p.parent.mkdir(parents=True, exist_ok=True)
+    with Image.open(src) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.mode in ("RGBA", "LA", "PA") or (im.mode == "P" and "transparency" in im.info):
+            rgba = im.convert("RGBA")
+            im = Image.new("RGB", rgba.size, (255, 255, 255))
+            im.paste(rgba, mask=rgba.getchannel("A"))
+        elif im.mode in ("I", "I;16", "I;16B", "F"):
+            im = im.convert("I").point(lambda v: v * (1 / 256)).convert("L")
+        elif im.mode not in ("RGB", "L"):
+            im = im.convert("RGB")  # CMYK, YCbCr, palette
+        w, h = im.size
+        if short_side and min(w, h) > short_side:
+            scale = short_side / min(w, h)
+            im = im.resize((max(1, round(w * scale)), max(1, round(h * scale))), Image.Resampling.LANCZOS)
+        tmp = dst_p.with_suffix(f".{os.getpid()}.tmp")
+        im.save(tmp, "PNG", compress_level=3)  # no exif= / icc_profile=: metadata is dropped
+    os.replace(tmp, dst_p)
+    return dst_p.stat().st_size
+
+
+@dataclass
+class NormalizeStats:
+    normalized: int = 0     # pages converted in this run
+    reused: int = 0         # pages found in the cache
+    input_bytes: int = 0
+    staged_bytes: int = 0
+
+    def summary(self) -> str:
+        return f"{self.normalized + self.reused} pages normalized ({self.reused} cached)"
+
+
+class NormalizeCache:
+    """
+    Normalized copies of input pages (default ~/.manga_localizer_ui/normalized),
+    keyed by page content and normalization settings, so a rerun or a renamed
+    folder reuses them. Least recently used entries are evicted past
+    `max_bytes`; misses are converted in a process pool.
+    """
+
+    def __init__(self, root: Path, max_bytes: int, workers: Optional[int] = None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.workers = workers or os.cpu_count() or 1
+
+    def entry(self, content_hash: str, short_side: int) -> Path:
+        h = hashlib.blake2b(f"{NORMALIZE_VERSION}|{content_hash}|{short_side}".encode(), digest_size=16).hexdigest()
+        return self.root / h[:2] / f"{h}.png"
+
+    def select(self, pages: Iterable[Path], short_side: int) -> List[Path]:
+        """Pages that need normalizing; the rest go to the engine as they are."""
+        out = []
+        for p in pages:
+            try:
+                if needs_normalizing(p, short_side):
+                    out.append(p)
+            except Exception:
+                pass  # unreadable: let the engine report it
+        return out
+
+    def stage(self, pages: List[Path], stage_dir: Path, short_side: int,
+              hashes: Optional[Dict[str, Tuple[str, int, int]]] = None) -> NormalizeStats:
+        """
+        Put normalized versions of `pages` into `stage_dir` under their original
+        names (replacing what is there). The engine opens images by content, so a
+        page keeps its name (and output name) even though it is now a PNG.
+        """
+        stats = NormalizeStats()
+        hashes = hashes or {}
+        entries: List[Tuple[Path, Path]] = []
+        misses: List[Tuple[Path, Path]] = []
+        for p in pages:
+            h = hashes.get(p.name, ("", 0, 0))[0] or file_hash(p)
+            dst = self.entry(h, short_side)
+            entries.append((p, dst))
+            if dst.exists():
+                os.utime(dst)  # recency for eviction
+                stats.reused += 1
+            else:
+                misses.append((p, dst))
+
+        if misses:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(misses))) as pool:
+                futures = [pool.submit(normalize_page, str(src), str(dst), short_side) for src, dst in misses]
+                for (src, _dst), fut in zip(misses, futures):
+                    try:
+                        fut.result()
+                        stats.normalized += 1
+                    except Exception:
+                        pass  # left as is below; the engine gets the original page
+
+        for p, dst in entries:
+            if not dst.exists():
+                continue
+            staged = Path(stage_dir) / p.name
+            if staged.exists() or staged.is_symlink():
+                staged.unlink()
+            link_or_copy(dst, staged)
+            stats.input_bytes += p.stat().st_size
+            stats.staged_bytes += dst.stat().st_size
+        # Staged pages may be symlinks into the cache (see link_or_copy): never evict them here.
+        self.trim(keep=[dst for _p, dst in entries])
+        return stats
+
+    def trim(self, keep: Iterable[Path] = ()) -> int:
+        """Evict least recently used entries, other than `keep`, until the cache fits; returns bytes freed."""
+        keep = set(keep)
+        entries = []
+        total = 0
+        for p in self.root.glob("*/*.png"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        freed = 0
+        for _mtime, size, p in sorted(entries):
+            if total - freed <= self.max_bytes:
+                break
+            if p in keep:
+                continue
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            freed += size
+        return freed
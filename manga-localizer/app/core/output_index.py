@@ -0,0 +1,79 @@
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import Iterable, Optional, Set, Tuple
+
+from app.core.pages import IMAGE_EXTS
+
+
+class OutputIndex:
+    """
+    In-memory set of translated output file names for one output folder,
+    built with a single `os.scandir` and then kept current incrementally
+    (`add`/`discard` from engine events, `sync` after a directory-change
+    notification). `done` is maintained as a running count over the expected
+    page names, so badge and per-page lookups are O(1).
+    """
+
+    def __init__(self, folder: Optional[Path] = None):
+        self.folder: Optional[Path] = None
+        self.present: Set[str] = set()
+        self.expected: Set[str] = set()
+        self.done = 0
+        if folder is not None:
+            self.reset(folder)
+
+    @staticmethod
+    def _scan(folder: Path) -> Set[str]:
+        names: Set[str] = set()
+        try:
+            with os.scandir(folder) as it:
+                for e in it:
+                    if os.path.splitext(e.name)[1].lower() in IMAGE_EXTS and e.is_file():
+                        names.add(e.name)
+        except FileNotFoundError:
+            pass
+        return names
+
+    def reset(self, folder: Path) -> None:
+        self.folder = Path(folder)
+        self.present = self._scan(self.folder)
+        self._recount()
+
+    def set_expected(self, names: Iterable[str]) -> None:
+        self.expected = set(names)
+        self._recount()
+
+    def _recount(self) -> None:
+        self.done = len(self.expected & self.present)
+
+    def has(self, name: str) -> bool:
+        return name in self.present
+
+    def add(self, name: str) -> bool:
+        if name in self.present:
+            return False
+        self.present.add(name)
+        if name in self.expected:
+            self.done += 1
+        return True
+
+    def discard(self, name: str) -> bool:
+        if name not in self.present:
+            return False
+        self.present.discard(name)
+        if name in self.expected:
+            self.done -= 1
+        return True
+
+    def sync(self) -> Tuple[Set[str], Set[str]]:
+        """Re-scan after a change notification; returns (added, removed) names."""
+        if self.folder is None:
+            return set(), set()
+        now = self._scan(self.folder)
+        added, removed = now - self.present, self.present - now
+        for n in added:
+            self.add(n)
+        for n in removed:
+            self.discard(n)
+        return added, removed
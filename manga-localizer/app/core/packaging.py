@@ -0,0 +1,149 @@
+from __future__ import annotations
+import io
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.core.config import PackageConfig
+
+_EXTS = {"webp": ".webp", "jpeg": ".jpg", "png": ".png"}
+
+
+def archive_path(output_folder: Path, package: PackageConfig) -> Path:
+    """`output/<chapter>.cbz` next to the chapter's output folder."""
+    output_folder = Path(output_folder)
+    return output_folder.parent / f"{output_folder.name}.{package.archive}"
+
+
+def encode_page(src: str, fmt: str, quality: int) -> "tuple[bytes, str]":
+    """Runs in a worker process: encoded bytes and extension for one output page."""
+    if fmt == "keep":
+        return Path(src).read_bytes(), Path(src).suffix.lower()
+    from PIL import Image
+
+    buf = io.BytesIO()
+    with Image.open(src) as im:
+        if im.mode not in ("RGB", "L"):
+            im = im.convert("RGB")
+        if fmt == "webp":
+            im.save(buf, "WEBP", quality=quality, method=2)  # ~3x faster than the default 4, ~5% larger
+        elif fmt == "jpeg":
+            im.save(buf, "JPEG", quality=quality, optimize=True, progressive=True)
+        else:
+            im.save(buf, "PNG", compress_level=6)
+    return buf.getvalue(), _EXTS[fmt]
+
+
+@dataclass
+class PackageResult:
+    archive: Path
+    pages: int
+    input_bytes: int
+    archive_bytes: int
+    seconds: float          # since the packager started (overlaps the run)
+    tail_seconds: float     # spent in close(), i.e. added after the run
+
+    def summary(self) -> str:
+        mb = 1024 * 1024
+        return (f"Packed {self.pages} pages into {self.archive.name}: {self.input_bytes / mb:.1f} MB -> "
+                f"{self.archive_bytes / mb:.1f} MB in {self.seconds:.1f} s ({self.tail_seconds:.1f} s after the run)")
+
+
+class Packager:
+    """
+    Re-encodes a chapter's output pages in a process pool and streams them
+    into a CBZ / ZIP in reading order.
+
+    Pages are submitted as soon as they are ready (`page_ready`, e.g. when the
+    engine saves one), so encoding overlaps the run; a writer thread appends
+    each entry as soon as it and every page before it are encoded. Nothing is
+    written besides the archive, which appears atomically on `close()`.
+    """
+
+    def __init__(self, output_folder: Path, names: List[str], package: PackageConfig,
+                 ready: Optional[List[str]] = None):
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.output_folder = Path(output_folder)
+        self.names = list(names)
+        self.package = package
+        self.archive = archive_path(self.output_folder, package)
+        self._tmp = self.archive.with_name(self.archive.name + ".part")
+        self._pool = ProcessPoolExecutor(max_workers=package.workers or os.cpu_count() or 1)
+        self._futures: Dict[str, Optional[Future]] = {}
+        self._cond = threading.Condition()
+        self._closing = False
+        self._aborted = False
+        self._started = time.perf_counter()
+        self._input_bytes = 0
+        self._pages = 0
+        self._error: Optional[BaseException] = None
+        self._writer = threading.Thread(target=self._write, name="package-writer", daemon=True)
+        self._writer.start()
+        for name in ready or ():
+            self.page_ready(name)
+
+    def page_ready(self, name: str) -> None:
+        with self._cond:
+            if name in self._futures or self._closing:
+                return
+            src = self.output_folder / name
+            self._futures[name] = (self._pool.submit(encode_page, str(src), self.package.format, self.package.quality)
+                                   if src.exists() else None)
+            self._cond.notify_all()
+
+    def _next(self, name: str) -> Optional[Future]:
+        with self._cond:
+            while name not in self._futures and not self._closing:
+                self._cond.wait()
+            return self._futures.get(name)
+
+    def _write(self) -> None:
+        width = max(3, len(str(len(self.names))))
+        try:
+            # Entries are already compressed images: store them.
+            with zipfile.ZipFile(self._tmp, "w", compression=zipfile.ZIP_STORED) as zf:
+                for i, name in enumerate(self.names, 1):
+                    fut = self._next(name)
+                    if self._aborted:
+                        return
+                    if fut is None:
+                        continue  # page has no output (failed): leave it out
+                    data, ext = fut.result()
+                    # Zero-padded names keep reading order in viewers that sort plainly.
+                    zf.writestr(f"{i:0{width}d}{ext}", data)
+                    self._input_bytes += (self.output_folder / name).stat().st_size
+                    self._pages += 1
+        except BaseException as e:
+            self._error = e
+
+    def close(self) -> PackageResult:
+        """Package whatever has not been marked ready yet (if its output exists) and finish the archive."""
+        closing = time.perf_counter()
+        for name in self.names:
+            self.page_ready(name)
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._writer.join()
+        self._pool.shutdown()
+        if self._error is not None:
+            self._tmp.unlink(missing_ok=True)
+            raise self._error
+        os.replace(self._tmp, self.archive)
+        now = time.perf_counter()
+        return PackageResult(self.archive, self._pages, self._input_bytes, self.archive.stat().st_size,
+                             now - self._started, now - closing)
+
+    def abort(self) -> None:
+        with self._cond:
+            self._aborted = self._closing = True
+            self._cond.notify_all()
+        self._pool.shutdown(cancel_futures=True)
+        self._writer.join()
+        self._tmp.unlink(missing_ok=True)
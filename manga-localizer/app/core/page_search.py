@@ -0,0 +1,184 @@
+from __future__ import annotations
+import re
+import unicodedata
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.core.pages import natural_key
+
+_EXT = re.compile(r"\.[A-Za-z0-9]{2,5}$")
+_SEP = re.compile(r"[\s_\-,()\[\]]+|(?<!\d)\.|\.(?!\d)")  # keeps decimal points ("12.5")
+_NUM = re.compile(r"\d+(?:\.\d+)?")
+_CHAPTER = re.compile(r"(?<![a-z])(?:chapter|chap|ch|c)\s*\.?\s*(\d+(?:\.\d+)?)")
+_PAGE = re.compile(r"(?<![a-z])(?:page|pg|p)\s*\.?\s*(\d+)")
+_VOLUME = re.compile(r"(?<![a-z])(?:volume|vol|v)\s*\.?\s*\d+")
+_PAIR = re.compile(r"^(\d+(?:\.\d+)?)[:/-](\d+)$")  # "12-5", "12:5", "12/5"
+
+
+def _fold(text: str) -> str:
+    s = unicodedata.normalize("NFKC", text).casefold()
+    return " ".join(_SEP.sub(" ", s).split())
+
+
+def normalize(name: str) -> str:
+    """Case-, width- and separator-insensitive form of a file name, without extension."""
+    return _fold(_EXT.sub("", name))
+
+
+def parse_numbers(norm: str) -> Tuple[Optional[float], Optional[int]]:
+    """
+    (chapter, page) parsed from a normalized name. Explicit markers win
+    ("ch12 p03", "c012_005"); otherwise, with two or more bare numbers, the
+    first is the chapter and the last the page, and a single number is the page.
+    """
+    chapter = page = None
+    m = _CHAPTER.search(norm)
+    if m:
+        chapter = float(m.group(1))
+    m = _PAGE.search(norm)
+    if m:
+        page = int(m.group(1))
+
+    rest = _PAGE.sub(" ", _CHAPTER.sub(" ", _VOLUME.sub(" ", norm)))
+    nums = _NUM.findall(rest)
+    if page is None and nums:
+        page = int(float(nums[-1]))
+        nums = nums[:-1]
+    if chapter is None and nums:
+        chapter = float(nums[0])
+    return chapter, page
+
+
+@dataclass
+class Query:
+    chapter: Optional[float] = None
+    page: Optional[int] = None
+    numbers: Tuple[int, ...] = ()  # bare numbers: match any number in the name
+    words: Tuple[str, ...] = ()    # substring, or fuzzy subsequence if nothing contains it
+
+    @property
+    def empty(self) -> bool:
+        return self.chapter is None and self.page is None and not self.numbers and not self.words
+
+
+def parse_query(text: str) -> Query:
+    """
+    "ch 12", "c12", "p5", "12-5" filter on parsed chapter/page numbers; bare
+    numbers match any number in the name; everything else is matched as text.
+    """
+    m = _PAIR.match(text.strip())
+    if m:
+        return Query(chapter=float(m.group(1)), page=int(m.group(2)))
+    q = Query()
+    norm = _fold(text)
+    m = _CHAPTER.search(norm)
+    if m:
+        q.chapter = float(m.group(1))
+        norm = norm[: m.start()] + " " + norm[m.end():]
+    m = _PAGE.search(norm)
+    if m:
+        q.page = int(m.group(1))
+        norm = norm[: m.start()] + " " + norm[m.end():]
+    numbers, words = [], []
+    for tok in norm.split():
+        (numbers if tok.isdigit() else words).append(tok)
+    q.numbers = tuple(int(n) for n in numbers)
+    q.words = tuple(words)
+    return q
+
+
+class SearchIndex:
+    """
+    Precomputed search data for a page list, in row order: normalized names,
+    natural-sort keys and parsed chapter/page numbers. Text matching runs one
+    substring test per name; the fuzzy fallback is one regex over all names
+    joined by newlines.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.norms: List[str] = []
+        self.keys: List[tuple] = []
+        self.chapters = array("d")  # NaN when unknown
+        self.pages = array("q")     # -1 when unknown
+        self._by_number: Dict[int, List[int]] = {}
+        self._haystack: Optional[str] = None
+        self._line_row: Dict[int, int] = {}
+        self._last: Tuple[str, List[int]] = ("", [])
+        self.extend(names)
+
+    def __len__(self) -> int:
+        return len(self.norms)
+
+    def extend(self, names: Iterable[str]) -> None:
+        for name in names:
+            row = len(self.norms)
+            norm = normalize(name)
+            chapter, page = parse_numbers(norm)
+            self.norms.append(norm)
+            self.keys.append(natural_key(name))
+            self.chapters.append(float("nan") if chapter is None else chapter)
+            self.pages.append(-1 if page is None else page)
+            for n in {int(float(x)) for x in _NUM.findall(norm)}:
+                self._by_number.setdefault(n, []).append(row)
+        self._haystack = None
+        self._last = ("", [])
+
+    def _ensure_haystack(self) -> str:
+        if self._haystack is None:
+            self._haystack = "\n".join(self.norms)
+            self._line_row = {}
+            pos = 0
+            for row, norm in enumerate(self.norms):
+                self._line_row[pos] = row
+                pos += len(norm) + 1
+        return self._haystack
+
+    def _rows_matching(self, pattern: str) -> List[int]:
+        hay = self._ensure_haystack()
+        line_row = self._line_row
+        # Patterns are anchored at "^", so each match starts a line, which maps to its row.
+        return [line_row[m.start()] for m in re.finditer(pattern, hay, re.MULTILINE)]
+
+    def _word_rows(self, word: str) -> List[int]:
+        rows = [i for i, norm in enumerate(self.norms) if word in norm]
+        if rows:
+            return rows
+        # Fuzzy: the word's characters in order. Negated classes instead of lazy
+        # dots, so a non-matching line fails without backtracking.
+        fuzzy = "".join(f"[^\\n{re.escape(c)}]*{re.escape(c)}" for c in word)
+        return self._rows_matching("^" + fuzzy)
+
+    def search(self, text: str) -> List[int]:
+        """Rows matching `text`, in row order. An empty query matches every row."""
+        text = (text or "").strip()
+        if not text:
+            return list(range(len(self)))
+        if self._last[0] == text:
+            return list(self._last[1])
+        q = parse_query(text)
+        if q.empty:
+            return list(range(len(self)))
+
+        candidates: Optional[List[int]] = None
+        for word in q.words:
+            candidates = self._narrow(candidates, self._word_rows(word))
+        for n in q.numbers:
+            candidates = self._narrow(candidates, self._by_number.get(n, []))
+        if candidates is None:
+            candidates = list(range(len(self)))
+        if q.chapter is not None:
+            ch, chapters = q.chapter, self.chapters
+            candidates = [r for r in candidates if chapters[r] == ch]
+        if q.page is not None:
+            pg, pages = q.page, self.pages
+            candidates = [r for r in candidates if pages[r] == pg]
+        self._last = (text, candidates)
+        return list(candidates)
+
+    @staticmethod
+    def _narrow(current: Optional[List[int]], rows: Sequence[int]) -> List[int]:
+        if current is None:
+            return list(rows)
+        keep: Set[int] = set(rows)
+        return [r for r in current if r in keep]
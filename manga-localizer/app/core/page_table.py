@@ -0,0 +1,99 @@
+from __future__ import annotations
+import os
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.core.archive import is_archive, open_archive
+from app.core.pages import IMAGE_EXTS, natural_key
+
+# Per-page status codes (stored one byte per page).
+ST_NONE, ST_DONE, ST_RUNNING, ST_FAILED = 0, 1, 2, 3
+STATUS_MARKS = {ST_NONE: "", ST_DONE: "✓", ST_RUNNING: "⏳", ST_FAILED: "✗"}
+
+PageRecord = Tuple[str, int, int]  # (name, size, mtime_ns)
+
+
+class PageTable:
+    """
+    Compact, array-backed table of the pages in one folder: parallel arrays of
+    name / size / mtime / status instead of one Python object per page, so
+    10k-page webtoon dumps stay cheap to hold and to index.
+    """
+
+    __slots__ = ("folder", "names", "sizes", "mtimes", "status", "notes", "_row")
+
+    def __init__(self, folder: Optional[Path] = None):
+        self.folder = Path(folder) if folder is not None else None
+        self.names: List[str] = []
+        self.sizes = array("q")
+        self.mtimes = array("q")
+        self.status = bytearray()
+        self.notes: Dict[int, str] = {}  # sparse per-row tooltip text
+        self._row: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def extend(self, records: List[PageRecord]) -> Tuple[int, int]:
+        """Append records; returns the (first, last) row range that was added."""
+        first = len(self.names)
+        for name, size, mtime in records:
+            self._row[name] = len(self.names)
+            self.names.append(name)
+            self.sizes.append(size)
+            self.mtimes.append(mtime)
+        self.status.extend(bytes(len(records)))
+        return first, len(self.names) - 1
+
+    def row_of(self, name: str) -> int:
+        return self._row.get(name, -1)
+
+    def path(self, row: int) -> Path:
+        assert self.folder is not None
+        return self.folder / self.names[row]
+
+    def paths(self) -> List[Path]:
+        assert self.folder is not None
+        return [self.folder / n for n in self.names]
+
+    def set_status(self, row: int, code: int, note: str = "") -> None:
+        self.status[row] = code
+        if note:
+            self.notes[row] = note
+        else:
+            self.notes.pop(row, None)
+
+
+def iter_page_batches(folder: Path, batch: int = 1000) -> Iterator[List[PageRecord]]:
+    """
+    Enumerate `folder` in reading (natural) order, yielding stat'ed records in batches so
+    the first rows can be shown while the rest of a large folder is still being read.
+    A CBZ / ZIP is listed from its central directory, without extracting anything.
+    """
+    if is_archive(folder):
+        records = []
+        with open_archive(folder) as arc:
+            for name in arc.names():
+                st = arc.stat(name)
+                records.append((name, st.st_size, st.st_mtime_ns))
+        for i in range(0, len(records), batch):
+            yield records[i:i + batch]
+        return
+
+    with os.scandir(folder) as it:
+        entries = [e for e in it if os.path.splitext(e.name)[1].lower() in IMAGE_EXTS and e.is_file()]
+    entries.sort(key=lambda e: natural_key(e.name))
+
+    out: List[PageRecord] = []
+    for e in entries:
+        try:
+            st = e.stat()
+            out.append((e.name, st.st_size, st.st_mtime_ns))
+        except OSError:
+            continue
+        if len(out) >= batch:
+            yield out
+            out = []
+    if out:
+        yield out
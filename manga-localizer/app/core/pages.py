@@ -0,0 +1,21 @@
+from __future__ import annotations
+import re
+from pathlib import Path
+from typing import List, Tuple, Union
+
+IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".webp"}
+
+_DIGITS = re.compile(r"(\d+)")
+
+
+def natural_key(name: str) -> Tuple[Union[int, str], ...]:
+    """Sort key that orders embedded numbers by value: "2.png" < "10.png"."""
+    parts = _DIGITS.split(name.casefold())
+    # Even slots are text, odd slots are digit runs; ties on value fall back to the raw digits ("01" vs "1").
+    return tuple((int(p), p) if i % 2 else p for i, p in enumerate(parts))
+
+
+def list_pages(folder: Path) -> List[Path]:
+    """Image files in `folder`, in reading (natural) order."""
+    pages = [p for p in Path(folder).iterdir() if p.suffix.lower() in IMAGE_EXTS]
+    return sorted(pages, key=lambda p: natural_key(p.name))
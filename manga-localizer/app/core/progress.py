@@ -0,0 +1,207 @@
+from __future__ import annotations
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Union
+
+# manga_translator colours its log output; strip ANSI before matching.
+_ANSI = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+_SHARD = re.compile(r"^\[shard (\d+)\]\s?")
+
+_RE_STARTED = re.compile(r'Translating: "(?P<path>[^"]+)"')
+_RE_SAVED = re.compile(r'(?:Saving|Saved(?: result to)?) "(?P<path>[^"]+)"')
+_RE_SKIPPED = re.compile(r'Skipping as already translated: "(?P<path>[^"]+)"')
+_RE_STAGE = re.compile(r"Running (?P<stage>[a-z][a-z ]*[a-z])\s*$", re.IGNORECASE)
+_RE_ERROR = re.compile(r"(Traceback \(most recent call last\)|\b(?:ERROR|Error|Exception)\b)")
+
+# Engine log phrasing -> short stage names shown in the UI.
+STAGES = {
+    "upscaling": "upscale",
+    "text detection": "detect",
+    "detection": "detect",
+    "ocr": "ocr",
+    "mask refinement": "mask",
+    "inpainting": "inpaint",
+    "text translation": "translate",
+    "translating": "translate",
+    "rendering": "render",
+    "colorization": "colorize",
+    "downscaling": "downscale",
+}
+
+
+@dataclass
+class PageStarted:
+    name: str
+    path: str
+    shard: int = 0
+
+
+@dataclass
+class StageChanged:
+    name: str
+    stage: str
+    previous: str = ""
+    previous_seconds: float = 0.0
+    shard: int = 0
+
+
+@dataclass
+class PageFinished:
+    name: str
+    output: str
+    seconds: float
+    skipped: bool = False
+    shard: int = 0
+
+
+@dataclass
+class PageFailed:
+    name: str
+    error: str
+    seconds: float
+    shard: int = 0
+
+
+ProgressEvent = Union[PageStarted, StageChanged, PageFinished, PageFailed]
+
+
+class _PageState:
+    __slots__ = ("name", "started", "stage", "stage_started", "last_error")
+
+    def __init__(self, name: str, now: float):
+        self.name = name
+        self.started = now
+        self.stage = ""
+        self.stage_started = now
+        self.last_error = ""
+
+
+class ProgressParser:
+    """
+    Turns engine stdout lines into typed per-page events. Lines prefixed with
+    `[shard N]` (see execute_plan) are tracked independently per shard.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._active: Dict[int, _PageState] = {}
+
+    def feed(self, line: str) -> List[ProgressEvent]:
+        line = _ANSI.sub("", line).rstrip()
+        shard = 0
+        m = _SHARD.match(line)
+        if m:
+            shard = int(m.group(1))
+            line = line[m.end():]
+
+        now = self.clock()
+        cur = self._active.get(shard)
+        events: List[ProgressEvent] = []
+
+        m = _RE_STARTED.search(line)
+        if m:
+            if cur is not None:
+                # A new page started without the previous one being saved.
+                events.append(PageFailed(cur.name, cur.last_error or "no output written", now - cur.started, shard))
+            path = m.group("path")
+            self._active[shard] = _PageState(Path(path).name, now)
+            events.append(PageStarted(Path(path).name, path, shard))
+            return events
+
+        m = _RE_SKIPPED.search(line)
+        if m:
+            name = cur.name if cur else Path(m.group("path")).name
+            self._active.pop(shard, None)
+            events.append(PageFinished(name, m.group("path"), now - cur.started if cur else 0.0, True, shard))
+            return events
+
+        if cur is None:
+            return events
+
+        m = _RE_SAVED.search(line)
+        if m:
+            self._active.pop(shard, None)
+            events.append(PageFinished(cur.name, m.group("path"), now - cur.started, False, shard))
+            return events
+
+        m = _RE_STAGE.search(line)
+        if m:
+            stage = STAGES.get(m.group("stage").lower())
+            if stage and stage != cur.stage:
+                events.append(StageChanged(cur.name, stage, cur.stage, now - cur.stage_started, shard))
+                cur.stage = stage
+                cur.stage_started = now
+            return events
+
+        if _RE_ERROR.search(line):
+            cur.last_error = line.strip()[:500]
+        return events
+
+    def close(self, exit_code: int = 0) -> List[ProgressEvent]:
+        """Call when the engine exits: any page still in flight failed."""
+        now = self.clock()
+        events: List[ProgressEvent] = []
+        for shard, cur in sorted(self._active.items()):
+            err = cur.last_error or f"engine exited (code {exit_code}) before saving"
+            events.append(PageFailed(cur.name, err, now - cur.started, shard))
+        self._active.clear()
+        return events
+
+
+class EtaEstimator:
+    """
+    ETA from a moving average of the wall time between page completions, which
+    already accounts for sharded runs finishing pages in parallel.
+    """
+
+    def __init__(self, total: int, window: int = 12, clock: Callable[[], float] = time.monotonic):
+        self.total = total
+        self.clock = clock
+        self.started = clock()
+        self.done = 0
+        self.failed = 0
+        self._last = self.started
+        self._intervals: Deque[float] = deque(maxlen=max(1, window))
+
+    def page_done(self, failed: bool = False) -> None:
+        now = self.clock()
+        self._intervals.append(now - self._last)
+        self._last = now
+        self.done += 1
+        if failed:
+            self.failed += 1
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.total - self.done)
+
+    def seconds_per_page(self) -> Optional[float]:
+        if not self._intervals:
+            return None
+        return sum(self._intervals) / len(self._intervals)
+
+    def pages_per_minute(self) -> Optional[float]:
+        spp = self.seconds_per_page()
+        return 60.0 / spp if spp else None
+
+    def eta_seconds(self) -> Optional[float]:
+        spp = self.seconds_per_page()
+        if spp is None:
+            return None
+        return spp * self.remaining
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "–"
+    seconds = int(round(seconds))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    if h:
+        return f"{h}h{m:02d}m"
+    if m:
+        return f"{m}m{s:02d}s"
+    return f"{s}s"
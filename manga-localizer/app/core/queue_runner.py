@@ -0,0 +1,254 @@
+from __future__ import annotations
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.config import EngineConfig, PackageConfig
+from app.core.engine_client import EngineClient
+from app.core.job_queue import JOB_CANCELLED, JOB_DONE, JOB_FAILED, JOB_QUEUED, Job, JobQueue
+from app.core.log_pipeline import RotatingLogFile
+from app.core.mit_runner import RunPlan, execute_plan, make_engine_clients, prepare_run
+from app.core.progress import PageFailed, PageFinished, ProgressParser
+
+
+def _folder_stamp(folder: str) -> int:
+    try:
+        return os.stat(folder).st_mtime_ns
+    except OSError:
+        return -1
+
+
+class QueueRunner:
+    """
+    Works through a JobQueue on `concurrency` slot threads, one job per slot at
+    a time. Chapters follow each other without engine idle time: each slot
+    keeps its warm engine workers across jobs, and the next job's plan
+    (manifest check and staging) is prepared while the current job runs.
+
+    Slots split the cores and RAM between them (see shard_layout). A single
+    slot can borrow the caller's warm `clients`; otherwise each slot starts
+    its own, sized for its share, and shuts them down when the runner stops. The runner keeps waiting for new
+    jobs until `stop()` or the queue is paused; `on_idle` fires once every slot
+    has exited. Callbacks come from worker threads.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        cfg: EngineConfig,
+        concurrency: int = 1,
+        api_key: str = "",
+        clients: Optional[List[EngineClient]] = None,
+        on_log: Optional[Callable[[Job, str], None]] = None,
+        on_event: Optional[Callable[[Job, object], None]] = None,
+        on_finished: Optional[Callable[[Job], None]] = None,
+        on_idle: Optional[Callable[[], None]] = None,
+        package: Optional[PackageConfig] = None,
+    ):
+        self.queue = queue
+        self.cfg = cfg.model_copy(deep=True)  # settings changed mid-queue apply from the next start
+        self.package = package.model_copy() if package is not None else None
+        self.concurrency = max(1, concurrency)
+        self.api_key = api_key
+        self.on_log = on_log or (lambda job, line: None)
+        self.on_event = on_event or (lambda job, ev: None)
+        self.on_finished = on_finished or (lambda job: None)
+        self.on_idle = on_idle or (lambda: None)
+
+        self._shared_clients = clients
+        self._own_clients: List[EngineClient] = []
+        self._stop = threading.Event()
+        self._interrupted = False
+        self._cancel: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._planned = threading.Condition(self._lock)
+        self._prepared: Dict[str, Tuple[RunPlan, int]] = {}  # job id -> (plan, folder mtime when planned)
+        self._planning: Optional[str] = None
+        self._threads: List[threading.Thread] = []
+        self._alive = 0
+
+    # ---------- control ----------
+    @property
+    def active(self) -> bool:
+        return self._alive > 0
+
+    def start(self) -> None:
+        self._alive = self.concurrency
+        for i in range(self.concurrency):
+            t = threading.Thread(target=self._slot, args=(i,), name=f"queue-slot-{i + 1}", daemon=True)
+            self._threads.append(t)
+            t.start()
+
+    def stop(self) -> None:
+        """Start no more jobs; running ones finish."""
+        self._stop.set()
+        with self.queue.cond:
+            self.queue.cond.notify_all()
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Stop now (app exit): running jobs are killed and go back to the queue."""
+        self._interrupted = True
+        for ev in list(self._cancel.values()):
+            ev.set()
+        self.stop()
+        for t in self._threads:
+            t.join(timeout)
+
+    def cancel(self, job_id: str) -> None:
+        if self.queue.cancel(job_id):
+            ev = self._cancel.get(job_id)
+            if ev is not None:
+                ev.set()
+
+    # ---------- slots ----------
+    def _slot(self, index: int) -> None:
+        clients: Optional[List[EngineClient]] = None
+        try:
+            while True:
+                job = self._next_job()
+                if job is None:
+                    return
+                if clients is None:
+                    clients = self._clients_for(index)
+                self._run(job, clients, index)
+        finally:
+            with self._lock:
+                self._alive -= 1
+                last = self._alive == 0
+            if last:
+                self._stop.set()  # a plan still being prepared is dropped rather than kept
+                self._discard_prepared()
+                for c in self._own_clients:
+                    c.shutdown()
+                self._own_clients = []
+                self.on_idle()
+
+    def _next_job(self) -> Optional[Job]:
+        with self.queue.cond:
+            while not self._stop.is_set() and not self.queue.paused:
+                job = self.queue.claim()
+                if job is not None:
+                    return job
+                self.queue.cond.wait(1.0)
+        return None
+
+    def _clients_for(self, index: int) -> List[EngineClient]:
+        if self.concurrency == 1 and self._shared_clients is not None:
+            return self._shared_clients  # sized for the whole machine: only right for a lone slot
+        if not self.cfg.persistent_engine or not EngineClient.available():
+            return []
+        clients = make_engine_clients(self.cfg, self.api_key, index, self.concurrency)
+        with self._lock:
+            self._own_clients.extend(clients)
+        return clients
+
+    def _run(self, job: Job, clients: List[EngineClient], slot: int = 0) -> None:
+        cancel = threading.Event()
+        self._cancel[job.id] = cancel
+        parser = ProgressParser()
+        log_file: Optional[RotatingLogFile] = None
+        plan: Optional[RunPlan] = None
+
+        def progress(ev) -> None:
+            if isinstance(ev, PageFinished):
+                job.done += 1
+            elif isinstance(ev, PageFailed):
+                job.failed += 1
+            else:
+                self.on_event(job, ev)
+                return
+            self.queue.progress()
+            self.on_event(job, ev)
+
+        def log(line: str) -> None:
+            if log_file is not None:
+                log_file.write_lines([line])
+            self.on_log(job, line)
+            for ev in parser.feed(line):
+                progress(ev)
+
+        code = 1
+        try:
+            log_file = RotatingLogFile(Path(job.output_dir) / ".logs" / "run.log")
+            plan = self._plan_for(job)
+            job.total = len(plan.pages)
+            self.queue.progress()
+            log(f"Plan: {plan.summary()}")
+            self._prepare_ahead()
+            code = execute_plan(self.cfg, plan, log, clients=clients, api_key=self.api_key, cancel=cancel,
+                                package=self.package, slot=slot, slots=self.concurrency)
+        except Exception as e:
+            log(f"Job failed: {e}")
+        finally:
+            for ev in parser.close(code):
+                progress(ev)
+            if plan is not None:
+                try:
+                    plan.finish()
+                except OSError as e:
+                    log(f"Failed to update manifest: {e}")
+            if log_file is not None:
+                log_file.close()
+            self._cancel.pop(job.id, None)
+
+        if cancel.is_set():
+            state, message = (JOB_QUEUED, "interrupted; requeued") if self._interrupted else (JOB_CANCELLED, "cancelled")
+        elif code == 0:
+            state = JOB_DONE
+            message = f"{job.done} pages" + (f", {job.failed} failed" if job.failed else "")
+        else:
+            state, message = JOB_FAILED, f"exit code {code}"
+        self.queue.finish(job.id, state, code, message)
+        self.on_finished(job)
+
+    # ---------- look-ahead planning ----------
+    def _plan_for(self, job: Job) -> RunPlan:
+        with self._planned:
+            while self._planning == job.id:
+                self._planned.wait()
+            ready = self._prepared.pop(job.id, None)
+        if ready is not None:
+            plan, stamp = ready
+            if stamp == _folder_stamp(job.folder):
+                return plan
+            plan.discard()  # pages were added or removed since
+        return prepare_run(self.cfg, Path(job.folder), Path(job.output_dir))
+
+    def _prepare_ahead(self) -> None:
+        """Plan the job most likely to run next on a helper thread, so its slot can start it at once."""
+        with self._lock:
+            if self._planning is not None or self._stop.is_set():
+                return
+            skip = list(self._prepared)
+        nxt = self.queue.peek(skip=skip)
+        with self._lock:
+            if nxt is None or self._planning is not None:
+                return
+            self._planning = nxt.id
+
+        def work() -> None:
+            plan: Optional[RunPlan] = None
+            stamp = _folder_stamp(nxt.folder)
+            try:
+                plan = prepare_run(self.cfg, Path(nxt.folder), Path(nxt.output_dir))
+            except Exception:
+                pass  # the slot that picks the job up plans it again and reports the error
+            finally:
+                with self._planned:
+                    self._planning = None
+                    if plan is not None:
+                        if self._stop.is_set():
+                            plan.discard()
+                        else:
+                            self._prepared[nxt.id] = (plan, stamp)
+                    self._planned.notify_all()
+
+        threading.Thread(target=work, name="queue-planner", daemon=True).start()
+
+    def _discard_prepared(self) -> None:
+        with self._lock:
+            plans = [plan for plan, _stamp in self._prepared.values()]
+            self._prepared.clear()
+        for plan in plans:
+            plan.discard()
@@ -3,10 +3,14 @@ import json
 from pathlib import Path
 from app.core.config import AppConfig
 
-def _config_path() -> Path:
+def data_dir(*parts: str) -> Path:
     base = Path.home() / ".manga_localizer_ui"
-    base.mkdir(parents=True, exist_ok=True)
-    return base / "settings.json"
+    d = base.joinpath(*parts)
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+def _config_path() -> Path:
+    return data_dir() / "settings.json"
 
 def load_settings() -> AppConfig:
     p = _config_path()
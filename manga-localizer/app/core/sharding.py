@@ -0,0 +1,156 @@
+from __future__ import annotations
+import os
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# OpenMP / BLAS thread pools size themselves from these variables when they load.
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+# torch's and opencv's own pools ignore the environment; the engine process
+# reads this and calls torch.set_num_threads / cv2.setNumThreads itself
+# (engine_daemon.apply_thread_budget).
+THREAD_BUDGET_ENV = "MLUI_ENGINE_THREADS"
+
+
+def cpu_count() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        try:
+            return max(1, len(os.sched_getaffinity(0)))
+        except OSError:
+            pass
+    return max(1, os.cpu_count() or 1)
+
+
+def available_ram_bytes() -> Optional[int]:
+    """Best-effort free physical memory without extra dependencies (None if unknown)."""
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/meminfo", "r", encoding="ascii") as f:
+                for line in f:
+                    if line.startswith("MemAvailable:"):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError):
+            pass
+    if sys.platform == "win32":
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong),
+                ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+            ]
+
+        stat = MEMORYSTATUSEX()
+        stat.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(stat)):
+            return int(stat.ullAvailPhys)
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def auto_shard_count(
+    pages: int,
+    ram_per_shard_gb: float = 4.0,
+    min_threads_per_shard: int = 2,
+    cores: Optional[int] = None,
+    ram_bytes: Optional[int] = None,
+) -> int:
+    """
+    How many engine processes this machine can feed: bounded by cores (each shard
+    gets at least `min_threads_per_shard`), by free RAM (each shard holds its own
+    copy of the models) and by the number of pages.
+    """
+    cores = cores or cpu_count()
+    n = max(1, cores // max(1, min_threads_per_shard))
+    ram = ram_bytes if ram_bytes is not None else available_ram_bytes()
+    if ram and ram_per_shard_gb > 0:
+        n = min(n, max(1, int(ram // (ram_per_shard_gb * 1024 ** 3))))
+    return max(1, min(n, pages))
+
+
+def resolve_shards(
+    requested: int,
+    pages: int,
+    ram_per_shard_gb: float = 4.0,
+    cores: Optional[int] = None,
+    ram_bytes: Optional[int] = None,
+) -> int:
+    """`requested` <= 0 means auto-detect (within `cores` / `ram_bytes` if given)."""
+    if pages <= 1:
+        return 1
+    if requested <= 0:
+        return auto_shard_count(pages, ram_per_shard_gb, cores=cores, ram_bytes=ram_bytes)
+    return max(1, min(requested, pages))
+
+
+def slot_share(slot: int, slots: int) -> Tuple[int, int, Optional[int]]:
+    """
+    (first core, cores, free RAM) for run `slot` of `slots` running side by side
+    (queue concurrency), so concurrent runs split the machine instead of each
+    sizing itself for all of it.
+    """
+    slots = max(1, slots)
+    cores = max(1, cpu_count() // slots)
+    ram = available_ram_bytes()
+    return (slot % slots) * cores, cores, (ram // slots if ram else None)
+
+
+def split_round_robin(items: Sequence[T], n: int) -> List[List[T]]:
+    # Interleaved, so all shards move through the chapter in reading order together.
+    n = max(1, min(n, len(items))) if items else 1
+    return [list(items[i::n]) for i in range(n)]
+
+
+def thread_budget(shards: int, threads_per_shard: int = 0, cores: Optional[int] = None) -> int:
+    if threads_per_shard > 0:
+        return threads_per_shard
+    return max(1, (cores or cpu_count()) // max(1, shards))
+
+
+def thread_env(threads: int) -> Dict[str, str]:
+    env = {k: str(threads) for k in THREAD_ENV_VARS}
+    env[THREAD_BUDGET_ENV] = str(threads)
+    return env
+
+
+def cpu_sets(shards: int, threads: int, cores: Optional[int] = None, first: int = 0) -> List[List[int]]:
+    """
+    Disjoint CPU ranges for pinning, starting at core index `first` and wrapping
+    around if shards*threads exceeds the core count.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        avail = sorted(os.sched_getaffinity(0))
+    else:
+        avail = list(range(cores or cpu_count()))
+    out = []
+    for i in range(shards):
+        start = first + i * threads
+        out.append([avail[(start + j) % len(avail)] for j in range(min(threads, len(avail)))])
+    return out
+
+
+def pin_process(pid: int, cpus: Optional[List[int]]) -> bool:
+    """Pin a running process to `cpus` (Linux only; no-op elsewhere)."""
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        return False
+    try:
+        os.sched_setaffinity(pid, set(cpus))
+        return True
+    except OSError:
+        return False
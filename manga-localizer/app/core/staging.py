@@ -0,0 +1,47 @@
+from __future__ import annotations
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional
+
+from app.core.archive import open_archive, split_page
+
+
+def link_or_copy(src: Path, dst: Path) -> None:
+    # Hardlink when possible (same volume, no extra disk), then symlink, then a real copy.
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+    try:
+        os.symlink(src, dst)
+        return
+    except (OSError, NotImplementedError):
+        pass
+    shutil.copy2(src, dst)
+
+
+def make_staging_dir(pages: Iterable[Path], prefix: str = "mlui-stage-", base: Optional[Path] = None) -> Path:
+    """
+    Build a throwaway input folder that contains only `pages` (by file name),
+    so the engine can be pointed at a subset of a chapter. Pages inside an
+    archive are extracted into it.
+    """
+    if base is not None:
+        base.mkdir(parents=True, exist_ok=True)
+    stage = Path(tempfile.mkdtemp(prefix=prefix, dir=str(base) if base else None))
+    for p in pages:
+        inner = split_page(p)
+        if inner is not None:
+            with open_archive(inner[0]) as arc:
+                arc.extract(inner[1], stage / inner[1])
+        else:
+            link_or_copy(Path(p).resolve(), stage / Path(p).name)
+    return stage
+
+
+def remove_staging_dir(stage: Optional[Path]) -> None:
+    if stage and stage.exists():
+        shutil.rmtree(stage, ignore_errors=True)
@@ -0,0 +1,37 @@
+from __future__ import annotations
+import time
+from typing import Callable, Dict, List, Tuple
+
+
+class StartupTimer:
+    """
+    Wall-clock phases of application start-up. `mark(name)` closes the phase
+    that started at the previous mark (or at construction).
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self.started = clock()
+        self._last = self.started
+        self.phases: List[Tuple[str, float]] = []
+        self.at: Dict[str, float] = {}
+
+    def mark(self, name: str) -> float:
+        now = self._clock()
+        took = now - self._last
+        self._last = now
+        self.phases.append((name, took))
+        self.at[name] = now - self.started
+        return took
+
+    def elapsed(self) -> float:
+        return self._clock() - self.started
+
+    def lines(self) -> List[str]:
+        return [f"  {name:<22} {took * 1e3:7.1f} ms  (at {self.at[name] * 1e3:7.1f} ms)" for name, took in self.phases]
+
+    def as_dict(self) -> dict:
+        return {
+            "phases_ms": {name: round(took * 1e3, 2) for name, took in self.phases},
+            "at_ms": {name: round(t * 1e3, 2) for name, t in self.at.items()},
+        }
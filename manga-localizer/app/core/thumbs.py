@@ -0,0 +1,99 @@
+from __future__ import annotations
+import hashlib
+import os
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Optional
+
+from app.core.archive import PageStat, open_page, stat_page
+
+THUMB_MAX_PX = 160
+
+
+def thumb_path_for(cache_dir: Path, src: Path, st: "os.stat_result | PageStat", max_px: int = THUMB_MAX_PX) -> Path:
+    """Cache file for `src` at its current size/mtime; a changed source maps to a new file."""
+    ident = f"{Path(src).resolve()}|{st.st_size}|{st.st_mtime_ns}|{max_px}"
+    h = hashlib.blake2b(ident.encode("utf-8"), digest_size=16).hexdigest()
+    return cache_dir / h[:2] / f"{h}.jpg"
+
+
+def make_thumbnail(src: str, dst: str, max_px: int = THUMB_MAX_PX) -> str:
+    """Runs in a worker process. Uses JPEG draft mode / reduce() so full scans are never fully decoded."""
+    from PIL import Image
+
+    dst_p = Path(dst)
+    dst_p.parent.mkdir(parents=True, exist_ok=True)
+    with open_page(Path(src)) as f, Image.open(f) as im:  # a file, or a page inside a CBZ / ZIP
+        im.draft("RGB", (max_px * 2, max_px * 2))  # JPEG: decode at 1/2..1/8 scale
+        im.thumbnail((max_px, max_px), Image.Resampling.BILINEAR, reducing_gap=2.0)
+        if im.mode not in ("RGB", "L"):
+            im = im.convert("RGB")
+        tmp = dst_p.with_suffix(f".{os.getpid()}.tmp")
+        im.save(tmp, "JPEG", quality=82)
+    os.replace(tmp, dst_p)
+    return dst
+
+
+class ThumbnailStore:
+    """
+    On-disk thumbnail cache (default ~/.manga_localizer_ui/thumbs) with a
+    process pool for generating misses. Entries are keyed by path and stat, so
+    re-saved pages and renamed folders leave old ones behind; least recently
+    used entries are evicted past `max_bytes` on `shutdown()`.
+    """
+
+    def __init__(self, cache_dir: Path, max_px: int = THUMB_MAX_PX, workers: Optional[int] = None,
+                 max_bytes: int = 500 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_px = max_px
+        self.max_bytes = max_bytes
+        self.workers = workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self._pool = None  # ProcessPoolExecutor, created (and imported) on the first miss
+
+    def lookup(self, src: Path) -> "tuple[Optional[Path], Optional[Path]]":
+        """(cached thumbnail or None, target path for generating it) — None, None if src is gone."""
+        try:
+            st = stat_page(src)
+        except OSError:
+            return None, None
+        dst = thumb_path_for(self.cache_dir, src, st, self.max_px)
+        try:
+            os.utime(dst)  # recency for eviction
+        except OSError:
+            return None, dst
+        return dst, dst
+
+    def generate(self, src: Path, dst: Path) -> Future:
+        if self._pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool.submit(make_thumbnail, str(src), str(dst), self.max_px)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self.trim()
+
+    def trim(self) -> int:
+        """Evict least recently used thumbnails until the cache fits; returns bytes freed."""
+        entries = []
+        total = 0
+        for p in self.cache_dir.glob("*/*.jpg"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        freed = 0
+        for _mtime, size, p in sorted(entries):
+            if total - freed <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            freed += size
+        return freed
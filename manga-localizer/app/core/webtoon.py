@@ -0,0 +1,226 @@
+from __future__ import annotations
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Long-strip (webtoon) pages are cut into tiles the engine can handle, at
+# whitespace gutters so no bubble straddles a seam, and stitched back after.
+# NumPy / Pillow are imported lazily: only runs with tall pages need them.
+
+GUTTER_VARIANCE = 12.0   # rows flatter than this (grey levels², i.e. ~3.5 std dev) count as blank
+GUTTER_MIN_ROWS = 12     # a cut needs this many blank rows around it
+_CHUNK_ROWS = 2048
+
+_TILE_SEP = "~"
+_SHARD_PREFIX = re.compile(r"^\[shard \d+\]\s?")
+_RE_STARTED = re.compile(r'Translating: "(?P<path>[^"]+)"')
+_RE_SAVED = re.compile(r'(?:Saving|Saved(?: result to)?) "(?P<path>[^"]+)"')
+
+LogFn = Callable[[str], None]
+
+
+@dataclass
+class Tile:
+    name: str      # file name in the engine input / output folder
+    top: int       # rows of the page this tile covers, overlap included
+    bottom: int
+    keep_top: int  # rows taken from this tile when stitching
+    keep_bottom: int
+
+
+@dataclass
+class SlicedPage:
+    page: Path
+    width: int
+    height: int
+    tiles: List[Tile] = field(default_factory=list)
+
+    def tile_paths(self, folder: Path) -> List[Path]:
+        return [Path(folder) / t.name for t in self.tiles]
+
+
+def is_tall(width: int, height: int, max_height: int) -> bool:
+    """Long strips only: a high-resolution manga page is tall but not narrow."""
+    return height > max_height and height > 2 * width
+
+
+def image_size(path: Path) -> Tuple[int, int]:
+    from PIL import Image
+
+    with Image.open(path) as im:  # header only, no decode
+        return im.size
+
+
+def row_variance(gray) -> "np.ndarray":
+    """Per-row pixel variance of a 2-D uint8 array, in chunks to bound the float copy."""
+    import numpy as np
+
+    out = np.empty(gray.shape[0], dtype=np.float32)
+    for y in range(0, gray.shape[0], _CHUNK_ROWS):
+        out[y:y + _CHUNK_ROWS] = gray[y:y + _CHUNK_ROWS].astype(np.float32).var(axis=1)
+    return out
+
+
+def find_cuts(variance, tile_height: int, min_rows: int = GUTTER_MIN_ROWS,
+              threshold: float = GUTTER_VARIANCE) -> List[int]:
+    """
+    Rows to cut at so consecutive cuts are at most `tile_height` apart. Each cut
+    is the lowest row within the back half of its window that sits in a blank
+    band of `min_rows`; without one, the flattest row of the window is used.
+    """
+    import numpy as np
+
+    h = len(variance)
+    blank = (variance <= threshold).astype(np.int32)
+    # band[i] = blank rows in [i - min_rows // 2, i + min_rows - min_rows // 2)
+    csum = np.concatenate(([0], np.cumsum(blank)))
+    lo = np.clip(np.arange(h) - min_rows // 2, 0, h)
+    hi = np.clip(lo + min_rows, 0, h)
+    in_gutter = (csum[hi] - csum[lo]) >= np.minimum(min_rows, hi - lo)
+
+    cuts: List[int] = []
+    y = 0
+    while h - y > tile_height:
+        start, end = y + tile_height // 2, y + tile_height
+        window = np.flatnonzero(in_gutter[start:end])
+        if window.size:
+            cut = start + int(window[-1])
+        else:
+            flat = variance[start:end]
+            cut = start + int(len(flat) - 1 - np.argmin(flat[::-1]))  # flattest, latest on ties
+        cut = max(cut, y + 1)
+        cuts.append(cut)
+        y = cut
+    return cuts
+
+
+def plan_tiles(page: Path, width: int, height: int, cuts: List[int], overlap: int) -> SlicedPage:
+    sliced = SlicedPage(page, width, height)
+    bounds = [0] + list(cuts) + [height]
+    for i in range(len(bounds) - 1):
+        keep_top, keep_bottom = bounds[i], bounds[i + 1]
+        sliced.tiles.append(Tile(
+            tile_name(page, i),
+            max(0, keep_top - overlap),
+            min(height, keep_bottom + overlap),
+            keep_top,
+            keep_bottom,
+        ))
+    return sliced
+
+
+def tile_name(page: Path, index: int) -> str:
+    # Tiles of a page share its full name (001.jpg~000.png), so they sort together and
+    # in order, and 001.jpg and 001.png in one folder never write the same tile.
+    return f"{Path(page).name}{_TILE_SEP}{index:03d}.png"
+
+
+def slice_page(page: Path, dest: Path, tile_height: int, overlap: int) -> Optional[SlicedPage]:
+    """Write the tiles of `page` into `dest` (lossless PNG). None if it needs no cutting."""
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(page) as im:
+        im.load()
+        width, height = im.size
+        gray = np.asarray(im.convert("L"))
+        cuts = find_cuts(row_variance(gray), max(64, tile_height - 2 * overlap))
+        del gray
+        if not cuts:
+            return None
+        sliced = plan_tiles(page, width, height, cuts, overlap)
+        dest.mkdir(parents=True, exist_ok=True)
+        # PNG encoding releases the GIL; tiles are short-lived, so favour speed over size.
+        with ThreadPoolExecutor(max_workers=min(len(sliced.tiles), os.cpu_count() or 1)) as pool:
+            list(pool.map(lambda t: im.crop((0, t.top, width, t.bottom)).save(dest / t.name, compress_level=1),
+                          sliced.tiles))
+    return sliced
+
+
+def stitch_page(sliced: SlicedPage, tile_folder: Path, out: Path) -> Path:
+    """
+    Assemble the engine outputs of `sliced`'s tiles (in `tile_folder`) into
+    `out`, keeping each tile's own rows only, so overlaps vanish at the seams.
+    Tile outputs are deleted once the page is written.
+    """
+    from PIL import Image
+
+    canvas = None
+    for t in sliced.tiles:
+        with Image.open(Path(tile_folder) / t.name) as tile:
+            tile.load()
+            tile_h = t.bottom - t.top
+            if tile.size != (sliced.width, tile_h):  # engine rescaled the tile: back to page pixels
+                tile = tile.resize((sliced.width, tile_h), Image.LANCZOS)
+            if canvas is None:
+                canvas = Image.new(tile.mode if tile.mode in ("RGB", "RGBA", "L") else "RGB",
+                                   (sliced.width, sliced.height))
+            if tile.mode != canvas.mode:
+                tile = tile.convert(canvas.mode)
+            part = tile.crop((0, t.keep_top - t.top, sliced.width, t.keep_bottom - t.top))
+            canvas.paste(part, (0, t.keep_top))
+    if canvas is None:
+        raise ValueError(f"{sliced.page.name}: no tiles")
+
+    ext = out.suffix.lower()
+    if ext in (".jpg", ".jpeg") and canvas.mode != "RGB":
+        canvas = canvas.convert("RGB")
+    tmp = out.with_name(f".{out.name}.part{ext}")
+    options = {"quality": 95} if ext in (".jpg", ".jpeg", ".webp") else {"compress_level": 6}
+    canvas.save(tmp, **options)
+    os.replace(tmp, out)
+    remove_tile_outputs(sliced, tile_folder)
+    return out
+
+
+def remove_tile_outputs(sliced: SlicedPage, folder: Path) -> None:
+    for p in sliced.tile_paths(folder):
+        try:
+            p.unlink()
+        except OSError:
+            pass
+
+
+def stitching_log(on_log: LogFn, slices: Dict[str, SlicedPage], output_folder: Path) -> LogFn:
+    """
+    Wrap `on_log` so tiles look like their page downstream: the first tile's
+    start is reported as the page starting, the other tile starts and saves are
+    swallowed, and once the last tile is saved the page is stitched and
+    reported saved. Everything else passes through.
+    """
+    owner = {t.name: s for s in slices.values() for t in s.tiles}
+    saved: Dict[str, set] = {name: set() for name in slices}
+    started: set = set()
+
+    def emit(line: str) -> None:
+        body = _SHARD_PREFIX.sub("", line)
+        prefix = line[:len(line) - len(body)]
+        m = _RE_STARTED.search(body) or _RE_SAVED.search(body)
+        sliced = owner.get(Path(m.group("path")).name) if m else None
+        if sliced is None:
+            on_log(line)
+            return
+        page = sliced.page.name
+        tile = Path(m.group("path")).name
+        if m.re is _RE_STARTED:
+            if page not in started:
+                started.add(page)
+                on_log(f'{prefix}Translating: "{sliced.page}"')
+            return
+        saved[page].add(tile)
+        if len(saved[page]) < len(sliced.tiles):
+            return
+        try:
+            out = stitch_page(sliced, output_folder, Path(output_folder) / page)
+        except Exception as e:
+            on_log(f"{prefix}Error: stitching {page} failed: {e}")
+            return
+        on_log(f'{prefix}Saved "{out}"')
+
+    return emit
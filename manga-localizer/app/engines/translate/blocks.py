@@ -0,0 +1,89 @@
+from __future__ import annotations
+import re
+from typing import Collection, Dict, List, Optional, Tuple
+
+# "[12]", "[ 12 ]", "[12]:", "**[12]**", "【12】", "[id: 12]", "[#12]"
+_ID_LINE = re.compile(r"^[\s*_>#`-]*[\[【]\s*(?:id\s*[:=]\s*|id\s+)?#?\s*([^\]】\s][^\]】]*?)\s*[\]】][\s*_:`.-]*$", re.IGNORECASE)
+
+
+class BlockParser:
+    """
+    Incremental parser for "[id]\\ntext" replies. Feed it response text in
+    arbitrary pieces (partial lines included). A block is complete, and
+    returned, once the next id line starts or `close()` is called.
+
+    With `ids`, only those ids start a block; any other bracketed line (e.g.
+    a translated "[sigh]") is kept as text. Ids are matched leniently: extra
+    markup, full-width brackets and an "id:" prefix are accepted. Numeric ids
+    also match with different zero padding. A repeated id keeps its first
+    block.
+    """
+
+    def __init__(self, ids: Optional[Collection[str]] = None):
+        self._alias: Optional[Dict[str, str]] = None
+        if ids is not None:
+            self._alias = {}
+            for rid in ids:
+                self._alias[rid] = rid
+                self._alias.setdefault(rid.lower(), rid)
+                if rid.isdigit():
+                    self._alias.setdefault(str(int(rid)), rid)
+        self._buf = ""
+        self._current: Optional[str] = None
+        self._lines: List[str] = []
+        self.seen: Dict[str, str] = {}
+
+    def _match_id(self, line: str) -> Optional[str]:
+        m = _ID_LINE.match(line)
+        if not m:
+            return None
+        raw = m.group(1).strip()
+        if self._alias is None:
+            return raw
+        for cand in (raw, raw.lower(), str(int(raw)) if raw.isdigit() else None):
+            if cand is not None and cand in self._alias:
+                return self._alias[cand]
+        return None
+
+    def _finish(self) -> List[Tuple[str, str]]:
+        out: List[Tuple[str, str]] = []
+        if self._current is not None and self._current not in self.seen:
+            text = "\n".join(self._lines).strip()
+            self.seen[self._current] = text
+            out.append((self._current, text))
+        self._current = None
+        self._lines = []
+        return out
+
+    def _line(self, line: str) -> List[Tuple[str, str]]:
+        line = line.strip()
+        rid = self._match_id(line)
+        if rid is not None:
+            done = self._finish()
+            self._current = rid
+            return done
+        if self._current is not None and line:
+            self._lines.append(line)
+        return []
+
+    def feed(self, text: str) -> List[Tuple[str, str]]:
+        """Consume a piece of the reply; returns the blocks it completed as (id, text)."""
+        self._buf += text
+        *lines, self._buf = self._buf.split("\n")
+        out: List[Tuple[str, str]] = []
+        for line in lines:
+            out.extend(self._line(line))
+        return out
+
+    def close(self) -> List[Tuple[str, str]]:
+        """End of reply: flush the trailing partial line and the last block."""
+        out = self._line(self._buf) if self._buf else []
+        self._buf = ""
+        return out + self._finish()
+
+
+def parse_blocks(text: str, ids: Optional[Collection[str]] = None) -> Dict[str, str]:
+    p = BlockParser(ids)
+    p.feed(text)
+    p.close()
+    return p.seen
@@ -0,0 +1,219 @@
+from __future__ import annotations
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SCHEMA_VERSION = 1
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_source(text: str) -> str:
+    """Key form of a source line: NFKC (half/full width folded) with whitespace collapsed."""
+    return _WS.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def short_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+
+
+@dataclass(frozen=True)
+class MemoryKey:
+    model: str
+    instructions: str  # short_hash of the prompt
+    source: str        # normalize_source(jp)
+    context: str = ""  # short_hash of the region context, "" when unused
+
+
+@dataclass
+class MemoryStats:
+    lookups: int = 0
+    hits: int = 0
+    stored: int = 0
+    saved_tokens: int = 0
+    evicted: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.hits}/{self.lookups} hits ({self.hit_rate:.0%}), "
+            f"~{self.saved_tokens} tokens saved, {self.stored} stored"
+            + (f", {self.evicted} evicted" if self.evicted else "")
+        )
+
+
+class TranslationMemory:
+    """
+    SQLite-backed translation memory. Entries are keyed by namespace (one per
+    series), model, instruction hash, normalized source text and an optional
+    context hash. When `max_entries` is exceeded the least recently used
+    entries are evicted.
+    """
+
+    def __init__(self, path: Path, namespace: str = "default", max_entries: int = 200_000):
+        self.path = Path(path)
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.stats = MemoryStats()
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS tm (
+                ns TEXT NOT NULL,
+                model TEXT NOT NULL,
+                instr TEXT NOT NULL,
+                source TEXT NOT NULL,
+                ctx TEXT NOT NULL DEFAULT '',
+                target TEXT NOT NULL,
+                tokens INTEGER NOT NULL DEFAULT 0,
+                hits INTEGER NOT NULL DEFAULT 0,
+                created REAL NOT NULL,
+                used REAL NOT NULL,
+                PRIMARY KEY (ns, model, instr, source, ctx)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS tm_used ON tm (used);
+            """
+        )
+        self._db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    # ---- lookups ----
+    def get_many(self, keys: Iterable[MemoryKey]) -> Dict[MemoryKey, str]:
+        keys = list(dict.fromkeys(keys))
+        found: Dict[MemoryKey, str] = {}
+        now = time.time()
+        saved = 0
+        with self._lock:
+            for k in keys:
+                row = self._db.execute(
+                    "SELECT target, tokens FROM tm WHERE ns=? AND model=? AND instr=? AND source=? AND ctx=?",
+                    (self.namespace, k.model, k.instructions, k.source, k.context),
+                ).fetchone()
+                if row is not None:
+                    found[k] = row[0]
+                    saved += row[1]
+            if found:
+                self._db.executemany(
+                    "UPDATE tm SET hits=hits+1, used=? WHERE ns=? AND model=? AND instr=? AND source=? AND ctx=?",
+                    [(now, self.namespace, k.model, k.instructions, k.source, k.context) for k in found],
+                )
+                self._db.commit()
+        self.stats.lookups += len(keys)
+        self.stats.hits += len(found)
+        self.stats.saved_tokens += saved
+        return found
+
+    def put_many(self, items: Iterable[Tuple[MemoryKey, str, int]]) -> None:
+        """Store (key, translation, tokens it cost) triples; empty translations are skipped."""
+        now = time.time()
+        rows = [
+            (self.namespace, k.model, k.instructions, k.source, k.context, target, tokens, now, now)
+            for k, target, tokens in items
+            if target.strip()
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO tm (ns, model, instr, source, ctx, target, tokens, created, used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (ns, model, instr, source, ctx) DO UPDATE SET "
+                "target=excluded.target, tokens=excluded.tokens, used=excluded.used",
+                rows,
+            )
+            self._db.commit()
+            self.stats.stored += len(rows)
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        (count,) = self._db.execute("SELECT COUNT(*) FROM tm").fetchone()
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+        # Trim 10% below the cap so eviction doesn't run on every insert.
+        excess += self.max_entries // 10
+        cur = self._db.execute(
+            "DELETE FROM tm WHERE (ns, model, instr, source, ctx) IN "
+            "(SELECT ns, model, instr, source, ctx FROM tm ORDER BY used LIMIT ?)",
+            (excess,),
+        )
+        self._db.commit()
+        self.stats.evicted += cur.rowcount
+
+    # ---- maintenance ----
+    def __len__(self) -> int:
+        with self._lock:
+            (n,) = self._db.execute("SELECT COUNT(*) FROM tm WHERE ns=?", (self.namespace,)).fetchone()
+        return n
+
+    def namespaces(self) -> List[str]:
+        with self._lock:
+            return [r[0] for r in self._db.execute("SELECT DISTINCT ns FROM tm ORDER BY ns")]
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        with self._lock:
+            cur = self._db.execute("DELETE FROM tm WHERE ns=?", (namespace or self.namespace,))
+            self._db.commit()
+            return cur.rowcount
+
+    def export_jsonl(self, path: Path, namespace: Optional[str] = None) -> int:
+        """Write one namespace (default: the current one) as JSON lines; returns the entry count."""
+        ns = namespace or self.namespace
+        n = 0
+        tmp = Path(path).with_suffix(Path(path).suffix + ".tmp")
+        with self._lock, open(tmp, "w", encoding="utf-8") as f:
+            for row in self._db.execute(
+                "SELECT model, instr, source, ctx, target, tokens, hits FROM tm WHERE ns=? ORDER BY source", (ns,)
+            ):
+                model, instr, source, ctx, target, tokens, hits = row
+                rec = {"model": model, "instructions": instr, "source": source, "context": ctx,
+                       "target": target, "tokens": tokens, "hits": hits}
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                n += 1
+        tmp.replace(path)
+        return n
+
+    def import_jsonl(self, path: Path, overwrite: bool = False) -> int:
+        """Load entries exported by `export_jsonl` into the current namespace; returns the count added."""
+        now = time.time()
+        rows = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                rec = json.loads(line)
+                rows.append((
+                    self.namespace, rec["model"], rec["instructions"], normalize_source(rec["source"]),
+                    rec.get("context", ""), rec["target"], int(rec.get("tokens", 0)), now, now,
+                ))
+        verb = "INSERT OR REPLACE" if overwrite else "INSERT OR IGNORE"
+        with self._lock:
+            before = self._db.total_changes
+            self._db.executemany(
+                f"{verb} INTO tm (ns, model, instr, source, ctx, target, tokens, created, used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.commit()
+            added = self._db.total_changes - before
+            self._evict_locked()
+        return added
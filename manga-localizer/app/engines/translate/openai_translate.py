@@ -1,50 +1,375 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Iterable, List
-from openai import OpenAI
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+import openai
+from openai import AsyncOpenAI
+
+from app.engines.translate.blocks import BlockParser, parse_blocks
+from app.engines.translate.memory import MemoryKey, MemoryStats, TranslationMemory, normalize_source, short_hash
+from app.engines.translate.rate_limit import RateLimiter
+
+INSTRUCTIONS = (
+    "You are translating Japanese manga dialogue into natural English.\n"
+    "Rules:\n"
+    "- Keep honorifics (-san, -kun, -chan, -sama) when present.\n"
+    "- Keep name order as it appears.\n"
+    "- Preserve bracketed region ids exactly.\n"
+    "- Output ONLY in this format:\n"
+    "[id]\nEnglish\n\n"
+)
 
 @dataclass
 class RegionText:
     region_id: str
     jp: str
+    context: str = ""  # optional disambiguating context (e.g. speaker); part of the memory key
+
+@dataclass
+class BatchLimits:
+    chunk_tokens: int = 2000      # estimated input tokens per request
+    chunk_items: int = 40         # regions per request
+    concurrency: int = 4          # requests in flight
+    rpm: int = 0                  # requests per minute (0 = unlimited)
+    tpm: int = 0                  # tokens per minute, input + expected output (0 = unlimited)
+    max_retries: int = 5          # per request, on 429 / 5xx / connection errors
+    max_repairs: int = 2          # follow-up requests for ids missing from a reply
+    backoff_base: float = 0.5     # seconds; doubles per retry, with full jitter
+    backoff_max: float = 30.0
+
+@dataclass
+class BatchStats:
+    requests: int = 0
+    retries: int = 0
+    repairs: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    seconds: float = 0.0
+    failed_ids: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (
+            f"{self.requests} requests ({self.retries} retries, {self.repairs} repairs), "
+            f"{self.input_tokens} in / {self.output_tokens} out tokens, {self.seconds:.1f}s"
+            + (f", {len(self.failed_ids)} regions untranslated" if self.failed_ids else "")
+        )
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count without a tokenizer: ~1 per CJK character, ~4 characters per token otherwise."""
+    wide = sum(1 for ch in text if ord(ch) >= 0x3000)
+    return wide + (len(text) - wide + 3) // 4
+
+
+def build_payload(items: List[RegionText]) -> str:
+    return "\n".join([f"[{r.region_id}]\n{r.jp}" for r in items])
+
+
+def chunk_regions(items: List[RegionText], max_tokens: int, max_items: int) -> List[List[RegionText]]:
+    """Split regions, in order, into requests of at most `max_tokens` (estimated) and `max_items` each."""
+    chunks: List[List[RegionText]] = []
+    cur: List[RegionText] = []
+    used = 0
+    for r in items:
+        cost = estimate_tokens(r.jp) + 4  # + the "[id]" line
+        if cur and (used + cost > max_tokens or len(cur) >= max_items):
+            chunks.append(cur)
+            cur, used = [], 0
+        cur.append(r)
+        used += cost
+    if cur:
+        chunks.append(cur)
+    return chunks
+
+
+def _retryable(e: Exception) -> bool:
+    if isinstance(e, openai.APIConnectionError):  # includes timeouts
+        return True
+    if isinstance(e, openai.APIStatusError):
+        return e.status_code in (408, 409, 429) or e.status_code >= 500
+    return False
+
+
+def _retry_after(e: Exception) -> Optional[float]:
+    resp = getattr(e, "response", None)
+    value = resp.headers.get("retry-after") if resp is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
 
 class OpenAITranslator:
-    def __init__(self, model: str = "gpt-5.2"):
-        self.client = OpenAI()
+    def __init__(
+        self,
+        model: str = "gpt-5.2",
+        *,
+        limits: Optional[BatchLimits] = None,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        async_client: Optional[AsyncOpenAI] = None,
+        memory: Optional[TranslationMemory] = None,
+        on_log: Optional[Callable[[str], None]] = None,
+    ):
         self.model = model
+        self.limits = limits or BatchLimits()
+        self.base_url = base_url
+        self.api_key = api_key
+        self.async_client = async_client
+        self.memory = memory
+        self.on_log = on_log
+        self.stats = BatchStats()
+        self._instructions_hash = short_hash(INSTRUCTIONS)
+        self._thread = threading.local()
 
     def translate_regions(self, regions: Iterable[RegionText]) -> List[str]:
+        """
+        Blocking wrapper around `translate_regions_async`. Called from inside a
+        running event loop (where asyncio.run refuses to start), it runs on a
+        helper thread with its own loop; async callers should await the async
+        API instead so their loop isn't blocked.
+        """
         items = list(regions)
-        payload = "\n".join([f"[{r.region_id}]\n{r.jp}" for r in items])
-
-        instructions = (
-            "You are translating Japanese manga dialogue into natural English.\n"
-            "Rules:\n"
-            "- Keep honorifics (-san, -kun, -chan, -sama) when present.\n"
-            "- Keep name order as it appears.\n"
-            "- Preserve bracketed region ids exactly.\n"
-            "- Output ONLY in this format:\n"
-            "[id]\nEnglish\n\n"
-        )
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.translate_regions_async(items))
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="translate") as pool:
+            return pool.submit(self._translate_on_own_loop, items).result()
 
-        resp = self.client.responses.create(
-            model=self.model,
-            instructions=instructions,
-            input=payload,
-        )
+    def _translate_on_own_loop(self, items: List[RegionText]) -> List[str]:
+        # A caller's async_client belongs to the caller's loop: this loop gets a client of its own.
+        self._thread.own_client = True
+        try:
+            return asyncio.run(self.translate_regions_async(items))
+        finally:
+            self._thread.own_client = False
 
-        text = resp.output_text.strip()
-        return self._parse_blocks(text, [r.region_id for r in items])
+    def _memory_key(self, r: RegionText) -> MemoryKey:
+        return MemoryKey(self.model, self._instructions_hash, normalize_source(r.jp), short_hash(r.context) if r.context else "")
 
-    def _parse_blocks(self, text: str, ids: List[str]) -> List[str]:
-        out = {rid: "" for rid in ids}
-        current = None
-        lines = text.splitlines()
-        for line in lines:
-            line = line.strip()
-            if line.startswith("[") and line.endswith("]"):
-                current = line[1:-1]
+    def _split_known(self, items: List[RegionText]):
+        """
+        Split a batch into regions the memory already knows and the distinct
+        lines still to send. Returns (known: region_id -> text, todo regions,
+        sharers: todo region_id -> every region_id with the same line, keys: todo region_id -> MemoryKey).
+        """
+        if self.memory is None:
+            return {}, items, {r.region_id: [r.region_id] for r in items}, {}
+        self.memory.stats = MemoryStats()
+        keys = [self._memory_key(r) for r in items]
+        hits = self.memory.get_many(keys)
+        known: Dict[str, str] = {}
+        first: Dict[MemoryKey, RegionText] = {}
+        sharers: Dict[str, List[str]] = {}
+        for k, r in zip(keys, items):
+            if k in hits:
+                known[r.region_id] = hits[k]
+            elif k in first:
+                sharers[first[k].region_id].append(r.region_id)
+            else:
+                first[k] = r
+                sharers[r.region_id] = [r.region_id]
+        return known, list(first.values()), sharers, {r.region_id: k for k, r in first.items()}
+
+    def _remember(self, todo: List[RegionText], keys: Dict[str, MemoryKey], got: Dict[str, str]) -> None:
+        if self.memory is not None:
+            self.memory.put_many(
+                (keys[r.region_id], got[r.region_id], estimate_tokens(r.jp) + estimate_tokens(got[r.region_id]))
+                for r in todo
+                if r.region_id in got
+            )
+
+    async def translate_regions_async(self, regions: Iterable[RegionText]) -> List[str]:
+        """
+        Translate regions in token-budgeted chunks sent concurrently under the
+        rate limiter. Returns one string per region, in input order; regions
+        still missing after retries and repairs come back empty. With a
+        translation memory, remembered lines are answered locally and each
+        distinct missing line is sent once.
+        """
+        items = list(regions)
+        self.stats = BatchStats()
+        if not items:
+            return []
+        known, todo, sharers, keys = self._split_known(items)
+        got = await self._translate_remote(todo) if todo else {}
+        self._remember(todo, keys, got)
+        for rid, text in list(got.items()):
+            for other in sharers[rid]:
+                known[other] = text
+        self._log_run()
+        return [known.get(r.region_id, "") for r in items]
+
+    async def translate_regions_stream(self, regions: Iterable[RegionText]) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Streaming variant: yields (region_id, text) as soon as each region's
+        block is complete in the response stream, so typesetting can start on
+        early regions while later ones are still generating. Memory hits come
+        first. Regions that never arrive are not yielded; see `stats.failed_ids`.
+        """
+        items = list(regions)
+        self.stats = BatchStats()
+        if not items:
+            return
+        known, todo, sharers, keys = self._split_known(items)
+        for r in items:
+            if r.region_id in known:
+                yield r.region_id, known[r.region_id]
+        if not todo:
+            self._log_run()
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def emit(rid: str, text: str) -> None:
+            for other in sharers[rid]:
+                queue.put_nowait((other, text))
+
+        task = asyncio.create_task(self._translate_remote(todo, emit, stream=True))
+        task.add_done_callback(lambda _t: queue.put_nowait(None))
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield item
+            got = task.result()  # re-raises a failed run
+        finally:
+            if not task.done():
+                task.cancel()
+        self._remember(todo, keys, got)
+        self._log_run()
+
+    def _log_run(self) -> None:
+        if self.on_log is None:
+            return
+        self.on_log(f"Translation: {self.stats.summary()}")
+        if self.memory is not None:
+            self.on_log(f"Translation memory [{self.memory.namespace}]: {self.memory.stats.summary()}")
+
+    async def _translate_remote(
+        self, items: List[RegionText], emit: Optional[Callable[[str, str], None]] = None, stream: bool = False
+    ) -> Dict[str, str]:
+        lim = self.limits
+        limiter = RateLimiter(lim.rpm, lim.tpm)
+        gate = asyncio.Semaphore(max(1, lim.concurrency))
+        t0 = time.monotonic()
+
+        shared = None if getattr(self._thread, "own_client", False) else self.async_client
+        client = shared or AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+        try:
+            async def run(chunk: List[RegionText]) -> Dict[str, str]:
+                async with gate:
+                    return await self._translate_chunk(client, limiter, chunk, emit, stream)
+
+            results = await asyncio.gather(*(run(c) for c in chunk_regions(items, lim.chunk_tokens, lim.chunk_items)))
+        finally:
+            if client is not shared:
+                await client.close()
+
+        got: Dict[str, str] = {}
+        for part in results:
+            got.update(part)
+        self.stats.seconds += time.monotonic() - t0
+        self.stats.failed_ids.extend(r.region_id for r in items if r.region_id not in got)
+        return got
+
+    async def _translate_chunk(
+        self,
+        client: AsyncOpenAI,
+        limiter: RateLimiter,
+        chunk: List[RegionText],
+        emit: Optional[Callable[[str, str], None]] = None,
+        stream: bool = False,
+    ) -> Dict[str, str]:
+        got: Dict[str, str] = {}
+
+        def on_blocks(blocks: List[Tuple[str, str]]) -> None:
+            for rid, text in blocks:
+                if rid not in got:
+                    got[rid] = text
+                    if emit is not None:
+                        emit(rid, text)
+
+        pending = chunk
+        for attempt in range(self.limits.max_repairs + 1):
+            if attempt:
+                self.stats.repairs += 1
+            parser = BlockParser([r.region_id for r in pending])
+            await self._request(client, limiter, pending, parser, on_blocks, stream)
+            # Only the ids the reply skipped (or a broken stream never reached) go out again.
+            pending = [r for r in pending if r.region_id not in got]
+            if not pending:
+                break
+        return got
+
+    async def _request(
+        self,
+        client: AsyncOpenAI,
+        limiter: RateLimiter,
+        items: List[RegionText],
+        parser: BlockParser,
+        on_blocks: Callable[[List[Tuple[str, str]]], None],
+        stream: bool = False,
+    ) -> None:
+        lim = self.limits
+        payload = build_payload(items)
+        est_in = estimate_tokens(INSTRUCTIONS) + estimate_tokens(payload)
+        est = est_in * 2  # expected output is about as long as the input
+        attempt = 0
+        while True:
+            await limiter.acquire(est)
+            self.stats.requests += 1
+            received = False
+            resp = None
+            try:
+                if stream:
+                    events = await client.responses.create(
+                        model=self.model, instructions=INSTRUCTIONS, input=payload, stream=True
+                    )
+                    async with events:
+                        async for ev in events:
+                            if ev.type == "response.output_text.delta":
+                                received = True
+                                on_blocks(parser.feed(ev.delta))
+                            elif ev.type == "response.completed":
+                                resp = ev.response
+                else:
+                    resp = await client.responses.create(model=self.model, instructions=INSTRUCTIONS, input=payload)
+                    on_blocks(parser.feed(resp.output_text))
+            except Exception as e:
+                if received:
+                    # Broken mid-stream: keep the blocks that completed (the open one may be
+                    # truncated); the caller's repair pass asks for the rest.
+                    return
+                if attempt >= lim.max_retries or not _retryable(e):
+                    raise
+                self.stats.retries += 1
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = random.uniform(0, min(lim.backoff_max, lim.backoff_base * 2 ** attempt))
+                if isinstance(e, openai.RateLimitError):
+                    limiter.pause(delay)  # everyone backs off, not just this request
+                await asyncio.sleep(delay)
+                attempt += 1
                 continue
-            if current in out and line:
-                out[current] += (line + "\n")
-        return [out[rid].strip() for rid in ids]
\ No newline at end of file
+
+            if resp is None:
+                return  # stream ended without response.completed: truncated, same as above
+            on_blocks(parser.close())
+            usage = getattr(resp, "usage", None)
+            if usage is not None:
+                self.stats.input_tokens += usage.input_tokens or 0
+                self.stats.output_tokens += usage.output_tokens or 0
+                limiter.settle(est, (usage.input_tokens or 0) + (usage.output_tokens or 0))
+            return
+
+    def _parse_blocks(self, text: str, ids: List[str]) -> List[str]:
+        out = parse_blocks(text, ids)
+        return [out.get(rid, "") for rid in ids]
@@ -0,0 +1,67 @@
+from __future__ import annotations
+import asyncio
+import time
+from typing import Callable
+
+
+class _Bucket:
+    """Token bucket holding up to one minute's allowance, refilled continuously."""
+
+    def __init__(self, per_minute: float, now: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.stamp = now
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until `amount` is available (0 if it already is)."""
+        amount = min(amount, self.capacity)  # a single oversized request still gets through
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+
+class RateLimiter:
+    """
+    Async requests-per-minute / tokens-per-minute limiter shared by all
+    concurrent requests of a translator. A limit of 0 disables that bucket.
+    Waiters are served in arrival order; `pause` holds everyone back after the
+    server asked us to slow down (429 / Retry-After).
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        now = clock()
+        self._requests = _Bucket(rpm, now) if rpm > 0 else None
+        self._tokens = _Bucket(tpm, now) if tpm > 0 else None
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self.waited = 0.0  # total seconds spent throttled, for stats
+
+    async def acquire(self, tokens: int = 0) -> None:
+        async with self._lock:
+            while True:
+                now = self.clock()
+                delay = max(0.0, self._paused_until - now)
+                for bucket, amount in ((self._requests, 1), (self._tokens, tokens)):
+                    if bucket is not None:
+                        bucket.refill(now)
+                        delay = max(delay, bucket.wait_for(amount))
+                if delay <= 0:
+                    break
+                self.waited += delay
+                await asyncio.sleep(delay)
+            if self._requests is not None:
+                self._requests.level -= 1
+            if self._tokens is not None:
+                self._tokens.level -= min(tokens, self._tokens.capacity)
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, self.clock() + seconds)
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct the token bucket once a response reports the real usage."""
+        if self._tokens is not None:
+            self._tokens.level = min(self._tokens.capacity, self._tokens.level + estimated - actual)
@@ -1,18 +1,36 @@
+import json
+import os
 import sys
-from PySide6.QtWidgets import QApplication
-from app.ui.main_window import MainWindow
+
+from app.core.startup import StartupTimer
+
+# Set by benchmarks/bench_gui_startup.py: print the start-up timings as JSON and
+# quit once the deferred start-up work is done.
+PROBE_ENV = "MANGA_LOCALIZER_STARTUP_PROBE"
+
 
 def main() -> int:
+    timer = StartupTimer()
+    from PySide6.QtWidgets import QApplication
+
+    timer.mark("import Qt")
     app = QApplication(sys.argv)
     app.setApplicationName("Manga Localizer UI")
+    timer.mark("QApplication")
+
+    from app.ui.main_window import MainWindow
+
+    timer.mark("import main window")
 
-    # Modern theme
-    try:
-        import qdarktheme
-        app.setStyleSheet(qdarktheme.load_stylesheet("dark"))
-    except Exception:
-        pass  # fallback to default
+    # No application-wide theme: MainWindow.apply_theme sets DARK_THEME on the
+    # window (dialogs inherit it), so a qdarktheme stylesheet would be parsed
+    # and immediately overridden.
+    w = MainWindow(startup=timer)
+    if os.environ.get(PROBE_ENV):
+        def report() -> None:
+            print(json.dumps(timer.as_dict()), flush=True)
+            w.close()
 
-    w = MainWindow()
+        w.startup_finished.connect(report)
     w.show()
     return app.exec()
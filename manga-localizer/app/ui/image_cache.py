@@ -0,0 +1,163 @@
+from __future__ import annotations
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice, QSize, Qt
+from PySide6.QtGui import QImage, QImageReader, QPixmap
+
+from app.core.archive import read_page, split_page, stat_page
+from app.core.lru import ByteLRU
+
+ImageKey = Tuple[str, int, int]  # (path, mtime_ns, size)
+ScaledKey = Tuple[ImageKey, int, int, bool]  # (image, width, height, smooth)
+
+_MISSING = (-1, -1)
+
+
+def _pixmap_bytes(pm: QPixmap) -> int:
+    return pm.width() * pm.height() * max(1, pm.depth()) // 8
+
+
+def image_reader(path: str) -> QImageReader:
+    """A reader over the file, or over the bytes of a page inside a CBZ / ZIP."""
+    if split_page(Path(path)) is None:
+        reader = QImageReader(path)
+    else:
+        buf = QBuffer()
+        buf.setData(QByteArray(read_page(Path(path))))
+        buf.open(QIODevice.ReadOnly)
+        reader = QImageReader(buf)
+        reader._device = buf  # the reader does not own (or keep alive) its device
+    reader.setAutoTransform(True)
+    return reader
+
+
+def decode_image(path: str) -> QImage:
+    try:
+        return image_reader(path).read()
+    except Exception:  # missing file, damaged archive entry
+        return QImage()
+
+
+class ImageCache:
+    """
+    Two-level preview cache:
+      1. decoded full-resolution QImages, keyed by (path, mtime, size), bounded in bytes;
+      2. scaled QPixmaps ready for a QLabel, keyed by image key + target size + quality.
+    File signatures are stat'ed once and remembered until `invalidate()`, so
+    flipping pages or dragging the splitter doesn't touch the disk.
+    """
+
+    def __init__(self, image_budget: int = 512 * 1024 * 1024, scaled_budget: int = 128 * 1024 * 1024):
+        self.images: ByteLRU[ImageKey, QImage] = ByteLRU(image_budget, cost=lambda img: img.sizeInBytes())
+        self.scaled_cache: ByteLRU[ScaledKey, QPixmap] = ByteLRU(scaled_budget, cost=_pixmap_bytes)
+        self._sigs: Dict[str, Tuple[int, int]] = {}
+        self._dims: Dict[ImageKey, QSize] = {}
+        self._lock = threading.Lock()
+
+    # ---------- signatures ----------
+    def key_for(self, path: Path) -> Optional[ImageKey]:
+        p = str(path)
+        with self._lock:
+            sig = self._sigs.get(p)
+        if sig is None:
+            try:
+                st = stat_page(Path(p))
+                sig = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                sig = _MISSING
+            with self._lock:
+                self._sigs[p] = sig
+        if sig == _MISSING:
+            return None
+        return (p, sig[0], sig[1])
+
+    def exists(self, path: Path) -> bool:
+        return self.key_for(path) is not None
+
+    def set_dims(self, key: ImageKey, size: QSize) -> None:
+        with self._lock:
+            self._dims[key] = QSize(size)
+
+    def dims(self, key: ImageKey) -> Optional[QSize]:
+        with self._lock:
+            d = self._dims.get(key)
+        if d is None:
+            img = self.images.peek(key)
+            d = img.size() if img is not None else None
+        return d
+
+    # ---------- level 1: decoded images ----------
+    def image(self, path: Path) -> Optional[QImage]:
+        key = self.key_for(path)
+        if key is None:
+            return None
+        img = self.images.get(key)
+        if img is not None:
+            return img
+        img = decode_image(key[0])
+        if img.isNull():
+            return None
+        self.images.put(key, img)
+        return img
+
+    def put_image(self, key: ImageKey, img: QImage) -> None:
+        if not img.isNull():
+            self.images.put(key, img)
+
+    # ---------- level 2: scaled renders ----------
+    def cached_scaled(self, key: ImageKey, size: QSize, smooth: bool = True) -> Optional[QPixmap]:
+        pm = self.scaled_cache.get((key, size.width(), size.height(), smooth))
+        if pm is None and not smooth:
+            # A smooth render is always an acceptable stand-in for a fast one.
+            pm = self.scaled_cache.get((key, size.width(), size.height(), True))
+        return pm
+
+    def has_scaled(self, key: ImageKey, size: QSize) -> bool:
+        # Membership only (safe from worker threads; pixmaps themselves stay on the GUI thread).
+        return (key, size.width(), size.height(), True) in self.scaled_cache
+
+    def put_scaled(self, key: ImageKey, size: QSize, smooth: bool, pm: QPixmap) -> None:
+        self.scaled_cache.put((key, size.width(), size.height(), smooth), pm)
+
+    def scaled(self, path: Path, size: QSize, smooth: bool = True) -> Optional[QPixmap]:
+        key = self.key_for(path)
+        if key is None or not size.isValid() or size.isEmpty():
+            return None
+        pm = self.cached_scaled(key, size, smooth)
+        if pm is not None:
+            return pm
+        img = self.image(path)
+        if img is None:
+            return None
+        mode = Qt.SmoothTransformation if smooth else Qt.FastTransformation
+        pm = QPixmap.fromImage(img.scaled(size, Qt.KeepAspectRatio, mode))
+        self.put_scaled(key, size, smooth, pm)
+        return pm
+
+    # ---------- invalidation ----------
+    def invalidate(self, path: Path) -> None:
+        p = str(path)
+        with self._lock:
+            self._sigs.pop(p, None)
+            for k in [k for k in self._dims if k[0] == p]:
+                del self._dims[k]
+        self.images.discard_where(lambda k: k[0] == p)
+        self.scaled_cache.discard_where(lambda k: k[0][0] == p)
+
+    def invalidate_dir(self, folder: Path) -> None:
+        prefix = str(folder).rstrip("/\\")
+        under = lambda p: p == prefix or p.startswith(prefix + os.sep) or p.startswith(prefix + "/")
+        with self._lock:
+            for p in [p for p in self._sigs if under(p)]:
+                del self._sigs[p]
+            for k in [k for k in self._dims if under(k[0])]:
+                del self._dims[k]
+        self.images.discard_where(lambda k: under(k[0]))
+        self.scaled_cache.discard_where(lambda k: under(k[0][0]))
+
+    def forget_signatures(self) -> None:
+        with self._lock:
+            self._sigs.clear()
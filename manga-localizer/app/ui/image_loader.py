@@ -0,0 +1,123 @@
+from __future__ import annotations
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from PySide6.QtCore import QObject, QRunnable, QSize, Qt, QThreadPool, Signal
+from PySide6.QtGui import QImage
+
+from app.ui.image_cache import ImageCache, ImageKey, decode_image, image_reader
+
+
+@dataclass
+class RenderRequest:
+    tag: str                    # which view asked ("original" / "output")
+    generation: int
+    key: ImageKey
+    viewport: Optional[QSize]   # fit-to-view bounding box, or None for zoom mode
+    zoom: float = 1.0
+    fast_first: bool = True
+
+
+def bounding_size(src: QSize, viewport: Optional[QSize], zoom: float) -> QSize:
+    """The size a render is requested (and cached) at: the viewport in fit mode, source*zoom otherwise."""
+    if viewport is not None:
+        return QSize(viewport)
+    return QSize(max(1, round(src.width() * zoom)), max(1, round(src.height() * zoom)))
+
+
+class ImageLoader(QObject):
+    """
+    Decodes and scales previews on a thread pool. Each request carries a
+    generation number per tag; anything older than the latest request for that
+    tag is dropped before decoding, before scaling and again on delivery.
+    Emits a quick reduced-resolution decode first, then the smooth render.
+    Only QImages cross threads; QPixmap conversion is left to the receiver.
+    """
+
+    # tag, generation, key, bounding w, bounding h, image, smooth
+    image_ready = Signal(str, int, object, int, int, QImage, bool)
+    image_failed = Signal(str, int, object)
+
+    def __init__(self, cache: ImageCache, max_threads: int = 2, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._current: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def next_generation(self, tag: str) -> int:
+        with self._lock:
+            gen = self._current.get(tag, 0) + 1
+            self._current[tag] = gen
+            return gen
+
+    def is_current(self, tag: str, generation: int) -> bool:
+        with self._lock:
+            return self._current.get(tag) == generation
+
+    def cancel(self, tag: str) -> None:
+        self.next_generation(tag)
+
+    def request(self, req: RenderRequest) -> None:
+        self.pool.start(_LoadTask(self, req))
+
+
+class _LoadTask(QRunnable):
+    def __init__(self, loader: ImageLoader, req: RenderRequest):
+        super().__init__()
+        self.loader = loader
+        self.req = req
+
+    def _stale(self) -> bool:
+        return not self.loader.is_current(self.req.tag, self.req.generation)
+
+    def _emit(self, img: QImage, bound: QSize, smooth: bool) -> None:
+        self.loader.image_ready.emit(
+            self.req.tag, self.req.generation, self.req.key, bound.width(), bound.height(), img, smooth
+        )
+
+    def run(self) -> None:
+        req = self.req
+        cache = self.loader.cache
+        if self._stale():
+            return
+        path = req.key[0]
+
+        full = cache.images.peek(req.key)
+        if full is None:
+            try:
+                reader = image_reader(path)
+            except Exception:  # missing file, damaged archive entry
+                self.loader.image_failed.emit(req.tag, req.generation, req.key)
+                return
+            src = reader.size()
+            if src.isValid():
+                cache.set_dims(req.key, src)
+                bound = bounding_size(src, req.viewport, req.zoom)
+                target = src.scaled(bound, Qt.KeepAspectRatio)
+                if req.fast_first and target.width() < src.width():
+                    # Reduced-resolution decode (JPEG decodes at 1/2..1/8 scale natively).
+                    reader.setScaledSize(target)
+                    quick = reader.read()
+                    if not quick.isNull() and not self._stale():
+                        self._emit(quick, bound, False)
+            if self._stale():
+                return
+            full = decode_image(path)
+            if full.isNull():
+                self.loader.image_failed.emit(req.tag, req.generation, req.key)
+                return
+            cache.put_image(req.key, full)
+
+        cache.set_dims(req.key, full.size())
+        if self._stale():
+            return
+        bound = bounding_size(full.size(), req.viewport, req.zoom)
+        if bound == full.size():
+            smooth = full
+        else:
+            smooth = full.scaled(bound, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        if not self._stale():
+            self._emit(smooth, bound, True)
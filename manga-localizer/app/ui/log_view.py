@@ -0,0 +1,88 @@
+from __future__ import annotations
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QTextCursor
+from PySide6.QtWidgets import QComboBox, QHBoxLayout, QLabel, QPlainTextEdit, QVBoxLayout, QWidget
+
+from app.core.log_pipeline import DEBUG, ERROR, INFO, WARNING, LogSink
+
+
+class LogView(QWidget):
+    """
+    Log dock contents. Producers (any thread) write into `sink`; a timer moves
+    whatever accumulated onto the screen in one block every `interval_ms`.
+    The widget keeps at most `max_blocks` lines; the full log lives in the sink
+    history and its rotating file.
+    """
+
+    LEVELS = [("All", DEBUG), ("Info+", INFO), ("Warnings+", WARNING), ("Errors", ERROR)]
+
+    def __init__(self, sink: LogSink, max_blocks: int = 5000, interval_ms: int = 100, parent=None):
+        super().__init__(parent)
+        self.sink = sink
+        self.max_blocks = max_blocks
+        self.min_level = DEBUG
+
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setUndoRedoEnabled(False)
+        self.text.setMaximumBlockCount(max_blocks)
+
+        self.level = QComboBox()
+        for name, lvl in self.LEVELS:
+            self.level.addItem(name, lvl)
+        self.level.currentIndexChanged.connect(self._on_level_changed)
+
+        self.status = QLabel("")
+        self.status.setObjectName("CanvasTitle")
+
+        top = QHBoxLayout()
+        top.setContentsMargins(0, 0, 0, 0)
+        top.addWidget(QLabel("Show:"))
+        top.addWidget(self.level)
+        top.addStretch(1)
+        top.addWidget(self.status)
+
+        lay = QVBoxLayout(self)
+        lay.setContentsMargins(6, 6, 6, 6)
+        lay.setSpacing(6)
+        lay.addLayout(top)
+        lay.addWidget(self.text, 1)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+
+    def append(self, line: str) -> None:
+        # Same call shape as QTextEdit.append so existing callers keep working.
+        self.sink.extend(str(line).split("\n"))
+
+    def flush(self) -> None:
+        batch = self.sink.drain()
+        if not batch:
+            return
+        lines = [l for lvl, l in batch if lvl >= self.min_level][-self.max_blocks:]
+        if lines:
+            bar = self.text.verticalScrollBar()
+            at_bottom = bar.value() >= bar.maximum() - 4
+            self.text.appendPlainText("\n".join(lines))
+            if at_bottom:
+                self.text.moveCursor(QTextCursor.End)
+                bar.setValue(bar.maximum())
+        self.status.setText(f"{len(self.sink.history)} lines" + (f" ({self.sink.dropped} rotated out)" if self.sink.dropped else ""))
+
+    def _on_level_changed(self, _index: int) -> None:
+        self.flush()
+        self.min_level = int(self.level.currentData())
+        # Only the capped tail is rendered, never the whole history.
+        lines = self.sink.filtered(self.min_level)[-self.max_blocks:]
+        self.text.setPlainText("\n".join(lines))
+        self.text.moveCursor(QTextCursor.End)
+
+    def start_file(self, path) -> None:
+        self.flush()
+        self.sink.open_file(path)
+
+    def stop_file(self) -> None:
+        self.flush()
+        self.sink.close_file()
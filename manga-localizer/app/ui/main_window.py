@@ -1,25 +1,48 @@
 from __future__ import annotations
 
-import os, subprocess
+import os
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 from PySide6.QtWidgets import QInputDialog, QLineEdit
-from PySide6.QtCore import Qt, QThread, Signal, QSize
-from PySide6.QtGui import QPixmap, QAction
+from PySide6.QtCore import Qt, QThread, Signal, QSize, QTimer, QFileSystemWatcher, QModelIndex
+from PySide6.QtGui import QPixmap, QAction, QImage
 from PySide6.QtWidgets import (
-    QMainWindow, QWidget, QFileDialog, QListWidget, QListWidgetItem,
-    QLabel, QPushButton, QHBoxLayout, QVBoxLayout, QSplitter, QTextEdit,
+    QMainWindow, QWidget, QFileDialog, QListView,
+    QLabel, QPushButton, QHBoxLayout, QVBoxLayout, QSplitter,
     QMessageBox, QCheckBox, QLineEdit, QFormLayout, QComboBox,
     QTabWidget, QToolBar, QDockWidget, QGroupBox, QScrollArea, QToolButton, 
-    QSizePolicy
+    QSizePolicy, QSpinBox
 )
 
-from app.core.config import AppConfig
-from app.core.settings_store import load_settings, save_settings
-from app.core.mit_runner import build_mit_command
+from app.core.archive import close_archives, source_name
+from app.core.config import AppConfig, EngineConfig, PackageConfig
+from app.core.settings_store import data_dir, load_settings, save_settings
+from app.core.thumbs import THUMB_MAX_PX, ThumbnailStore
+from app.ui.image_cache import ImageCache
+from app.ui.image_loader import ImageLoader, RenderRequest, bounding_size
+from app.ui.log_view import LogView
+from app.ui.page_model import FolderScanner, PageFilterModel, PageListModel
+from app.ui.prefetch import Prefetcher
+from app.ui.queue_panel import QueuePanel
+from app.ui.render_scheduler import RenderScheduler
+from app.ui.thumbnails import ThumbnailLoader
+from app.core.job_queue import Job, JobQueue
+from app.core.output_index import OutputIndex
+from app.core.page_table import ST_DONE, ST_FAILED, ST_NONE, ST_RUNNING
+from app.core.log_pipeline import LogSink
+from app.core.progress import (
+    EtaEstimator, PageFailed, PageFinished, PageStarted, ProgressParser, StageChanged, format_duration,
+)
+from app.core.startup import StartupTimer
 
-IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".webp"}
+if TYPE_CHECKING:
+    # The run path (engine process / daemon plumbing) is imported after the first paint.
+    from app.core.engine_client import EngineClient
+    from app.core.mit_runner import RunPlan
+    from app.core.queue_runner import QueueRunner
 
 
 # --------- Themes (Manga Studio: dark + warm light) ---------
@@ -32,7 +55,7 @@ QToolBar QToolButton:pressed { background: #2c3546; }
 QScrollArea { background: #0b0d12; border-radius: 12px; }
 QScrollArea QWidget { background: transparent; }
 
-QLineEdit, QComboBox, QTextEdit {
+QLineEdit, QComboBox, QTextEdit, QPlainTextEdit {
   background: #121722;
   border: 1px solid #2a3140;
   border-radius: 10px;
@@ -65,19 +88,19 @@ QComboBox QAbstractItemView::item:selected {
 }
 
 
-QListWidget {
+QListView {
   background: #121722;
   border: 1px solid #2a3140;
   border-radius: 12px;
   padding: 6px;
 }
-QListWidget::item {
+QListView::item {
   padding: 8px;
   margin: 2px;
   border-radius: 10px;
 }
-QListWidget::item:selected { background: #24304a; border: 1px solid #345089; }
-QListWidget::item:hover { background: #1a2234; }
+QListView::item:selected { background: #24304a; border: 1px solid #345089; }
+QListView::item:hover { background: #1a2234; }
 
 QTabWidget::pane { border: 1px solid #2a3140; border-radius: 12px; background: #121722; }
 QTabBar::tab {
@@ -167,7 +190,7 @@ QToolBar QToolButton {
 QToolBar QToolButton:hover { background: #fff0da; }
 QToolBar QToolButton:pressed { background: #ffe7c5; }
 
-QLineEdit, QComboBox, QTextEdit {
+QLineEdit, QComboBox, QTextEdit, QPlainTextEdit {
   background: #fff7ea;
   border: 1px solid #e2caa7;
   border-radius: 10px;
@@ -194,15 +217,15 @@ QComboBox QAbstractItemView::item:selected {
   color: #2a2420;
 }
 
-QListWidget {
+QListView {
   background: #fff7ea;
   border: 1px solid #e2caa7;
   border-radius: 12px;
   padding: 6px;
 }
-QListWidget::item { padding: 8px; margin: 2px; border-radius: 10px; }
-QListWidget::item:selected { background: #ffe3b5; border: 1px solid #f0b35a; }
-QListWidget::item:hover { background: #fff0da; }
+QListView::item { padding: 8px; margin: 2px; border-radius: 10px; }
+QListView::item:selected { background: #ffe3b5; border: 1px solid #f0b35a; }
+QListView::item:hover { background: #fff0da; }
 
 QTabWidget::pane { border: 1px solid #e2caa7; border-radius: 12px; background: #fff7ea; }
 QTabBar::tab {
@@ -268,7 +291,7 @@ QCheckBox::indicator:hover {
   border: 1px solid #ebae34;
 }
 
-QListWidget::item:selected {
+QListView::item:selected {
   background: #ffe3b5;
   border: 1px solid #f0b35a;
   color: #2a2420;
@@ -281,49 +304,125 @@ class PageItem:
 
 
 class MitWorker(QThread):
-    log_line = Signal(str)
+    """
+    Plans the run (manifest hashing, archive extraction, normalizing, strip
+    slicing can all take a while), then runs the engine and records the result.
+    """
+
+    planned = Signal(object)   # RunPlan, before the engine starts
+    progress = Signal(object)  # progress.ProgressEvent
     finished_code = Signal(int)
 
-    def __init__(self, cmd: List[str], workdir: Optional[Path] = None, api_key: str = ""):
+    def __init__(
+        self,
+        cfg: EngineConfig,
+        input_folder: Path,
+        output_folder: Path,
+        api_key: str = "",
+        clients: Optional[List[EngineClient]] = None,
+        sink: Optional[LogSink] = None,
+        package: Optional[PackageConfig] = None,
+    ):
         super().__init__()
-        self.cmd = cmd
-        self.workdir = workdir
+        self.sink = sink or LogSink()
+        self.cfg = cfg
+        self.input_folder = input_folder
+        self.output_folder = output_folder
+        self.plan: Optional[RunPlan] = None
         self.api_key = api_key.strip()
+        self.clients = clients
+        self.package = package
+        self.cancel = threading.Event()  # set on app exit: the engine is stopped, not restarted cold
 
     def run(self) -> None:
-        env = os.environ.copy()
-        env["PYTHONUTF8"] = "1"
-        env["PYTHONIOENCODING"] = "utf-8"
-
-        if self.api_key:
-            env["OPENAI_API_KEY"] = self.api_key
-
-        proc = subprocess.Popen(
-            self.cmd,
-            cwd=str(self.workdir) if self.workdir else None,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            env=env,
-        )
-        assert proc.stdout is not None
-        for line in proc.stdout:
-            self.log_line.emit(line.rstrip())
-        self.finished_code.emit(proc.wait())
+        from app.core.mit_runner import CANCELLED, build_mit_command, execute_plan, prepare_run
+
+        try:
+            self.plan = plan = prepare_run(self.cfg, self.input_folder, self.output_folder, self.sink.append)
+        except Exception as e:
+            self.sink.append(f"Could not prepare the run: {e}")
+            self.finished_code.emit(1)
+            return
+        self.sink.append(f"Plan: {plan.summary()}")
+        self.planned.emit(plan)
+        if self.cancel.is_set():
+            self.finished_code.emit(CANCELLED)
+            return
+        if not plan.pages:
+            self._finish()
+            self.sink.append("Nothing to do: all outputs are up to date.")
+            self.finished_code.emit(0)
+            return
+        cmd = build_mit_command(self.cfg, plan.input_folder, self.output_folder)
+        self.sink.append("Running:\n" + " ".join(cmd) + "\n")
+
+        parser = ProgressParser()
+
+        def on_log(line: str) -> None:
+            # No per-line signal: the log view drains the sink on a timer.
+            self.sink.append(line)
+            for ev in parser.feed(line):
+                self.progress.emit(ev)
+
+        try:
+            code = execute_plan(self.cfg, self.plan, on_log, clients=self.clients, api_key=self.api_key,
+                                cancel=self.cancel, package=self.package)
+        except Exception as e:
+            self.sink.append(f"Engine run failed: {e}")
+            code = 1
+        for ev in parser.close(code):
+            self.progress.emit(ev)
+        self._finish()
+        self.finished_code.emit(code)
+
+    def _finish(self) -> None:
+        plan = self.plan
+        try:
+            recorded = plan.finish()
+            if plan.manifest is not None:
+                self.sink.append(f"Manifest updated: {recorded}/{len(plan.pages)} pages recorded.")
+        except OSError as e:
+            self.sink.append(f"Failed to update manifest: {e}")
 
 class MainWindow(QMainWindow):
-    def __init__(self) -> None:
+    startup_finished = Signal()
+    # Queue runner callbacks (worker threads) -> GUI thread
+    job_progress = Signal(str, object)   # job id, progress.ProgressEvent
+    job_finished = Signal(str)
+    queue_idle = Signal()
+
+    def __init__(self, startup: Optional[StartupTimer] = None) -> None:
         super().__init__()
+        self.startup = startup or StartupTimer()
+        self._first_paint = False
         self.setWindowTitle("Manga Localizer UI")
         self.resize(1280, 820)
 
         self.cfg: AppConfig = load_settings()
+        self.startup.mark("load settings")
         self.current_dir: Optional[Path] = Path(self.cfg.last_open_dir) if self.cfg.last_open_dir else None
-        self.pages: List[PageItem] = []
         self.current_page: Optional[PageItem] = None
         self.worker: Optional[MitWorker] = None
+        self.engine_clients: List[EngineClient] = []
+        self.run_plan: Optional[RunPlan] = None
+        self.eta: Optional[EtaEstimator] = None
+        self.image_cache = ImageCache()
+        self.output_index = OutputIndex()
+        self.out_watcher = QFileSystemWatcher(self)
+        self._out_sync_timer = QTimer(self)
+        self._out_sync_timer.setSingleShot(True)
+        self._out_sync_timer.setInterval(200)
+        self._out_sync_timer.timeout.connect(self._sync_output_index)
+        self.out_watcher.directoryChanged.connect(lambda _p: self._out_sync_timer.start())
+        self.image_loader = ImageLoader(self.image_cache, parent=self)
+        self.image_loader.image_ready.connect(self._on_image_ready)
+        self.image_loader.image_failed.connect(self._on_image_failed)
+        self.render_scheduler = RenderScheduler(self._render_previews, parent=self)
+        self.prefetcher = Prefetcher(self.image_cache, radius=2, parent=self)
+        self.prefetcher.prefetched.connect(self._on_prefetched)
+        self.render_scheduler.rendered.connect(self._on_rendered)
+        self.scanner: Optional[FolderScanner] = None
+        self._scan_gen = 0
 
         # Zoom state for previews
         self._zoom = 1.0
@@ -339,10 +438,18 @@ class MainWindow(QMainWindow):
         self.act_open.triggered.connect(self.open_folder)
         tb.addAction(self.act_open)
 
+        self.act_open_archive = QAction("Open Archive", self)
+        self.act_open_archive.triggered.connect(self.open_archive)
+        tb.addAction(self.act_open_archive)
+
         self.act_run = QAction("Translate", self)
         self.act_run.triggered.connect(self.translate_folder)
         tb.addAction(self.act_run)
 
+        self.act_queue = QAction("Add to Queue", self)
+        self.act_queue.triggered.connect(self._enqueue_current)
+        tb.addAction(self.act_queue)
+
         self.act_out = QAction("Open Output", self)
         self.act_out.triggered.connect(self.open_output_folder)
         tb.addAction(self.act_out)
@@ -359,13 +466,34 @@ class MainWindow(QMainWindow):
         # -------- Left: search + list --------
         self.search = QLineEdit()
         self.search.setPlaceholderText("Search pages…")
-        self.search.textChanged.connect(self._apply_search_filter)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(150)  # filter once typing pauses, not per keystroke
+        self._search_timer.timeout.connect(self._apply_search_filter)
+        self.search.textChanged.connect(lambda _t: self._search_timer.start())
+        self.search.returnPressed.connect(self._apply_search_filter)
 
         self.progress_badge = QLabel("0/0")
         self.progress_badge.setObjectName("CanvasTitle")
 
-        self.list_widget = QListWidget()
-        self.list_widget.currentItemChanged.connect(self._on_select_page)
+        self.thumb_loader = ThumbnailLoader(
+            ThumbnailStore(data_dir("thumbs"), max_bytes=self.cfg.thumb_cache_mb * 1024 * 1024), parent=self)
+        self.page_model = PageListModel(self.thumb_loader, parent=self)
+        self.thumb_loader.ready.connect(self.page_model.set_icon)
+
+        self.list_view = QListView()
+        self.list_view.setUniformItemSizes(True)  # row heights are not measured per item
+        self.list_view.setLayoutMode(QListView.Batched)
+        self.page_filter = PageFilterModel(self)
+        self.page_filter.setSourceModel(self.page_model)
+        self.list_view.setModel(self.page_filter)
+        self.list_view.selectionModel().currentChanged.connect(self._on_select_page)
+
+        self.btn_thumbs = QToolButton()
+        self.btn_thumbs.setText("▦")
+        self.btn_thumbs.setToolTip("Thumbnail view")
+        self.btn_thumbs.setCheckable(True)
+        self.btn_thumbs.toggled.connect(self._set_thumbnail_view)
 
         left = QWidget()
         left_layout = QVBoxLayout(left)
@@ -374,9 +502,10 @@ class MainWindow(QMainWindow):
 
         row = QHBoxLayout()
         row.addWidget(self.search, 1)
+        row.addWidget(self.btn_thumbs)
         row.addWidget(self.progress_badge)
         left_layout.addLayout(row)
-        left_layout.addWidget(self.list_widget, 1)
+        left_layout.addWidget(self.list_view, 1)
 
         # -------- Center: preview tabs + zoom controls --------
         self.preview_tabs = QTabWidget()
@@ -439,6 +568,33 @@ class MainWindow(QMainWindow):
         self.chk_verbose = QCheckBox("Verbose (debug + intermediates)")
         self.chk_verbose.setChecked(self.cfg.engine.verbose)
 
+        self.chk_persistent = QCheckBox("Keep engine loaded between runs")
+        self.chk_persistent.setChecked(self.cfg.engine.persistent_engine)
+
+        self.chk_stage_cache = QCheckBox("Cache OCR / inpainting between runs")
+        self.chk_stage_cache.setChecked(self.cfg.engine.stage_cache)
+        self.chk_stage_cache.setToolTip(
+            "Keep each page's detection, OCR, translation and inpainting results, so changing only the\n"
+            "render settings or the font re-typesets without redoing them. Needs the engine kept loaded."
+        )
+
+        self.chk_normalize = QCheckBox("Normalize input pages")
+        self.chk_normalize.setChecked(self.cfg.engine.normalize_inputs)
+        self.chk_normalize.setToolTip(
+            f"Convert scans to RGB, apply EXIF rotation, cap the shorter side at "
+            f"{self.cfg.engine.normalize_short_side}px and drop metadata before the engine reads them.\n"
+            "Converted pages are cached and reused by later runs."
+        )
+
+        self.shards = QSpinBox()
+        self.shards.setRange(0, 64)
+        self.shards.setSpecialValueText("Auto")
+        self.shards.setValue(self.cfg.engine.shards)
+        self.shards.setToolTip("Parallel engine processes (CPU). Auto = from cores and free RAM.")
+
+        self.chk_pin = QCheckBox("Pin shards to CPU cores")
+        self.chk_pin.setChecked(self.cfg.engine.pin_shards)
+
         self.python_exe = QLineEdit(self.cfg.engine.python_exe)
 
         self.engine_dir = QLineEdit(getattr(self.cfg.engine, "engine_dir", ""))
@@ -466,6 +622,11 @@ class MainWindow(QMainWindow):
         engine_form.addRow("Engine python:", self.python_exe)
         engine_form.addRow("", self.chk_gpu)
         engine_form.addRow("", self.chk_verbose)
+        engine_form.addRow("", self.chk_persistent)
+        engine_form.addRow("", self.chk_stage_cache)
+        engine_form.addRow("", self.chk_normalize)
+        engine_form.addRow("Shards:", self.shards)
+        engine_form.addRow("", self.chk_pin)
 
         typeset_box = QGroupBox("Typeset")
         typeset_form = QFormLayout(typeset_box)
@@ -481,6 +642,25 @@ class MainWindow(QMainWindow):
         cleaning_form.addRow("OCR:", self.ocr)
         cleaning_form.addRow("Inpainter:", self.inpainter)
 
+        self.chk_package = QCheckBox("Pack a CBZ after each run")
+        self.chk_package.setChecked(self.cfg.package.enabled)
+        self.chk_package.setToolTip("Re-encode the chapter's output pages and pack them into <output>/<chapter>.cbz")
+
+        self.package_format = QComboBox()
+        self.package_format.addItems(["webp", "jpeg", "png", "keep"])
+        self.package_format.setCurrentText(self.cfg.package.format)
+
+        self.package_quality = QSpinBox()
+        self.package_quality.setRange(1, 100)
+        self.package_quality.setValue(self.cfg.package.quality)
+
+        package_box = QGroupBox("Package")
+        package_form = QFormLayout(package_box)
+        package_form.setSpacing(10)
+        package_form.addRow("", self.chk_package)
+        package_form.addRow("Format:", self.package_format)
+        package_form.addRow("Quality:", self.package_quality)
+
         settings_panel = QWidget()
         settings_layout = QVBoxLayout(settings_panel)
         settings_layout.setContentsMargins(10, 10, 10, 10)
@@ -488,6 +668,7 @@ class MainWindow(QMainWindow):
         settings_layout.addWidget(engine_box)
         settings_layout.addWidget(typeset_box)
         settings_layout.addWidget(cleaning_box)
+        settings_layout.addWidget(package_box)
         settings_layout.addStretch(1)
 
         settings_scroll = QScrollArea()
@@ -504,6 +685,7 @@ class MainWindow(QMainWindow):
         splitter.setStretchFactor(1, 1)
         splitter.setStretchFactor(2, 0)
         splitter.setSizes([280, 720, 360])
+        splitter.splitterMoved.connect(self._on_splitter_moved)
 
         root = QWidget()
         root_layout = QVBoxLayout(root)
@@ -512,8 +694,8 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(root)
 
         # -------- Bottom log dock --------
-        self.log = QTextEdit()
-        self.log.setReadOnly(True)
+        self.log_sink = LogSink()
+        self.log = LogView(self.log_sink)
 
         dock = QDockWidget("Logs", self)
         dock.setAllowedAreas(Qt.BottomDockWidgetArea)
@@ -521,14 +703,63 @@ class MainWindow(QMainWindow):
         self.addDockWidget(Qt.BottomDockWidgetArea, dock)
         dock.setMinimumHeight(160)
 
-        # Autofill on first run
+        # -------- Job queue dock (tabbed with the logs) --------
+        self.job_queue = JobQueue(data_dir() / "queue.json")
+        self.queue_runner: Optional[QueueRunner] = None
+        self._queue_after_run = False
+        self.queue_panel = QueuePanel(self.job_queue, self._output_dir_for, self.cfg.queue_concurrency)
+        self.job_queue.on_change = self.queue_panel.queue_changed.emit
+        self.queue_panel.run_toggled.connect(self._on_queue_toggled)
+        self.queue_panel.cancel_requested.connect(self._cancel_job)
+        self.job_progress.connect(self._on_job_progress)
+        self.job_finished.connect(self._on_job_finished)
+        self.queue_idle.connect(self._on_queue_idle)
+
+        queue_dock = QDockWidget("Queue", self)
+        queue_dock.setAllowedAreas(Qt.BottomDockWidgetArea)
+        queue_dock.setWidget(self.queue_panel)
+        self.addDockWidget(Qt.BottomDockWidgetArea, queue_dock)
+        self.tabifyDockWidget(dock, queue_dock)
+        dock.raise_()
+
+        # Preview render instrumentation (renders/s, time per render)
+        self.render_stats = QLabel("")
+        self.render_stats.setObjectName("CanvasTitle")
+        self.statusBar().addPermanentWidget(self.render_stats)
+
+        self.btn_thumbs.setChecked(self.cfg.thumbnail_view)
+
+        # Apply theme (default dark)
+        self.apply_theme(dark=True)
+        self.startup.mark("build window")
+        # Path autofill, the last folder and the run-path imports wait for the first paint.
+
+    def paintEvent(self, event) -> None:
+        super().paintEvent(event)
+        if not self._first_paint:
+            self._first_paint = True
+            self.startup.mark("first paint")
+            QTimer.singleShot(0, self._finish_startup)
+
+    def _finish_startup(self) -> None:
+        """Start-up work that does not need to block the window from showing."""
         self._autofill_paths_if_missing()
+        self.startup.mark("autofill paths")
 
         if self.current_dir and self.current_dir.exists():
-            self._load_folder(self.current_dir)
+            self._load_folder(self.current_dir)  # the scan itself runs on a worker thread
+        self.startup.mark("restore folder")
 
-        # Apply theme (default dark)
-        self.apply_theme(dark=True)
+        # Warm the run path so the first Run click doesn't pay for it.
+        from app.core import engine_client, mit_runner, queue_runner  # noqa: F401
+
+        self.startup.mark("import run modules")
+        if self.job_queue.pending():
+            self.log.append(f"Queue: {self.job_queue.pending()} job(s) waiting from last session.")
+        self.log.append(f"Startup: first paint after {self.startup.at['first paint'] * 1e3:.0f} ms")
+        for line in self.startup.lines():
+            self.log.append(line)
+        self.startup_finished.emit()
 
     # ---------- UI helpers ----------
     def _wrap_canvas(self, widget: QWidget, title: str) -> QWidget:
@@ -552,6 +783,15 @@ class MainWindow(QMainWindow):
     # ---------- persistence ----------
     def closeEvent(self, event) -> None:
         self._save_cfg()
+        if self.worker is not None:
+            self.worker.cancel.set()
+        if self.queue_runner is not None:
+            self.queue_runner.shutdown()  # running jobs go back to the queue
+        if self.worker is not None:
+            self.worker.wait()  # before the engines it may be using go away
+        self._shutdown_engines()
+        self._stop_scanner()
+        self.thumb_loader.shutdown()
         super().closeEvent(event)
 
     def _save_cfg(self) -> None:
@@ -563,9 +803,18 @@ class MainWindow(QMainWindow):
         self.cfg.engine.target_lang = self.target_lang.text().strip() or "ENG"
         self.cfg.engine.use_gpu = self.chk_gpu.isChecked()
         self.cfg.engine.verbose = self.chk_verbose.isChecked()
+        self.cfg.engine.persistent_engine = self.chk_persistent.isChecked()
+        self.cfg.engine.stage_cache = self.chk_stage_cache.isChecked()
+        self.cfg.engine.normalize_inputs = self.chk_normalize.isChecked()
+        self.cfg.engine.shards = self.shards.value()
+        self.cfg.engine.pin_shards = self.chk_pin.isChecked()
         self.cfg.engine.detector = self.detector.currentText()
         self.cfg.engine.ocr = self.ocr.currentText()
         self.cfg.engine.inpainter = self.inpainter.currentText()
+        self.cfg.package.enabled = self.chk_package.isChecked()
+        self.cfg.package.format = self.package_format.currentText()
+        self.cfg.package.quality = self.package_quality.value()
+        self.cfg.queue_concurrency = self.queue_panel.concurrency.value()
         self.cfg.last_open_dir = str(self.current_dir) if self.current_dir else ""
         self.cfg.output_root = str(self._output_root_abs())
         save_settings(self.cfg)
@@ -630,106 +879,271 @@ class MainWindow(QMainWindow):
             self._save_cfg()
 
     # ---------- folder + pages ----------
+    def _dialog_start(self) -> str:
+        if not self.current_dir:
+            return ""
+        return str(self.current_dir if self.current_dir.is_dir() else self.current_dir.parent)
+
     def open_folder(self) -> None:
-        start = str(self.current_dir) if self.current_dir else ""
-        folder = QFileDialog.getExistingDirectory(self, "Select manga folder", start)
+        folder = QFileDialog.getExistingDirectory(self, "Select manga folder", self._dialog_start())
         if not folder:
             return
         self._load_folder(Path(folder))
 
+    def open_archive(self) -> None:
+        # Read in place: pages are listed from the archive's directory and decoded on demand.
+        path, _ = QFileDialog.getOpenFileName(self, "Select chapter archive", self._dialog_start(),
+                                              "Comic archives (*.cbz *.zip)")
+        if not path:
+            return
+        self._load_folder(Path(path))
+
     def _load_folder(self, folder: Path) -> None:
+        """Reset the page list and stream the folder's (or archive's) pages in from a background scan."""
         self.current_dir = folder
-        self.pages = []
-        self.list_widget.clear()
-
-        files = sorted([p for p in folder.iterdir() if p.suffix.lower() in IMAGE_EXTS])
-        for p in files:
-            item = PageItem(p)
-            self.pages.append(item)
-            li = QListWidgetItem(p.name)
-            li.setData(Qt.UserRole, str(p))
-            self.list_widget.addItem(li)
+        self.current_page = None
+        close_archives()  # don't keep the previous chapter's CBZ open (and locked on Windows)
+        self.prefetcher.cancel()
+        self.image_cache.forget_signatures()
+        self.thumb_loader.cancel_pending()
+        self._stop_scanner()
+        self.page_model.reset(folder)
+        self.output_index.set_expected(())
+        self._update_progress_badge()
 
-        if self.pages:
-            self.list_widget.setCurrentRow(0)
+        self._scan_gen += 1
+        self.scanner = FolderScanner(folder, self._scan_gen, parent=self)
+        self.scanner.batch.connect(self._on_scan_batch)
+        self.scanner.done.connect(self._on_scan_done)
+        self.scanner.indexed.connect(self._on_scan_indexed)
+        self.scanner.finished.connect(self.scanner.deleteLater)
+        self.scanner.start()
+
+    def _stop_scanner(self) -> None:
+        if self.scanner is not None:
+            # Its remaining signals carry an old generation and are ignored.
+            self.scanner.requestInterruption()
+            self.scanner = None
+
+    def _on_scan_batch(self, gen: int, records) -> None:
+        if gen != self._scan_gen:
+            return
+        self.page_model.append(records)
+        if self.current_page is None and self.page_filter.rowCount():
+            self.list_view.setCurrentIndex(self.page_filter.index(0))
+        self._update_progress_badge()
 
+    def _on_scan_done(self, gen: int, error: str) -> None:
+        if gen != self._scan_gen:
+            return
+        self.scanner = None
+        if error:
+            self.log.append(f"Could not read folder: {error}")
+        self._watch_output_dir()
+        self._schedule_prefetch()
         self._update_progress_badge()
         self._save_cfg()
 
-    def _apply_search_filter(self, text: str) -> None:
-        query = (text or "").strip().lower()
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            item.setHidden(query not in item.text().lower())
+    def _on_scan_indexed(self, gen: int, index) -> None:
+        if gen == self._scan_gen:
+            self.page_filter.adopt_index(index)
+
+    def _apply_search_filter(self) -> None:
+        self._search_timer.stop()
+        self.page_filter.set_query(self.search.text())
+        # The filter resets the view; keep the page being previewed selected if it is still listed.
+        if self.current_page is not None:
+            row = self.page_model.row_of(self.current_page.path.name)
+            idx = self.page_filter.mapFromSource(self.page_model.index(row))
+            if idx.isValid():
+                self.list_view.setCurrentIndex(idx)
+                self.list_view.scrollTo(idx)
+
+    def _watch_output_dir(self) -> None:
+        """(Re)build the output-status index for the current folder and watch the output dir for changes."""
+        dirs = self.out_watcher.directories()
+        if dirs:
+            self.out_watcher.removePaths(dirs)
+        if not self.current_dir:
+            self.output_index = OutputIndex()
+            return
+        out_dir = self._output_root_abs() / source_name(self.current_dir)
+        names = self.page_model.table.names
+        self.output_index.reset(out_dir)
+        self.output_index.set_expected(names)
+        if out_dir.exists():
+            self.out_watcher.addPath(str(out_dir))
+        has = self.output_index.has
+        self.page_model.set_all_states(bytes(ST_DONE if has(n) else ST_NONE for n in names))
+
+    def _sync_output_index(self) -> None:
+        if self.output_index.folder is None:
+            return
+        added, removed = self.output_index.sync()
+        for name in added | removed:
+            self.image_cache.invalidate(self.output_index.folder / name)
+            self._set_item_state(name, ST_DONE if name in added else ST_NONE)
+        if self.current_page and self.current_page.path.name in (added | removed):
+            self._refresh_previews()
+        else:
+            self._update_progress_badge()
 
     def _update_progress_badge(self) -> None:
-        total = len(self.pages)
-        done = 0
-        if self.current_dir:
-            out_dir = self._output_root_abs() / self.current_dir.name
-            for p in self.pages:
-                if (out_dir / p.path.name).exists():
-                    done += 1
-        self.progress_badge.setText(f"{done}/{total}")
+        total = self.page_model.rowCount()
+        done = self.output_index.done
+        text = f"{done}/{total}"
+        if self.eta is not None:
+            ppm = self.eta.pages_per_minute()
+            text += f"  ·  ETA {format_duration(self.eta.eta_seconds())}"
+            if ppm:
+                text += f"  ·  {ppm:.1f} p/min"
+        self.progress_badge.setText(text)
 
     # ---------- preview ----------
-    def _on_select_page(self, current: QListWidgetItem, previous: QListWidgetItem) -> None:
-        if not current:
+    def _on_select_page(self, current: QModelIndex, previous: QModelIndex) -> None:
+        src = self.page_filter.mapToSource(current)
+        if not src.isValid():
             return
-        p = Path(current.data(Qt.UserRole))
-        self.current_page = PageItem(p)
+        path = self.page_model.path(src.row())
+        if self.current_page is not None and self.current_page.path == path:
+            return
+        self.current_page = PageItem(path)
         self._refresh_previews()
+        self._schedule_prefetch()
 
     def resizeEvent(self, event) -> None:
         super().resizeEvent(event)
         if self.current_page:
-            self._refresh_previews()
+            self.render_scheduler.request(interactive=True)
+
+    def _on_splitter_moved(self, _pos: int, _index: int) -> None:
+        if self.current_page:
+            self.render_scheduler.request(interactive=True)
 
     def _refresh_previews(self) -> None:
+        if not self.current_page:
+            return
+        self.render_scheduler.request()
+        self._update_progress_badge()
+
+    def _render_previews(self, smooth: bool = True) -> None:
+        # Called by the render scheduler, at most once per frame.
         if not self.current_page:
             return
         original = self.current_page.path
-        self._show_pixmap(self.original_label, original)
+        self._show_pixmap(self.original_label, original, smooth)
 
         out_img = self._translated_output_for(original)
-        if out_img and out_img.exists():
-            self._show_pixmap(self.output_label, out_img)
+        if out_img and self.output_index.has(original.name):
+            self._show_pixmap(self.output_label, out_img, smooth)
         else:
+            self.image_loader.cancel("output")
             self.output_label.setText("Not translated yet.")
             self.output_label.setPixmap(QPixmap())
 
-        self._update_progress_badge()
-
-    def _show_pixmap(self, target: QLabel, path: Path) -> None:
-        if not path.exists():
-            target.setText("(missing)")
-            target.setPixmap(QPixmap())
+    def _schedule_prefetch(self) -> None:
+        if not self.current_page:
+            return
+        index = self.page_model.row_of(self.current_page.path.name)
+        if index < 0:
             return
 
-        pm = QPixmap(str(path))
-        if pm.isNull():
-            target.setText("(failed to load image)")
+        def paths_for(row: int):
+            original = self.page_model.path(row)
+            return original, self._translated_output_for(original)
+
+        viewport = self._viewport_of(self.original_label) if self._fit_to_view else None
+        self.prefetcher.schedule(index, self.page_model.rowCount(), paths_for, viewport, self._zoom)
+
+    def _on_prefetched(self, key, bw: int, bh: int, img: QImage) -> None:
+        self.image_cache.put_scaled(key, QSize(bw, bh), True, QPixmap.fromImage(img))
+
+    # ---------- thumbnails ----------
+    def _set_thumbnail_view(self, on: bool) -> None:
+        lv = self.list_view
+        if on:
+            lv.setViewMode(QListView.IconMode)
+            lv.setMovement(QListView.Static)
+            lv.setResizeMode(QListView.Adjust)
+            lv.setIconSize(QSize(THUMB_MAX_PX * 3 // 4, THUMB_MAX_PX))
+            lv.setGridSize(QSize(THUMB_MAX_PX * 3 // 4 + 16, THUMB_MAX_PX + 36))
+            lv.setWordWrap(True)
+        else:
+            lv.setViewMode(QListView.ListMode)
+            lv.setIconSize(QSize(0, 0))
+            lv.setGridSize(QSize())
+        # Thumbnails are requested by the model as rows are painted.
+        self.page_model.set_show_thumbs(on)
+        self.cfg.thumbnail_view = on
+
+    def _on_rendered(self, smooth: bool, seconds: float) -> None:
+        self.render_stats.setText(self.render_scheduler.stats.summary())
+
+    def _viewport_of(self, target: QLabel) -> QSize:
+        scroll = target.parent()
+        while scroll is not None and not isinstance(scroll, QScrollArea):
+            scroll = scroll.parent()
+        return scroll.viewport().size() if isinstance(scroll, QScrollArea) else target.size()
+
+    def _show_pixmap(self, target: QLabel, path: Path, smooth: bool = True) -> None:
+        tag = "original" if target is self.original_label else "output"
+        gen = self.image_loader.next_generation(tag)  # anything still in flight for this pane is now stale
+
+        key = self.image_cache.key_for(path)
+        if key is None:
+            target.setText("(missing)")
             target.setPixmap(QPixmap())
             return
 
         if self._fit_to_view:
             target.setMinimumSize(0, 0)
             target.resize(0, 0)
-
-            scroll = target.parent()
-            while scroll is not None and not isinstance(scroll, QScrollArea):
-                scroll = scroll.parent()
-            viewport_size = scroll.viewport().size() if isinstance(scroll, QScrollArea) else target.size()
-
-            scaled = pm.scaled(viewport_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            target.setPixmap(scaled)
+            viewport: Optional[QSize] = self._viewport_of(target)
+            bound: Optional[QSize] = viewport
         else:
-            scaled = pm.scaled(pm.size() * self._zoom, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            target.setPixmap(scaled)
-
+            viewport = None
+            dims = self.image_cache.dims(key)
+            bound = bounding_size(dims, None, self._zoom) if dims is not None else None
+
+        if bound is not None:
+            pm = self.image_cache.cached_scaled(key, bound, smooth=True)
+            if pm is not None:
+                self._apply_pixmap(target, pm)
+                return
+            pm = self.image_cache.cached_scaled(key, bound, smooth=False)
+            if pm is None and not smooth:
+                # Mid-interaction: a nearest-neighbour scale of the decoded image is cheap enough inline.
+                full = self.image_cache.images.peek(key)
+                if full is not None:
+                    pm = QPixmap.fromImage(full.scaled(bound, Qt.KeepAspectRatio, Qt.FastTransformation))
+                    self.image_cache.put_scaled(key, bound, False, pm)
+            if pm is not None:
+                self._apply_pixmap(target, pm)
+                if not smooth:
+                    return  # the scheduler runs a smooth pass once interaction settles
+
+        self.image_loader.request(RenderRequest(tag, gen, key, viewport, self._zoom))
+
+    def _apply_pixmap(self, target: QLabel, pm: QPixmap) -> None:
+        target.setPixmap(pm)
+        if not self._fit_to_view:
             # IMPORTANT: make the label actually become bigger than the viewport
-            target.resize(scaled.size())
-            target.setMinimumSize(scaled.size())
+            target.resize(pm.size())
+            target.setMinimumSize(pm.size())
+
+    def _on_image_ready(self, tag: str, gen: int, key, bw: int, bh: int, img: QImage, smooth: bool) -> None:
+        if not self.image_loader.is_current(tag, gen):
+            return  # user moved on to another page / zoom level
+        pm = QPixmap.fromImage(img)
+        self.image_cache.put_scaled(key, QSize(bw, bh), smooth, pm)
+        self._apply_pixmap(self.original_label if tag == "original" else self.output_label, pm)
+
+    def _on_image_failed(self, tag: str, gen: int, key) -> None:
+        if not self.image_loader.is_current(tag, gen):
+            return
+        target = self.original_label if tag == "original" else self.output_label
+        target.setText("(failed to load image)")
+        target.setPixmap(QPixmap())
 
 
     # ---------- zoom controls ----------
@@ -737,32 +1151,32 @@ class MainWindow(QMainWindow):
         self._fit_to_view = True
         self._zoom = 1.0
         self._apply_scroll_mode()
-        self._refresh_previews()
+        self.render_scheduler.request()
 
     def zoom_100(self) -> None:
         self._fit_to_view = False
         self._zoom = 1.0
         self._apply_scroll_mode()
-        self._refresh_previews()
+        self.render_scheduler.request()
 
     def zoom_in(self) -> None:
         self._fit_to_view = False
         self._zoom = min(5.0, self._zoom * 1.2)
         self._apply_scroll_mode()
-        self._refresh_previews()
+        self.render_scheduler.request(interactive=True)
 
     def zoom_out(self) -> None:
         self._fit_to_view = False
         self._zoom = max(0.2, self._zoom / 1.2)
         self._apply_scroll_mode()
-        self._refresh_previews()
+        self.render_scheduler.request(interactive=True)
 
     # ---------- actions ----------
     def open_output_folder(self) -> None:
         if not self.current_dir:
             QMessageBox.information(self, "No folder", "Open a manga folder first.")
             return
-        out_dir = (self._output_root_abs() / self.current_dir.name).resolve()
+        out_dir = (self._output_root_abs() / source_name(self.current_dir)).resolve()
         out_dir.mkdir(parents=True, exist_ok=True)
 
         try:
@@ -771,16 +1185,19 @@ class MainWindow(QMainWindow):
             QMessageBox.information(self, "Output", f"Output folder:\n{out_dir}")
 
     def translate_folder(self) -> None:
-        # 1) Prevent double-run
-        if self.worker and self.worker.isRunning():
-            QMessageBox.information(self, "Busy", "Translation is already running.")
-            return
-
-        # 2) Need an input folder
+        # 1) Need an input folder
         if not self.current_dir:
             QMessageBox.warning(self, "No folder", "Open a manga folder first.")
             return
 
+        # 2) Busy: queue the folder to run after the current work instead of refusing
+        if (self.worker and self.worker.isRunning()) or self.queue_runner is not None:
+            self._enqueue_current()
+            self.job_queue.set_paused(False)
+            if self.queue_runner is None:
+                self._queue_after_run = True
+            return
+
         # 3) Ask for key only if OpenAI is used
         api_key = ""
         if getattr(self.cfg.engine, "translator", "") == "openai":
@@ -802,37 +1219,88 @@ class MainWindow(QMainWindow):
             return
 
         # 5) Output folder
-        out_dir = (self._output_root_abs() / self.current_dir.name).resolve()
+        out_dir = (self._output_root_abs() / source_name(self.current_dir)).resolve()
         out_dir.mkdir(parents=True, exist_ok=True)
 
         self.cfg.output_root = str(self._output_root_abs())
         save_settings(self.cfg)
 
-        # 6) Build command
-        cmd = build_mit_command(self.cfg.engine, self.current_dir, out_dir)
-
-        self.log.append("Running:\n" + " ".join(cmd) + "\n")
-
         self.act_open.setEnabled(False)
+        self.act_open_archive.setEnabled(False)
         self.act_out.setEnabled(False)
         self.act_run.setEnabled(False)
 
-        # 7) Start worker (PASS KEY HERE)
+        # 6) Start worker (PASS KEY HERE). It works out which pages actually need the engine
+        # first, off the GUI thread, and reports the plan back through `planned`.
         try:
-            self.worker = MitWorker(cmd, workdir=engine_dir, api_key=api_key)
-            self.worker.log_line.connect(self.log.append)
+            clients = self._engine_clients_for(api_key or "")
+            self.log.start_file(out_dir / ".logs" / "run.log")
+            self.worker = MitWorker(
+                self.cfg.engine.model_copy(deep=True), self.current_dir, out_dir, api_key=api_key or "",
+                clients=clients, sink=self.log_sink, package=self.cfg.package.model_copy(),
+            )
+            self.worker.planned.connect(self._on_worker_planned)
+            self.worker.progress.connect(self._on_page_progress)
             self.worker.finished_code.connect(self._on_worker_done)
             self.worker.start()
         except Exception as e:
             self.log.append(f"Failed to start worker: {e}")
+            self.log.stop_file()
             self.act_open.setEnabled(True)
+            self.act_open_archive.setEnabled(True)
             self.act_out.setEnabled(True)
             self.act_run.setEnabled(True)
 
 
+    def _on_worker_planned(self, plan: RunPlan) -> None:
+        if plan.removed:
+            self.image_cache.invalidate_dir(plan.output_folder)
+        if plan.pages:
+            self.run_plan = plan
+            self.eta = EtaEstimator(len(plan.pages))
+        self._watch_output_dir()  # stale outputs may have been removed
+
+    def _set_item_state(self, name: str, code: int, tooltip: str = "") -> None:
+        self.page_model.set_state(name, code, tooltip)
+
+    def _on_page_progress(self, ev) -> None:
+        if isinstance(ev, PageStarted):
+            self._set_item_state(ev.name, ST_RUNNING, "Processing…")
+        elif isinstance(ev, StageChanged):
+            self._set_item_state(ev.name, ST_RUNNING, f"Stage: {ev.stage}")
+        elif isinstance(ev, PageFinished):
+            out_img = self._translated_output_for(Path(ev.name))
+            if out_img is not None:
+                self.image_cache.invalidate(out_img)
+            self.output_index.add(ev.name)
+            self._set_item_state(ev.name, ST_DONE, f"Done in {ev.seconds:.1f}s" + (" (skipped)" if ev.skipped else ""))
+            if self.eta is not None:
+                self.eta.page_done()
+            if self.current_page and self.current_page.path.name == ev.name:
+                self._refresh_previews()
+            else:
+                self._update_progress_badge()
+        elif isinstance(ev, PageFailed):
+            self._set_item_state(ev.name, ST_FAILED, ev.error)
+            self.log.append(f"Page failed: {ev.name}: {ev.error}")
+            if self.eta is not None:
+                self.eta.page_done(failed=True)
+            self._update_progress_badge()
+
     def _on_worker_done(self, code: int) -> None:
         self.log.append(f"\nDone. Exit code: {code}")
+        if self.eta is not None:
+            self.log.append(
+                f"Processed {self.eta.done}/{self.eta.total} pages "
+                f"({self.eta.failed} failed) in {format_duration(time.monotonic() - self.eta.started)}."
+            )
+            self.eta = None
+        self.run_plan = None
+        self.log.stop_file()
+        if self.current_dir:
+            self.image_cache.invalidate_dir(self._output_root_abs() / source_name(self.current_dir))
         self.act_open.setEnabled(True)
+        self.act_open_archive.setEnabled(True)
         self.act_out.setEnabled(True)
         self.act_run.setEnabled(True)
 
@@ -843,11 +1311,126 @@ class MainWindow(QMainWindow):
 
         self.worker.deleteLater()
         self.worker = None
+        if self._queue_after_run:
+            self._queue_after_run = False
+            self._start_queue()
+
+    # ---------- job queue ----------
+    def _output_dir_for(self, folder: Path) -> Path:
+        return (self._output_root_abs() / source_name(folder)).resolve()
+
+    def _enqueue_current(self) -> None:
+        if not self.current_dir:
+            QMessageBox.warning(self, "No folder", "Open a manga folder first.")
+            return
+        job = self.queue_panel.enqueue([self.current_dir])[0]
+        self.log.append(f"Queued {job.name} ({self.job_queue.pending()} waiting).")
+
+    def _on_queue_toggled(self, on: bool) -> None:
+        self.job_queue.set_paused(not on)
+        if on:
+            self._start_queue()
+        else:
+            # Running jobs finish; the runner stops once they have.
+            self._queue_after_run = False
+            if self.queue_runner is not None:
+                self.log.append("Queue paused: no new jobs will start.")
+
+    def _start_queue(self) -> None:
+        if self.queue_runner is not None:
+            return
+        if self.worker and self.worker.isRunning():
+            self._queue_after_run = True
+            self.log.append("The queue starts when the current run finishes.")
+            return
+
+        api_key = ""
+        if getattr(self.cfg.engine, "translator", "") == "openai":
+            api_key = self._ensure_openai_key()
+            if api_key is None:
+                self.queue_panel.set_running(False)
+                return
+        self._save_cfg()
+
+        from app.core.queue_runner import QueueRunner
+
+        self.queue_runner = QueueRunner(
+            self.job_queue,
+            self.cfg.engine,
+            concurrency=self.cfg.queue_concurrency,
+            api_key=api_key or "",
+            # Several slots each start workers sized for their share of the machine.
+            clients=self._engine_clients_for(api_key or "") if self.cfg.queue_concurrency <= 1 else None,
+            on_log=lambda job, line: self.log_sink.append(f"[{job.name}] {line}"),
+            on_event=lambda job, ev: self.job_progress.emit(job.id, ev),
+            on_finished=lambda job: self.job_finished.emit(job.id),
+            on_idle=self.queue_idle.emit,
+            package=self.cfg.package,
+        )
+        self.queue_runner.start()
+        self.queue_panel.set_running(True)
+        self.log.append(f"Queue started: {self.job_queue.pending()} job(s), {self.cfg.queue_concurrency} at a time.")
+
+    def _cancel_job(self, job_id: str) -> None:
+        if self.queue_runner is not None:
+            self.queue_runner.cancel(job_id)
+        else:
+            self.job_queue.cancel(job_id)
+
+    def _is_current_job(self, job_id: str) -> Optional[Job]:
+        job = self.job_queue.get(job_id)
+        if job is None or not self.current_dir or Path(job.folder) != self.current_dir.resolve():
+            return None
+        return job
+
+    def _on_job_progress(self, job_id: str, ev) -> None:
+        # Page states in the list follow queue jobs for the folder on screen.
+        if self._is_current_job(job_id) is not None:
+            self._on_page_progress(ev)
+
+    def _on_job_finished(self, job_id: str) -> None:
+        job = self.job_queue.get(job_id)
+        if job is None:
+            return
+        self.log.append(f"Queue: {job.name} {job.state} ({job.message}).")
+        if self._is_current_job(job_id) is not None:
+            self.image_cache.invalidate_dir(Path(job.output_dir))
+            if self.current_page:
+                self._refresh_previews()
+            else:
+                self._update_progress_badge()
+
+    def _on_queue_idle(self) -> None:
+        self.queue_runner = None
+        self.queue_panel.set_running(False)
+        self.log.append("Queue stopped.")
+
+    def _engine_clients_for(self, api_key: str) -> Optional[List[EngineClient]]:
+        """Reuse the warm engine workers unless the engine settings they were started with changed."""
+        from app.core.engine_client import EngineClient
+        from app.core.mit_runner import make_engine_clients
+
+        if not self.cfg.engine.persistent_engine or not EngineClient.available():
+            self._shutdown_engines()
+            return None
+
+        fresh = make_engine_clients(self.cfg.engine, api_key)
+        cur = self.engine_clients
+        if len(cur) == len(fresh) and all(a.same_setup(b) for a, b in zip(cur, fresh)):
+            return cur
+        self._shutdown_engines()
+        self.engine_clients = fresh
+        return fresh
+
+    def _shutdown_engines(self) -> None:
+        for c in self.engine_clients:
+            c.shutdown()
+        self.engine_clients = []
 
     def _translated_output_for(self, original: Path) -> Optional[Path]:
         if not self.current_dir:
             return None
-        return (self._output_root_abs() / self.current_dir.name / original.name)
+        return (self._output_root_abs() / source_name(self.current_dir) / original.name)
 
     def _apply_scroll_mode(self) -> None:
         # Fit mode => scroll area resizes label to viewport (no scrollbars needed)
@@ -0,0 +1,276 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from PySide6.QtCore import QAbstractListModel, QAbstractProxyModel, QModelIndex, QThread, QTimer, Qt, Signal
+from PySide6.QtGui import QIcon
+
+from app.core.page_search import SearchIndex
+from app.core.page_table import STATUS_MARKS, PageRecord, PageTable, iter_page_batches
+
+
+class FolderScanner(QThread):
+    """
+    Enumerates a folder off the UI thread, handing rows over in batches, then
+    builds the folder's SearchIndex so the first search does not have to.
+    """
+
+    batch = Signal(int, object)    # generation, List[PageRecord]
+    done = Signal(int, str)        # generation, error ("" on success)
+    indexed = Signal(int, object)  # generation, SearchIndex
+
+    def __init__(self, folder: Path, generation: int, batch_size: int = 1000, parent=None):
+        super().__init__(parent)
+        self.folder = Path(folder)
+        self.generation = generation
+        self.batch_size = batch_size
+
+    def run(self) -> None:
+        names: List[str] = []
+        try:
+            for records in iter_page_batches(self.folder, self.batch_size):
+                if self.isInterruptionRequested():
+                    return
+                self.batch.emit(self.generation, records)
+                names.extend(r[0] for r in records)
+        except OSError as e:
+            self.done.emit(self.generation, str(e))
+            return
+        self.done.emit(self.generation, "")
+        if not self.isInterruptionRequested():
+            self.indexed.emit(self.generation, SearchIndex(names))
+
+
+class PageListModel(QAbstractListModel):
+    """
+    List model over a PageTable. Nothing is created per row up front: the view
+    asks for the visible rows only, and thumbnails are requested from
+    `data(DecorationRole)` so only rows that actually get painted load one.
+    """
+
+    def __init__(self, thumb_loader=None, parent=None):
+        super().__init__(parent)
+        self.table = PageTable()
+        self.thumb_loader = thumb_loader
+        self.show_thumbs = False
+        self._icons: Dict[int, QIcon] = {}
+        self._requested: Set[int] = set()  # rows asked for (until the next reset)
+        self._queue: List[int] = []
+        # Thumbnail requests are batched out of data(): a cache hit answers
+        # synchronously, and dataChanged must not fire from inside a paint.
+        self._thumb_timer = QTimer(self)
+        self._thumb_timer.setSingleShot(True)
+        self._thumb_timer.setInterval(0)
+        self._thumb_timer.timeout.connect(self._request_thumbs)
+
+    # ---- Qt model API ----
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.table)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        t = self.table
+        if role == Qt.DisplayRole:
+            mark = STATUS_MARKS[t.status[row]]
+            return f"{mark} {t.names[row]}" if mark else t.names[row]
+        if role == Qt.UserRole:
+            return str(t.path(row))
+        if role == Qt.ToolTipRole:
+            return t.notes.get(row) or None
+        if role == Qt.DecorationRole and self.show_thumbs:
+            icon = self._icons.get(row)
+            if icon is None and self.thumb_loader is not None and row not in self._requested:
+                self._requested.add(row)
+                self._queue.append(row)
+                self._thumb_timer.start()
+            return icon
+        return None
+
+    # ---- table management ----
+    def reset(self, folder: Optional[Path]) -> None:
+        self.beginResetModel()
+        self.table = PageTable(folder)
+        self._icons = {}
+        self._requested = set()
+        self._queue = []
+        self.endResetModel()
+
+    def append(self, records: List[PageRecord]) -> None:
+        if not records:
+            return
+        first = len(self.table)
+        self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+        self.table.extend(records)
+        self.endInsertRows()
+
+    def row_of(self, name: str) -> int:
+        return self.table.row_of(name)
+
+    def path(self, row: int) -> Path:
+        return self.table.path(row)
+
+    def set_state(self, name: str, code: int, note: str = "") -> None:
+        row = self.table.row_of(name)
+        if row < 0:
+            return
+        self.table.set_status(row, code, note)
+        idx = self.index(row)
+        self.dataChanged.emit(idx, idx, [Qt.DisplayRole, Qt.ToolTipRole])
+
+    def set_all_states(self, codes: bytes) -> None:
+        """Replace every row's status at once (one dataChanged for the whole list)."""
+        t = self.table
+        t.status[:] = codes
+        t.notes.clear()
+        if len(t):
+            self.dataChanged.emit(self.index(0), self.index(len(t) - 1), [Qt.DisplayRole, Qt.ToolTipRole])
+
+    # ---- thumbnails ----
+    def set_show_thumbs(self, on: bool) -> None:
+        self.show_thumbs = on
+        self._requested = set()
+        self._queue = []
+        if len(self.table):
+            self.dataChanged.emit(self.index(0), self.index(len(self.table) - 1), [Qt.DecorationRole])
+
+    def set_icon(self, src: str, thumb: str) -> None:
+        p = Path(src)
+        if self.table.folder is None or p.parent != self.table.folder:
+            return  # a late result for a folder that is no longer shown
+        row = self.table.row_of(p.name)
+        if row < 0:
+            return
+        self._icons[row] = QIcon(thumb)
+        idx = self.index(row)
+        self.dataChanged.emit(idx, idx, [Qt.DecorationRole])
+
+    def _request_thumbs(self) -> None:
+        rows, self._queue = self._queue, []
+        n = len(self.table)
+        for row in rows:
+            if row < n and row not in self._icons:
+                self.thumb_loader.request(self.table.path(row))
+
+
+class PageFilterModel(QAbstractProxyModel):
+    """
+    Filtering proxy over PageListModel driven by a SearchIndex. The matching
+    rows come back from the index as one list, so applying a filter is a
+    single model reset instead of a per-row filterAcceptsRow callback; source
+    order (reading order) is kept. The index is built lazily, on the first
+    search, so opening a folder does not pay for it.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.search_index = SearchIndex()
+        self.query = ""
+        self._rows: List[int] = []            # proxy row -> source row
+        self._proxy_of: Dict[int, int] = {}   # source row -> proxy row (only while filtering)
+
+    # ---- wiring ----
+    def setSourceModel(self, source: PageListModel) -> None:
+        self.beginResetModel()
+        old = self.sourceModel()
+        if old is not None:
+            old.modelReset.disconnect(self._on_source_reset)
+            old.rowsInserted.disconnect(self._on_rows_inserted)
+            old.dataChanged.disconnect(self._on_data_changed)
+        super().setSourceModel(source)
+        source.modelReset.connect(self._on_source_reset)
+        source.rowsInserted.connect(self._on_rows_inserted)
+        source.dataChanged.connect(self._on_data_changed)
+        self.search_index = SearchIndex()
+        self._refilter()
+        self.endResetModel()
+
+    def _filtering(self) -> bool:
+        return bool(self.query)
+
+    def adopt_index(self, index: SearchIndex) -> None:
+        """Take over an index built off-thread, if it covers the current rows."""
+        if len(index) >= len(self.search_index) and len(index) == self.sourceModel().rowCount():
+            self.search_index = index
+
+    def _ensure_index(self) -> None:
+        names = self.sourceModel().table.names
+        if len(self.search_index) < len(names):
+            self.search_index.extend(names[len(self.search_index):])
+
+    def _refilter(self) -> None:
+        n = self.sourceModel().rowCount() if self.sourceModel() is not None else 0
+        if not self._filtering():
+            self._rows = list(range(n))
+            self._proxy_of = {}
+            return
+        self._ensure_index()
+        self._rows = self.search_index.search(self.query)
+        self._proxy_of = {src: i for i, src in enumerate(self._rows)}
+
+    def set_query(self, text: str) -> None:
+        text = (text or "").strip()
+        if text == self.query:
+            return
+        self.beginResetModel()
+        self.query = text
+        self._refilter()
+        self.endResetModel()
+
+    # ---- source signals ----
+    def _on_source_reset(self) -> None:
+        self.beginResetModel()
+        self.search_index = SearchIndex()
+        self._refilter()
+        self.endResetModel()
+
+    def _on_rows_inserted(self, _parent: QModelIndex, first: int, last: int) -> None:
+        # The source only ever appends (scanner batches arrive in reading order).
+        if self._filtering():
+            self._ensure_index()
+            new = [r for r in self.search_index.search(self.query) if r >= first]
+        else:
+            new = list(range(first, last + 1))
+        if not new:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(new) - 1)
+        self._rows.extend(new)
+        if self._filtering():
+            self._proxy_of.update((src, start + i) for i, src in enumerate(new))
+        self.endInsertRows()
+
+    def _on_data_changed(self, top: QModelIndex, bottom: QModelIndex, roles=()) -> None:
+        if top.row() == bottom.row():
+            idx = self.mapFromSource(top)
+            if idx.isValid():
+                self.dataChanged.emit(idx, idx, roles)
+        elif self._rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._rows) - 1, 0), roles)
+
+    # ---- proxy API ----
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else 1
+
+    def index(self, row: int, column: int = 0, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if parent.isValid() or column != 0 or not 0 <= row < len(self._rows):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, _index: QModelIndex = QModelIndex()) -> QModelIndex:
+        return QModelIndex()
+
+    def mapToSource(self, proxy: QModelIndex) -> QModelIndex:
+        if not proxy.isValid() or proxy.row() >= len(self._rows):
+            return QModelIndex()
+        return self.sourceModel().index(self._rows[proxy.row()])
+
+    def mapFromSource(self, source: QModelIndex) -> QModelIndex:
+        if not source.isValid():
+            return QModelIndex()
+        row = self._proxy_of.get(source.row(), -1) if self._filtering() else source.row()
+        return self.index(row) if 0 <= row < len(self._rows) else QModelIndex()
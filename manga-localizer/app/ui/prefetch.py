@@ -0,0 +1,128 @@
+from __future__ import annotations
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional, Set, Tuple
+
+from PySide6.QtCore import QObject, QRunnable, QSize, Qt, QThreadPool, Signal
+from PySide6.QtGui import QImage
+
+from app.ui.image_cache import ImageCache, decode_image
+from app.ui.image_loader import bounding_size
+
+
+class Prefetcher(QObject):
+    """
+    Warms neighbouring pages into the preview cache in the background: the
+    decoded image (while the cache stays under `max_bytes`) and a smooth render
+    at the current viewport size, so turning the page is a cache hit.
+    Work for pages that have left the window is skipped; jumping further than
+    `radius` pages also drops everything still queued.
+    """
+
+    # key, bounding w, bounding h, smooth render
+    prefetched = Signal(object, int, int, QImage)
+
+    def __init__(self, cache: ImageCache, radius: int = 2, max_bytes: int = 256 * 1024 * 1024, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.radius = radius
+        self.max_bytes = max_bytes
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)  # stay out of the way of the visible page's loader
+        self._lock = threading.Lock()
+        self._wanted: Set[str] = set()
+        self._in_flight: Set[str] = set()
+        self._last_index: Optional[int] = None
+
+    def schedule(
+        self,
+        index: int,
+        count: int,
+        paths_for: Callable[[int], Tuple[Path, Optional[Path]]],
+        viewport: Optional[QSize],
+        zoom: float,
+    ) -> None:
+        """`paths_for(i)` gives (original, output) for page i; only the window around `index` is asked for."""
+        if self._last_index is not None and abs(index - self._last_index) > self.radius:
+            self._drop_queued()  # far jump: nothing queued is useful any more
+        self._last_index = index
+
+        order: List[Path] = []
+        for d in range(1, self.radius + 1):
+            for i in (index + d, index - d):  # forward first: reading direction
+                if 0 <= i < count:
+                    original, output = paths_for(i)
+                    order.append(original)
+                    if output is not None:
+                        order.append(output)
+
+        with self._lock:
+            self._wanted = {str(p) for p in order}
+            todo = [p for p in order if str(p) not in self._in_flight]
+            self._in_flight.update(str(p) for p in todo)
+
+        for p in todo:
+            self.pool.start(_PrefetchTask(self, p, QSize(viewport) if viewport else None, zoom))
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._wanted = set()
+        self._drop_queued()
+
+    def _drop_queued(self) -> None:
+        self.pool.clear()
+        with self._lock:
+            # Cleared tasks never report back; a still-running one discarding later is harmless.
+            self._in_flight = set()
+
+    def _is_wanted(self, path: str) -> bool:
+        with self._lock:
+            return path in self._wanted
+
+    def _done(self, path: str) -> None:
+        with self._lock:
+            self._in_flight.discard(path)
+
+
+class _PrefetchTask(QRunnable):
+    def __init__(self, owner: Prefetcher, path: Path, viewport: Optional[QSize], zoom: float):
+        super().__init__()
+        self.owner = owner
+        self.path = str(path)
+        self.viewport = viewport
+        self.zoom = zoom
+
+    def run(self) -> None:
+        try:
+            self._run()
+        finally:
+            self.owner._done(self.path)
+
+    def _run(self) -> None:
+        owner = self.owner
+        cache = owner.cache
+        if not owner._is_wanted(self.path):
+            return
+        key = cache.key_for(Path(self.path))
+        if key is None:
+            return
+
+        full = cache.images.peek(key)
+        if full is None:
+            dims = cache.dims(key)
+            if dims is not None and cache.has_scaled(key, bounding_size(dims, self.viewport, self.zoom)):
+                return  # already warm
+            if not owner._is_wanted(self.path):
+                return
+            full = decode_image(self.path)
+            if full.isNull():
+                return
+            cache.set_dims(key, full.size())
+            if cache.images.used + full.sizeInBytes() <= owner.max_bytes:
+                cache.put_image(key, full)
+
+        bound = bounding_size(full.size(), self.viewport, self.zoom)
+        if cache.has_scaled(key, bound) or not owner._is_wanted(self.path):
+            return
+        smooth = full if bound == full.size() else full.scaled(bound, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        owner.prefetched.emit(key, bound.width(), bound.height(), smooth)
@@ -0,0 +1,236 @@
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, Signal
+from PySide6.QtWidgets import (
+    QAbstractItemView, QFileDialog, QHBoxLayout, QHeaderView, QLabel, QPushButton, QSpinBox, QTableView,
+    QVBoxLayout, QWidget,
+)
+
+from app.core.archive import ARCHIVE_EXTS, is_archive
+from app.core.job_queue import JOB_PAUSED, JOB_QUEUED, JOB_RUNNING, FINAL_STATES, Job, JobQueue
+from app.core.pages import IMAGE_EXTS, natural_key
+
+
+def _has_pages(folder: Path) -> bool:
+    try:
+        with os.scandir(folder) as it:
+            return any(e.is_file() and os.path.splitext(e.name)[1].lower() in IMAGE_EXTS for e in it)
+    except OSError:
+        return False
+
+
+def chapter_folders(folder: Path) -> List[Path]:
+    """
+    `folder` itself if it holds pages (or is an archive), otherwise its
+    subfolders that do and the CBZ / ZIP archives in it (a series folder).
+    """
+    if is_archive(folder) or _has_pages(folder):
+        return [folder]
+    try:
+        subs = [Path(e.path) for e in os.scandir(folder)
+                if e.is_dir() or (e.is_file() and os.path.splitext(e.name)[1].lower() in ARCHIVE_EXTS)]
+    except OSError:
+        return []
+    return sorted((p for p in subs if p.suffix.lower() in ARCHIVE_EXTS or _has_pages(p)),
+                  key=lambda p: natural_key(p.name))
+
+
+class JobTableModel(QAbstractTableModel):
+    COLUMNS = ("Folder", "Priority", "State", "Pages")
+
+    def __init__(self, queue: JobQueue, parent=None):
+        super().__init__(parent)
+        self.queue = queue
+        self._jobs: List[Job] = queue.jobs()
+
+    def refresh(self) -> None:
+        jobs = self.queue.jobs()
+        if [j.id for j in jobs] == [j.id for j in self._jobs]:
+            # Same rows: repaint in place so the selection and scroll position stay put.
+            self._jobs = jobs
+            if jobs:
+                self.dataChanged.emit(self.index(0, 0), self.index(len(jobs) - 1, len(self.COLUMNS) - 1))
+            return
+        self.beginResetModel()
+        self._jobs = jobs
+        self.endResetModel()
+
+    def job(self, row: int) -> Optional[Job]:
+        return self._jobs[row] if 0 <= row < len(self._jobs) else None
+
+    def row_of(self, job_id: str) -> int:
+        return next((i for i, j in enumerate(self._jobs) if j.id == job_id), -1)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._jobs)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        job = self.job(index.row())
+        if job is None:
+            return None
+        col = index.column()
+        if role == Qt.DisplayRole:
+            if col == 0:
+                return job.name
+            if col == 1:
+                return job.priority
+            if col == 2:
+                return job.state + (f" ({job.message})" if job.message else "")
+            if col == 3:
+                if not job.total:
+                    return ""
+                return f"{job.done}/{job.total}" + (f" ({job.failed} failed)" if job.failed else "")
+        elif role == Qt.ToolTipRole:
+            return f"{job.folder}\n→ {job.output_dir}"
+        return None
+
+
+class QueuePanel(QWidget):
+    """
+    Queue dock contents: the job list plus add / reorder / pause / cancel
+    controls. Running the queue is up to the owner (`run_toggled`); job
+    changes from runner threads arrive through `queue_changed`.
+    """
+
+    run_toggled = Signal(bool)
+    cancel_requested = Signal(str)   # job id
+    queue_changed = Signal()         # emitted from any thread, handled on the GUI thread
+
+    def __init__(self, queue: JobQueue, output_for: Callable[[Path], Path], concurrency: int = 1, parent=None):
+        super().__init__(parent)
+        self.queue = queue
+        self.output_for = output_for
+        self.model = JobTableModel(queue, self)
+        self.queue_changed.connect(self.refresh)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
+        self.table.selectionModel().selectionChanged.connect(lambda *_a: self._update_buttons())
+
+        def button(text: str, slot, tip: str = "") -> QPushButton:
+            b = QPushButton(text)
+            b.setToolTip(tip)
+            b.clicked.connect(slot)
+            return b
+
+        self.btn_run = QPushButton("Start queue")
+        self.btn_run.setCheckable(True)
+        self.btn_run.toggled.connect(self._on_run_toggled)
+        self.btn_add = button("Add…", self.add_folders, "Add a chapter folder, or every chapter in a series folder")
+        self.btn_up = button("▲", lambda: self._move(-1), "Run earlier")
+        self.btn_down = button("▼", lambda: self._move(1), "Run later")
+        self.btn_hold = button("Pause job", self._toggle_hold, "Skip this job until resumed")
+        self.btn_cancel = button("Cancel", self._cancel, "Cancel (stops a running job)")
+        self.btn_remove = button("Remove", self._remove)
+        self.btn_clear = button("Clear finished", self.queue.clear_finished)
+
+        self.concurrency = QSpinBox()
+        self.concurrency.setRange(1, 8)
+        self.concurrency.setValue(max(1, concurrency))
+        self.concurrency.setToolTip("Jobs run at the same time (each keeps its own engine workers)")
+
+        self.status = QLabel("")
+        self.status.setObjectName("CanvasTitle")
+
+        top = QHBoxLayout()
+        top.setContentsMargins(0, 0, 0, 0)
+        for w in (self.btn_run, self.btn_add, self.btn_up, self.btn_down, self.btn_hold, self.btn_cancel,
+                  self.btn_remove, self.btn_clear):
+            top.addWidget(w)
+        top.addStretch(1)
+        top.addWidget(QLabel("At a time:"))
+        top.addWidget(self.concurrency)
+        top.addWidget(self.status)
+
+        lay = QVBoxLayout(self)
+        lay.setContentsMargins(6, 6, 6, 6)
+        lay.setSpacing(6)
+        lay.addLayout(top)
+        lay.addWidget(self.table, 1)
+
+        self.refresh()
+
+    # ---------- state ----------
+    def refresh(self) -> None:
+        self.model.refresh()
+        jobs = self.queue.jobs()
+        running = sum(1 for j in jobs if j.state == JOB_RUNNING)
+        waiting = sum(1 for j in jobs if j.state == JOB_QUEUED)
+        self.status.setText(f"{running} running · {waiting} waiting" + (" · paused" if self.queue.paused else ""))
+        self._update_buttons()
+
+    def set_running(self, on: bool) -> None:
+        """Reflect the runner state without re-emitting `run_toggled`."""
+        self.btn_run.blockSignals(True)
+        self.btn_run.setChecked(on)
+        self.btn_run.blockSignals(False)
+        self.btn_run.setText("Pause queue" if on else "Start queue")
+
+    def _on_run_toggled(self, on: bool) -> None:
+        self.btn_run.setText("Pause queue" if on else "Start queue")
+        self.run_toggled.emit(on)
+
+    def _selected(self) -> List[Job]:
+        rows = sorted({i.row() for i in self.table.selectionModel().selectedRows()})
+        return [j for j in (self.model.job(r) for r in rows) if j is not None]
+
+    def _update_buttons(self) -> None:
+        sel = self._selected()
+        self.btn_up.setEnabled(len(sel) == 1)
+        self.btn_down.setEnabled(len(sel) == 1)
+        self.btn_hold.setEnabled(bool(sel) and all(j.state != JOB_RUNNING for j in sel))
+        self.btn_hold.setText("Resume job" if sel and all(j.state in (JOB_PAUSED,) + FINAL_STATES for j in sel)
+                              else "Pause job")
+        self.btn_cancel.setEnabled(any(j.active for j in sel))
+        self.btn_remove.setEnabled(bool(sel) and all(j.state != JOB_RUNNING for j in sel))
+
+    # ---------- actions ----------
+    def add_folders(self) -> None:
+        folder = QFileDialog.getExistingDirectory(self, "Add chapter or series folder")
+        if folder:
+            self.enqueue(chapter_folders(Path(folder)))
+
+    def enqueue(self, folders: List[Path], priority: int = 0) -> List[Job]:
+        return [self.queue.add(f, self.output_for(f), priority) for f in folders]
+
+    def _move(self, offset: int) -> None:
+        sel = self._selected()
+        if len(sel) != 1:
+            return
+        self.queue.move(sel[0].id, offset)
+        row = self.model.row_of(sel[0].id)
+        if row >= 0:
+            self.table.selectRow(row)
+
+    def _toggle_hold(self) -> None:
+        sel = self._selected()
+        resume = all(j.state in (JOB_PAUSED,) + FINAL_STATES for j in sel)
+        for job in sel:
+            if resume:
+                self.queue.resume(job.id)
+            else:
+                self.queue.pause(job.id)
+
+    def _cancel(self) -> None:
+        for job in self._selected():
+            self.cancel_requested.emit(job.id)
+
+    def _remove(self) -> None:
+        for job in self._selected():
+            self.queue.remove(job.id)
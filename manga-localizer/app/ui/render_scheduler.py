@@ -0,0 +1,84 @@
+from __future__ import annotations
+import time
+from collections import deque
+from typing import Callable, Deque
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+
+class RenderStats:
+    """Renders per second (over a sliding window) and time per render."""
+
+    def __init__(self, window_s: float = 1.0, samples: int = 120):
+        self.window_s = window_s
+        self.total = 0
+        self._stamps: Deque[float] = deque(maxlen=samples)
+        self._durations: Deque[float] = deque(maxlen=samples)
+
+    def record(self, seconds: float, now: float = None) -> None:
+        now = time.perf_counter() if now is None else now
+        self.total += 1
+        self._stamps.append(now)
+        self._durations.append(seconds)
+
+    def per_second(self, now: float = None) -> float:
+        now = time.perf_counter() if now is None else now
+        return float(sum(1 for t in self._stamps if now - t <= self.window_s)) / self.window_s
+
+    def avg_ms(self) -> float:
+        return 1000.0 * sum(self._durations) / len(self._durations) if self._durations else 0.0
+
+    def max_ms(self) -> float:
+        return 1000.0 * max(self._durations) if self._durations else 0.0
+
+    def summary(self) -> str:
+        return f"{self.per_second():.0f} renders/s · avg {self.avg_ms():.1f} ms · max {self.max_ms():.1f} ms · total {self.total}"
+
+
+class RenderScheduler(QObject):
+    """
+    Coalesces render requests (resize, splitter drag, zoom, selection) into at
+    most one render per frame. While requests keep arriving flagged as
+    interactive, renders use the fast path; once they stop for `settle_ms`,
+    one smooth render runs.
+    """
+
+    rendered = Signal(bool, float)  # smooth, seconds
+
+    def __init__(self, render: Callable[[bool], None], frame_ms: int = 16, settle_ms: int = 150, parent=None):
+        super().__init__(parent)
+        self._render = render
+        self.stats = RenderStats()
+        self._interacting = False
+
+        self._frame = QTimer(self)
+        self._frame.setSingleShot(True)
+        self._frame.setInterval(frame_ms)
+        self._frame.timeout.connect(self._on_frame)
+
+        self._settle = QTimer(self)
+        self._settle.setSingleShot(True)
+        self._settle.setInterval(settle_ms)
+        self._settle.timeout.connect(self._on_settle)
+
+    def request(self, interactive: bool = False) -> None:
+        if interactive:
+            self._interacting = True
+            self._settle.start()  # restarts the countdown
+        if not self._frame.isActive():
+            self._frame.start()
+
+    def _on_frame(self) -> None:
+        self._run(not self._interacting)
+
+    def _on_settle(self) -> None:
+        self._interacting = False
+        self._frame.stop()
+        self._run(True)
+
+    def _run(self, smooth: bool) -> None:
+        t0 = time.perf_counter()
+        self._render(smooth)
+        dt = time.perf_counter() - t0
+        self.stats.record(dt)
+        self.rendered.emit(smooth, dt)
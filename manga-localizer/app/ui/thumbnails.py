@@ -0,0 +1,51 @@
+from __future__ import annotations
+import threading
+from pathlib import Path
+from typing import Set
+
+from PySide6.QtCore import QObject, Signal
+
+from app.core.thumbs import ThumbnailStore
+
+
+class ThumbnailLoader(QObject):
+    """Qt front for ThumbnailStore: cache hits are answered at once, misses go to the process pool."""
+
+    ready = Signal(str, str)  # source path, thumbnail path
+
+    def __init__(self, store: ThumbnailStore, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def request(self, src: Path) -> None:
+        key = str(src)
+        with self._lock:
+            if key in self._pending:
+                return
+        cached, dst = self.store.lookup(src)
+        if cached is not None:
+            self.ready.emit(key, str(cached))
+            return
+        if dst is None:
+            return
+        with self._lock:
+            self._pending.add(key)
+        fut = self.store.generate(src, dst)
+        fut.add_done_callback(lambda f, key=key: self._on_done(key, f))
+
+    def _on_done(self, key: str, fut) -> None:
+        # Executor callback thread: the signal is queued to the GUI thread.
+        with self._lock:
+            self._pending.discard(key)
+        if fut.cancelled() or fut.exception() is not None:
+            return
+        self.ready.emit(key, fut.result())
+
+    def cancel_pending(self) -> None:
+        with self._lock:
+            self._pending.clear()
+
+    def shutdown(self) -> None:
+        self.store.shutdown()
@@ -0,0 +1,86 @@
+"""
+Opening a CBZ in place vs extracting it first.
+
+    python -m benchmarks.bench_archive --pages 300 --todo 5
+
+Builds a chapter archive of synthetic pages (JPEG, stored, like most CBZs)
+and times: listing its pages from the central directory against extracting
+the whole archive, reading one page for a preview, and staging only the
+`--todo` pages an incremental run would send to the engine.
+"""
+from __future__ import annotations
+import argparse
+import io
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.archive import close_archives, list_archive_pages, read_page  # noqa: E402
+from app.core.staging import make_staging_dir, remove_staging_dir  # noqa: E402
+
+
+def make_archive(path: Path, pages: int, width: int = 1100, height: int = 1600) -> None:
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(0)
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as zf:
+        for i in range(1, pages + 1):
+            img = np.full((height, width), 235, np.uint8)
+            img[rng.integers(0, height, 400), :] = 30  # line work, so pages don't compress to nothing
+            img[:, rng.integers(0, width, 200)] = 60
+            buf = io.BytesIO()
+            Image.fromarray(img).convert("RGB").save(buf, "JPEG", quality=88)
+            zf.writestr(f"Chapter 01/{i:04d}.jpg", buf.getvalue())
+
+
+def timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=300)
+    ap.add_argument("--todo", type=int, default=5, help="pages an incremental run has left to do")
+    ns = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cbz = Path(tmp) / "chapter.cbz"
+        make_archive(cbz, ns.pages)
+        mb = cbz.stat().st_size / 2**20
+
+        extracted = Path(tmp) / "extracted"
+        t_extract = timed(lambda: zipfile.ZipFile(cbz).extractall(extracted))
+        shutil.rmtree(extracted)
+
+        pages = []
+        t_list = timed(lambda: pages.extend(list_archive_pages(cbz)))
+        assert len(pages) == ns.pages
+        t_first = timed(lambda: read_page(pages[0]))
+        t_next = timed(lambda: read_page(pages[len(pages) // 2]))  # archive already open and mapped
+
+        todo = pages[-ns.todo:]
+        stage = []
+        t_stage = timed(lambda: stage.append(make_staging_dir(todo, base=Path(tmp))))
+        staged = sum(p.stat().st_size for p in stage[0].iterdir())
+        remove_staging_dir(stage[0])
+        close_archives()  # release the mapping before the directory is deleted
+
+    print(f"{ns.pages} pages, {mb:.1f} MB archive")
+    print(f"extract everything:       {t_extract * 1000:8.1f} ms  ({mb:.1f} MB written)")
+    print(f"list pages in place:      {t_list * 1000:8.1f} ms")
+    print(f"read a page (first open): {t_first * 1000:8.1f} ms")
+    print(f"read a page (cached):     {t_next * 1000:8.1f} ms")
+    print(f"stage {ns.todo} pages to run:     {t_stage * 1000:8.1f} ms  ({staged / 2**20:.1f} MB written)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
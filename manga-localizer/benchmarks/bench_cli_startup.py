@@ -0,0 +1,84 @@
+"""
+Cold-start budget for the headless batch entry point.
+
+    python -m benchmarks.bench_cli_startup --budget 1.0
+
+Times a real `python -m app batch --backend stub` run over a one-page folder
+in fresh interpreters (settings isolated in a temporary HOME), so everything
+the batch path imports lazily, engine start-up included, is on the clock.
+The same run is repeated under `-X importtime` to check that it never loads
+Qt. Exits non-zero when the median run exceeds the budget or Qt shows up;
+tests/test_cli_startup.py runs the same measurement under pytest.
+"""
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+QT_MODULES = ("PySide6", "shiboken6", "qdarktheme")
+BUDGET_S = 1.0
+
+
+def make_folder(path: Path) -> None:
+    from PIL import Image
+
+    path.mkdir(parents=True)
+    Image.new("RGB", (800, 1200), (255, 255, 255)).save(path / "001.png")
+
+
+def batch_cmd(src: Path, out: Path, *py_flags: str):
+    return [sys.executable, *py_flags, "-m", "app", "batch", "--backend", "stub", "-q", str(src), "-o", str(out)]
+
+
+def measure(repeat: int = 7) -> Tuple[float, float, List[str]]:
+    """Median seconds for `python -c pass` and for the batch run, and the Qt modules the batch run imported."""
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "chapter"
+        make_folder(src)
+        env = dict(os.environ, HOME=str(Path(tmp) / "home"), USERPROFILE=str(Path(tmp) / "home"))
+
+        def wall(cmd) -> float:
+            t0 = time.perf_counter()
+            subprocess.run(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            return time.perf_counter() - t0
+
+        bare = statistics.median(wall([sys.executable, "-c", "pass"]) for _ in range(repeat))
+        # A fresh output folder each time: the run must really plan and process the page.
+        batch = statistics.median(wall(batch_cmd(src, Path(tmp) / f"out{i}")) for i in range(repeat))
+        trace = subprocess.run(batch_cmd(src, Path(tmp) / "out-trace", "-X", "importtime"), cwd=ROOT, env=env,
+                               capture_output=True, text=True, check=True).stderr
+    qt = sorted({line.rsplit("|", 1)[-1].strip().split(".")[0] for line in trace.splitlines()
+                 if line.startswith("import time:")} & set(QT_MODULES))
+    return bare, batch, qt
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--budget", type=float, default=BUDGET_S, help="max median seconds for a one-page stub batch run")
+    ap.add_argument("--repeat", type=int, default=7)
+    ns = ap.parse_args()
+
+    bare, batch, qt = measure(ns.repeat)
+    print(f"python -c pass              : {bare * 1e3:7.1f} ms")
+    print(f"one-page stub batch run     : {batch * 1e3:7.1f} ms  (budget {ns.budget * 1e3:.0f} ms)")
+    print(f"Qt modules on the batch path: {', '.join(qt) or 'none'}")
+
+    ok = True
+    if batch > ns.budget:
+        print("FAIL: batch cold start is over budget")
+        ok = False
+    if qt:
+        print("FAIL: the batch path imports Qt")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+"""
+Time-to-first-paint budget for the GUI.
+
+    python -m benchmarks.bench_gui_startup --budget 1.5 --repeat 5
+
+Starts `python -m app` in fresh interpreters with the offscreen Qt platform
+and a throw-away home directory. The app prints its start-up phases as JSON
+(see app.main.PROBE_ENV) and quits once the deferred start-up work is done.
+Exits non-zero when the median time to first paint exceeds the budget;
+tests/test_gui_startup.py runs the same measurement under pytest.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.main import PROBE_ENV  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+BUDGET_S = 1.5
+
+
+def probe(home: Path, timeout: float) -> dict:
+    env = {**os.environ, PROBE_ENV: "1", "QT_QPA_PLATFORM": "offscreen", "HOME": str(home), "USERPROFILE": str(home)}
+    proc = subprocess.run([sys.executable, "-m", "app"], cwd=ROOT, env=env, capture_output=True, text=True,
+                          timeout=timeout, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def measure(repeat: int = 5, timeout: float = 60.0) -> List[dict]:
+    """Probe results of `repeat` start-ups, after one warm-up run."""
+    with tempfile.TemporaryDirectory() as home:
+        probe(Path(home), timeout)  # first run writes settings and warms the OS file cache
+        return [probe(Path(home), timeout) for _ in range(repeat)]
+
+
+def first_paint(runs: List[dict]) -> float:
+    """Median seconds to first paint."""
+    return statistics.median(r["at_ms"]["first paint"] for r in runs) / 1e3
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--budget", type=float, default=BUDGET_S, help="max median seconds to first paint")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--timeout", type=float, default=60.0)
+    ns = ap.parse_args()
+
+    runs = measure(ns.repeat, ns.timeout)
+    phases = list(runs[0]["phases_ms"])
+    for name in phases:
+        ms = statistics.median(r["phases_ms"][name] for r in runs)
+        print(f"  {name:<22} {ms:7.1f} ms")
+    t = first_paint(runs)
+    print(f"first paint: {t * 1e3:.1f} ms (budget {ns.budget * 1e3:.0f} ms)")
+    if t > ns.budget:
+        print("FAIL: time to first paint is over budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
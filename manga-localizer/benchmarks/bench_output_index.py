@@ -0,0 +1,68 @@
+"""
+Progress-badge cost: the old per-page `.exists()` loop vs OutputIndex.
+
+    python -m benchmarks.bench_output_index --pages 1000 --repeat 200
+
+Point `--dir` at a folder on a network share to see the NAS case.
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.output_index import OutputIndex  # noqa: E402
+
+
+def stat_loop(out_dir: Path, names) -> int:
+    # What _update_progress_badge used to do on every selection/resize.
+    return sum(1 for n in names if (out_dir / n).exists())
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=1000)
+    ap.add_argument("--repeat", type=int, default=200)
+    ap.add_argument("--dir", default="", help="parent folder for the synthetic output dir")
+    ns = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=ns.dir or None) as tmp:
+        out_dir = Path(tmp)
+        names = [f"{i:05d}.png" for i in range(ns.pages)]
+        for n in names[: ns.pages * 3 // 4]:
+            (out_dir / n).write_bytes(b"x")
+
+        t0 = time.perf_counter()
+        for _ in range(ns.repeat):
+            done_loop = stat_loop(out_dir, names)
+        loop_s = (time.perf_counter() - t0) / ns.repeat
+
+        t0 = time.perf_counter()
+        idx = OutputIndex(out_dir)
+        idx.set_expected(names)
+        build_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for _ in range(ns.repeat):
+            done_idx = idx.done
+        lookup_s = (time.perf_counter() - t0) / ns.repeat
+
+        (out_dir / names[-1]).write_bytes(b"x")
+        t0 = time.perf_counter()
+        idx.sync()
+        sync_s = time.perf_counter() - t0
+
+        assert done_idx == done_loop, (done_idx, done_loop)
+        print(f"pages={ns.pages}")
+        print(f"  per-page exists() loop : {loop_s * 1e3:9.3f} ms per badge update")
+        print(f"  OutputIndex build      : {build_s * 1e3:9.3f} ms (once per folder)")
+        print(f"  OutputIndex badge      : {lookup_s * 1e6:9.3f} us per badge update")
+        print(f"  OutputIndex sync       : {sync_s * 1e3:9.3f} ms per change notification")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,74 @@
+"""
+Chapter packaging throughput: re-encode output pages and stream them into a CBZ.
+
+    python -m benchmarks.bench_package --pages 200 --format webp --quality 85
+
+Generates a chapter of synthetic 1100x1600 PNG pages (flat tones, line work
+and lettering, so encoders see something like real output) and packs it
+with one encoder process and with one per core.
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import PackageConfig  # noqa: E402
+from app.core.packaging import Packager  # noqa: E402
+
+
+def make_page(path: Path, seed: int, width: int = 1100, height: int = 1600) -> None:
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    img = np.full((height, width), 255, np.uint8)
+    for _ in range(4):  # panels with screentone-like gradients
+        x0, y0 = int(rng.integers(0, width // 2)), int(rng.integers(0, height // 2))
+        x1, y1 = x0 + int(rng.integers(200, width // 2)), y0 + int(rng.integers(200, height // 2))
+        img[y0:y1, x0:x1] = np.linspace(90, 230, x1 - x0, dtype=np.float32)[None, :].astype(np.uint8)
+        img[y0:y0 + 4, x0:x1] = img[y1 - 4:y1, x0:x1] = 0
+    for _ in range(300):  # line work
+        x, y = int(rng.integers(0, width - 60)), int(rng.integers(0, height - 3))
+        img[y:y + 2, x:x + int(rng.integers(10, 60))] = 0
+    for _ in range(6):  # lettering
+        bx, by = int(rng.integers(0, width - 260)), int(rng.integers(0, height - 160))
+        img[by:by + 150, bx:bx + 250] = 255
+        for row in range(by + 20, by + 130, 22):
+            img[row:row + 12, bx + 20:bx + 230] = rng.integers(0, 60, (12, 210), dtype=np.uint8)
+    Image.fromarray(img).convert("RGB").save(path)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=200)
+    ap.add_argument("--format", default="webp", choices=["webp", "jpeg", "png", "keep"])
+    ap.add_argument("--quality", type=int, default=85)
+    ns = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "chapter"
+        out.mkdir()
+        names = [f"{i:04d}.png" for i in range(1, ns.pages + 1)]
+        for i, name in enumerate(names):
+            make_page(out / name, i)
+
+        cores = os.cpu_count() or 1
+        print(f"{ns.pages} pages -> {ns.format} q{ns.quality}")
+        print(f"{'workers':>7} {'seconds':>8} {'pages/s':>8} {'in MB':>8} {'out MB':>8}")
+        for workers in sorted({1, cores}):
+            package = PackageConfig(enabled=True, format=ns.format, quality=ns.quality, workers=workers)
+            result = Packager(out, names, package, ready=names).close()
+            with zipfile.ZipFile(result.archive) as zf:
+                assert len(zf.namelist()) == ns.pages
+            print(f"{workers:>7} {result.seconds:>8.2f} {result.pages / result.seconds:>8.1f} "
+                  f"{result.input_bytes / 2**20:>8.1f} {result.archive_bytes / 2**20:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,62 @@
+"""
+Page search cost per keystroke: the old lowercase-every-row loop vs SearchIndex.
+
+    python -m benchmarks.bench_search --pages 10000
+
+One frame at 60 Hz is 16.7 ms.
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.page_search import SearchIndex  # noqa: E402
+from app.core.pages import natural_key  # noqa: E402
+
+QUERIES = ["c12", "ch 40 p 7", "40-7", "leveling", "slvl", "leveling 42", "nothing"]
+
+
+def old_filter(names, text: str) -> int:
+    # What _apply_search_filter used to do (minus the setHidden calls).
+    q = text.strip().lower()
+    return sum(1 for n in names if q in n.lower())
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=10000)
+    ap.add_argument("--repeat", type=int, default=20)
+    ns = ap.parse_args()
+
+    per_ch = 100
+    names = [f"Solo Leveling c{c}_{p}.png" for c in range(1, ns.pages // per_ch + 1) for p in range(1, per_ch + 1)]
+
+    t0 = time.perf_counter()
+    names.sort(key=natural_key)
+    sort_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    idx = SearchIndex(names)
+    build_s = time.perf_counter() - t0
+
+    print(f"pages={len(names)}  natural sort {sort_s * 1e3:.1f} ms  index build {build_s * 1e3:.1f} ms (once per folder, on the scan thread)")
+    for q in QUERIES:
+        t0 = time.perf_counter()
+        for _ in range(ns.repeat):
+            old_filter(names, q)
+        old_s = (time.perf_counter() - t0) / ns.repeat
+
+        t0 = time.perf_counter()
+        for _ in range(ns.repeat):
+            idx._last = ("", [])  # measure a fresh query, not the repeat cache
+            rows = idx.search(q)
+        new_s = (time.perf_counter() - t0) / ns.repeat
+        print(f"  {q!r:16} old loop {old_s * 1e3:7.2f} ms   index {new_s * 1e3:7.2f} ms   hits {len(rows)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
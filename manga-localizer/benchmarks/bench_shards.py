@@ -0,0 +1,64 @@
+"""
+Pages/minute vs shard count, using the stub engine (no models needed).
+
+    python -m benchmarks.bench_shards --pages 48 --work 0.5 --max-shards 8
+
+Each stub page burns `--work` seconds of CPU, so the numbers show how well
+sharding uses the cores of this machine.
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import EngineConfig  # noqa: E402
+from app.core.mit_runner import execute_plan, make_engine_clients, prepare_run  # noqa: E402
+from app.core.sharding import cpu_count  # noqa: E402
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=48)
+    ap.add_argument("--work", type=float, default=0.5, help="CPU seconds per page")
+    ap.add_argument("--max-shards", type=int, default=cpu_count())
+    ns = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "in"
+        src.mkdir()
+        for i in range(ns.pages):
+            (src / f"{i:04d}.png").write_bytes(b"\x89PNG stub page %d" % i)
+
+        print(f"{'shards':>6} {'seconds':>8} {'pages/min':>10} {'speedup':>8}")
+        base = None
+        n = 1
+        while n <= ns.max_shards:
+            cfg = EngineConfig(engine_backend="stub", incremental=False, verbose=False, shards=n)
+            clients = make_engine_clients(cfg)
+            for c in clients:
+                c.extra_args = ["--stub-delay", str(ns.work), "--stub-cpu"]
+                c.start()  # exclude worker spawn from the measurement
+
+            plan = prepare_run(cfg, src, Path(tmp) / f"out{n}")
+            t0 = time.perf_counter()
+            code = execute_plan(cfg, plan, on_log=lambda _l: None, clients=clients)
+            dt = time.perf_counter() - t0
+            plan.finish()
+            for c in clients:
+                c.shutdown()
+            if code != 0:
+                print(f"shards={n}: engine exit code {code}")
+                return code
+
+            base = base or dt
+            print(f"{n:>6} {dt:>8.2f} {ns.pages / dt * 60:>10.1f} {base / dt:>7.2f}x")
+            n *= 2
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,91 @@
+"""
+Re-typesetting cost with the stage cache, using the stub engine.
+
+    python -m benchmarks.bench_stage_cache --pages 12 --work 1.0
+
+Runs a chapter once, edits the `render` section of the engine config and
+runs it again. The stub spends `--work / 5` seconds per stage, so with the
+cache the second run should only pay for rendering. A translator change
+is run last to show that it invalidates translation and everything after it.
+Exits non-zero if the render-only rerun is not at least twice as fast.
+"""
+from __future__ import annotations
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import EngineConfig  # noqa: E402
+from app.core.engine_client import EngineClient  # noqa: E402
+from app.core.mit_runner import execute_plan, prepare_run  # noqa: E402
+
+MIT_CONFIG = {
+    "render": {"alignment": "center", "font_size_offset": 2, "line_spacing": 0},
+    "translator": {"translator": "openai", "target_lang": "ENG"},
+    "ocr": {"ocr": "48px"},
+    "inpainter": {"inpainter": "lama_large", "inpainting_size": 4096},
+    "kernel_size": 7,
+    "mask_dilation_offset": 30,
+}
+
+
+def run(cfg: EngineConfig, client: EngineClient, src: Path, out: Path) -> "tuple[float, str]":
+    lines = []
+    plan = prepare_run(cfg, src, out)
+    t0 = time.perf_counter()
+    code = execute_plan(cfg, plan, on_log=lines.append, clients=[client])
+    dt = time.perf_counter() - t0
+    plan.finish()
+    if code != 0:
+        raise SystemExit(f"engine exit code {code}")
+    stats = next((line for line in reversed(lines) if line.startswith("Stage cache:")), "")
+    return dt, stats
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=12)
+    ap.add_argument("--work", type=float, default=1.0, help="simulated seconds per page for the full pipeline")
+    ns = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "in"
+        src.mkdir()
+        for i in range(ns.pages):
+            (src / f"{i:04d}.png").write_bytes(b"\x89PNG stub page %d" % i)
+        config = Path(tmp) / "mit-config.json"
+        config.write_text(json.dumps(MIT_CONFIG), encoding="utf-8")
+
+        cfg = EngineConfig(engine_backend="stub", config_file=str(config), verbose=False, shards=1)
+        client = EngineClient(cfg.python_exe, engine="stub", extra_args=[
+            "--stub-delay", str(ns.work), "--stage-cache", str(Path(tmp) / "cache")])
+        client.start()  # exclude worker spawn from the measurement
+        try:
+            cold, stats = run(cfg, client, src, Path(tmp) / "out")
+            print(f"full pipeline:      {cold / ns.pages:6.3f} s/page  ({stats})")
+
+            MIT_CONFIG["render"]["font_size_offset"] += 2
+            config.write_text(json.dumps(MIT_CONFIG), encoding="utf-8")
+            warm, stats = run(cfg, client, src, Path(tmp) / "out")
+            print(f"render change:      {warm / ns.pages:6.3f} s/page  ({stats})")
+
+            MIT_CONFIG["translator"]["target_lang"] = "FRA"
+            config.write_text(json.dumps(MIT_CONFIG), encoding="utf-8")
+            dt, stats = run(cfg, client, src, Path(tmp) / "out")
+            print(f"translator change:  {dt / ns.pages:6.3f} s/page  ({stats})")
+        finally:
+            client.shutdown()
+
+    print(f"render-only speedup: {cold / warm:.1f}x")
+    if cold / warm < 2:
+        print("FAIL: render-only rerun did not reuse the cached stages")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
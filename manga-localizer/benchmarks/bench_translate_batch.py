@@ -0,0 +1,67 @@
+"""
+Translation throughput against the local Responses stand-in: one request per
+batch (the old behaviour) vs token-budgeted chunks sent concurrently.
+
+    python -m benchmarks.bench_translate_batch --regions 400 --fail-429 0.1 --drop 0.05
+
+Needs the `openai` package; no network access or API key is used.
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.engines.translate.openai_translate import BatchLimits, OpenAITranslator, RegionText  # noqa: E402
+from benchmarks.responses_stub import StubOptions, StubServer, fake_translation  # noqa: E402
+
+LINES = ["ちょっと待って！", "お前は誰だ？", "ドドドド", "先輩、おはようございます！", "まさか…そんなはずは…"]
+
+
+def make_regions(n: int):
+    return [RegionText(f"p{i // 12:03d}-{i % 12}", LINES[i % len(LINES)] * (1 + i % 3)) for i in range(n)]
+
+
+def run(label: str, regions, opts: StubOptions, limits: BatchLimits) -> None:
+    with StubServer(opts) as srv:
+        tr = OpenAITranslator("stub", limits=limits, base_url=srv.base_url, api_key="stub")
+        t0 = time.perf_counter()
+        out = tr.translate_regions(regions)
+        dt = time.perf_counter() - t0
+        c = srv.counters
+    good = sum(1 for r, t in zip(regions, out) if t == fake_translation(r.region_id, r.jp))
+    print(
+        f"  {label:28} {dt:6.2f}s  {len(regions) / dt:7.1f} regions/s  ok {good}/{len(regions)}  "
+        f"http {c.requests} (429: {c.rate_limited}, 5xx: {c.errors}, dropped ids: {c.dropped_ids})"
+    )
+    print(f"  {'':28} {tr.stats.summary()}")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--regions", type=int, default=400)
+    ap.add_argument("--latency", type=float, default=0.2, help="stub seconds per request")
+    ap.add_argument("--per-token", type=float, default=0.002, help="stub seconds per output token")
+    ap.add_argument("--fail-429", type=float, default=0.0)
+    ap.add_argument("--fail-5xx", type=float, default=0.0)
+    ap.add_argument("--drop", type=float, default=0.0)
+    ap.add_argument("--rpm", type=int, default=0)
+    ap.add_argument("--tpm", type=int, default=0)
+    ns = ap.parse_args()
+
+    regions = make_regions(ns.regions)
+    opts = StubOptions(ns.latency, ns.per_token, ns.fail_429, ns.fail_5xx, ns.drop, retry_after=0.05)
+    fast_retry = dict(backoff_base=0.05, rpm=ns.rpm, tpm=ns.tpm)
+    print(f"regions={len(regions)}")
+    run("single request", regions, opts,
+        BatchLimits(chunk_tokens=10**9, chunk_items=10**9, concurrency=1, **fast_retry))
+    for conc in (1, 4, 8):
+        run(f"chunked, concurrency {conc}", regions, opts,
+            BatchLimits(chunk_tokens=400, chunk_items=20, concurrency=conc, **fast_retry))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
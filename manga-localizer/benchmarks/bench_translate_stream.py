@@ -0,0 +1,71 @@
+"""
+Time to first translated region and total latency, buffered vs streaming,
+against the local Responses stand-in.
+
+    python -m benchmarks.bench_translate_stream --regions 120 --cut 0.2
+
+Needs the `openai` package; no network access or API key is used.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.engines.translate.openai_translate import BatchLimits, OpenAITranslator  # noqa: E402
+from benchmarks.bench_translate_batch import make_regions  # noqa: E402
+from benchmarks.responses_stub import StubOptions, StubServer, fake_translation  # noqa: E402
+
+
+async def buffered(tr: OpenAITranslator, regions):
+    t0 = time.perf_counter()
+    out = await tr.translate_regions_async(regions)
+    total = time.perf_counter() - t0
+    # Nothing is usable before the whole batch returns.
+    return total, total, dict(zip((r.region_id for r in regions), out))
+
+
+async def streamed(tr: OpenAITranslator, regions):
+    t0 = time.perf_counter()
+    first = None
+    got = {}
+    async for rid, text in tr.translate_regions_stream(regions):
+        if first is None:
+            first = time.perf_counter() - t0
+        got[rid] = text
+    return first or 0.0, time.perf_counter() - t0, got
+
+
+def run(label: str, fn, regions, opts: StubOptions, limits: BatchLimits) -> None:
+    with StubServer(opts) as srv:
+        tr = OpenAITranslator("stub", limits=limits, base_url=srv.base_url, api_key="stub")
+        first, total, got = asyncio.run(fn(tr, regions))
+    ok = sum(1 for r in regions if got.get(r.region_id) == fake_translation(r.region_id, r.jp))
+    print(f"  {label:10} first region {first * 1e3:8.1f} ms   total {total * 1e3:8.1f} ms   ok {ok}/{len(regions)}")
+    print(f"  {'':10} {tr.stats.summary()}")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--regions", type=int, default=120)
+    ap.add_argument("--latency", type=float, default=0.3, help="stub seconds before the first token")
+    ap.add_argument("--per-token", type=float, default=0.004, help="stub seconds per output token")
+    ap.add_argument("--concurrency", type=int, default=2)
+    ap.add_argument("--drop", type=float, default=0.0)
+    ap.add_argument("--cut", type=float, default=0.0, help="fraction of streams broken halfway")
+    ns = ap.parse_args()
+
+    regions = make_regions(ns.regions)
+    opts = StubOptions(ns.latency, ns.per_token, drop=ns.drop, cut=ns.cut)
+    limits = BatchLimits(chunk_tokens=600, chunk_items=30, concurrency=ns.concurrency, backoff_base=0.05)
+    print(f"regions={len(regions)}")
+    run("buffered", buffered, regions, opts, limits)
+    run("streaming", streamed, regions, opts, limits)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,119 @@
+"""
+Peak memory and wall time of a long-strip page, whole vs sliced into tiles.
+
+    python -m benchmarks.bench_webtoon --height 30000 --width 800 --tile 4096
+
+Each mode runs in a fresh interpreter so its peak RSS can be read on exit.
+No models are needed: the engine is stood in for by a pass that, like
+detection / inpainting, keeps a few float32 copies of the image it is given,
+so memory scales with the pixels per engine call. "sliced" includes finding
+the gutters, writing the tiles and stitching the result back together.
+"""
+from __future__ import annotations
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.webtoon import slice_page, stitch_page  # noqa: E402
+
+
+def make_strip(path: Path, width: int, height: int, seed: int = 0) -> None:
+    """White gutters between panels of shaded art with dark line work and text-like blocks."""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    img = np.full((height, width, 3), 255, np.uint8)
+    y = 80
+    while y < height - 600:
+        ph = min(int(rng.integers(700, 2200)), height - y - 80)
+        ramp = np.linspace(rng.integers(60, 200), rng.integers(60, 200), ph, dtype=np.float32)[:, None]
+        panel = np.repeat((ramp + np.linspace(0, 40, width - 80)[None, :]).astype(np.uint8)[:, :, None], 3, axis=2)
+        for _ in range(int(rng.integers(20, 60))):  # strokes
+            x0, y0 = int(rng.integers(0, width - 120)), int(rng.integers(0, ph - 8))
+            panel[y0:y0 + int(rng.integers(2, 6)), x0:x0 + int(rng.integers(40, 120))] = 20
+        for _ in range(int(rng.integers(1, 4))):  # "bubbles" with text rows
+            bx, by = int(rng.integers(10, width - 330)), int(rng.integers(10, max(11, ph - 250)))
+            panel[by:by + 220, bx:bx + 300] = 250
+            for row in range(by + 30, by + 190, 28):
+                panel[row:row + 14, bx + 30:bx + 270] = rng.integers(0, 80, (14, 240, 1), dtype=np.uint8)
+        img[y:y + ph, 40:width - 40] = panel
+        y += ph + int(rng.integers(80, 400))
+    Image.fromarray(img).save(path, compress_level=1)
+
+
+def fake_engine(src: Path, dst: Path) -> None:
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(src) as im:
+        a = np.asarray(im.convert("RGB"), dtype=np.float32) / 255.0
+    mask = (a.mean(axis=2, keepdims=True) < 0.5).astype(np.float32)
+    blurred = np.cumsum(np.cumsum(a, axis=0), axis=1)  # stands in for the network's working tensors
+    out = a * (1 - mask) + mask * (blurred / blurred.max())
+    Image.fromarray((out * 255).astype(np.uint8)).save(dst, compress_level=1)
+
+
+def child(mode: str, page: Path, work: Path, tile: int, overlap: int) -> dict:
+    t0 = time.perf_counter()
+    out = work / f"out-{mode}.png"
+    if mode == "whole":
+        fake_engine(page, out)
+        tiles = 1
+    else:
+        tiles_dir = work / "tiles"
+        sliced = slice_page(page, tiles_dir, tile, overlap)
+        done_dir = work / "tiles-out"
+        done_dir.mkdir(exist_ok=True)
+        for p in sliced.tile_paths(tiles_dir):
+            fake_engine(p, done_dir / p.name)
+        stitch_page(sliced, done_dir, out)
+        tiles = len(sliced.tiles)
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+    return {"seconds": time.perf_counter() - t0, "peak_rss_mb": rss_kb / 1024, "tiles": tiles}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--height", type=int, default=30000)
+    ap.add_argument("--width", type=int, default=800)
+    ap.add_argument("--tile", type=int, default=4096, help="max tile height (EngineConfig.slice_height)")
+    ap.add_argument("--overlap", type=int, default=128)
+    ap.add_argument("--child", choices=["whole", "sliced"], help=argparse.SUPPRESS)
+    ap.add_argument("--page", type=Path, help=argparse.SUPPRESS)
+    ap.add_argument("--work", type=Path, help=argparse.SUPPRESS)
+    ns = ap.parse_args()
+
+    if ns.child:
+        print(json.dumps(child(ns.child, ns.page, ns.work, ns.tile, ns.overlap)))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        page = Path(tmp) / "strip.png"
+        make_strip(page, ns.width, ns.height)
+        results = {}
+        for mode in ("whole", "sliced"):
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_webtoon", "--child", mode, "--page", str(page),
+                 "--work", tmp, "--tile", str(ns.tile), "--overlap", str(ns.overlap)],
+                cwd=Path(__file__).resolve().parents[1], capture_output=True, text=True, check=True,
+            )
+            results[mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    print(f"{ns.width}x{ns.height} strip, tiles of at most {ns.tile} rows")
+    print(f"{'mode':<8} {'tiles':>5} {'seconds':>8} {'peak RSS':>10}")
+    for mode, r in results.items():
+        print(f"{mode:<8} {r['tiles']:>5} {r['seconds']:>8.2f} {r['peak_rss_mb']:>7.0f} MB")
+    print(f"peak RSS: {results['sliced']['peak_rss_mb'] / results['whole']['peak_rss_mb']:.2f}x of whole")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
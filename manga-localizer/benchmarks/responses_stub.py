@@ -0,0 +1,242 @@
+"""
+Local stand-in for the OpenAI Responses endpoint (POST /v1/responses), for
+exercising OpenAITranslator without network access or API spend.
+
+    python -m benchmarks.responses_stub --port 8765 --fail-429 0.1 --drop 0.05
+
+then point the translator at base_url="http://127.0.0.1:8765/v1".
+
+Each "[id]" block of the input comes back as "[id]\\nEN<n>: <text>". Knobs
+simulate latency (fixed + per output token), 429s with Retry-After, 5xx and
+replies that silently drop some ids. Requests with "stream": true get
+server-sent events (response.output_text.delta ... response.completed),
+paced at the per-token rate.
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+_ID_LINE = re.compile(r"^\[(.+)\]$")
+
+
+@dataclass
+class StubOptions:
+    latency: float = 0.05          # seconds per request
+    per_token: float = 0.0005      # seconds per output token ("generation speed")
+    fail_429: float = 0.0          # fraction of requests answered 429
+    fail_5xx: float = 0.0          # fraction answered 500
+    drop: float = 0.0              # fraction of ids left out of a reply
+    cut: float = 0.0               # fraction of streams dropped halfway through
+    retry_after: float = 0.05
+    seed: Optional[int] = 0
+
+
+@dataclass
+class StubCounters:
+    requests: int = 0
+    ok: int = 0
+    rate_limited: int = 0
+    errors: int = 0
+    dropped_ids: int = 0
+    ids_seen: Dict[str, int] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+def parse_input(text: str) -> List[Tuple[str, str]]:
+    blocks: List[Tuple[str, str]] = []
+    for line in text.splitlines():
+        m = _ID_LINE.match(line.strip())
+        if m:
+            blocks.append((m.group(1), ""))
+        elif blocks:
+            rid, body = blocks[-1]
+            blocks[-1] = (rid, (body + "\n" + line).strip())
+    return blocks
+
+
+def fake_translation(rid: str, jp: str) -> str:
+    return f"EN{len(jp)}: {jp}"
+
+
+def response_body(text: str, input_tokens: int, output_tokens: int) -> dict:
+    return {
+        "id": f"resp_{random.getrandbits(48):012x}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": "completed",
+        "model": "stub",
+        "output": [
+            {
+                "id": "msg_stub",
+                "type": "message",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ],
+        "usage": {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+def make_handler(opts: StubOptions, counters: StubCounters, rng: random.Random):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args) -> None:  # keep benchmark output clean
+            pass
+
+        def _send(self, status: int, body: dict, headers: Optional[Dict[str, str]] = None) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            req = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.rstrip("/").endswith("/responses"):
+                self._send(404, {"error": {"message": "not found"}})
+                return
+            with counters.lock:
+                counters.requests += 1
+                roll = rng.random()
+            if roll < opts.fail_429:
+                with counters.lock:
+                    counters.rate_limited += 1
+                self._send(429, {"error": {"message": "rate limited", "type": "rate_limit"}},
+                           {"Retry-After": str(opts.retry_after)})
+                return
+            if roll < opts.fail_429 + opts.fail_5xx:
+                with counters.lock:
+                    counters.errors += 1
+                self._send(500, {"error": {"message": "stub server error"}})
+                return
+
+            self.respond(req)
+
+        def blocks_for(self, req: dict) -> Tuple[List[Tuple[str, str]], int]:
+            text = req.get("input") or ""
+            blocks = parse_input(text if isinstance(text, str) else json.dumps(text))
+            kept = []
+            with counters.lock:
+                for rid, jp in blocks:
+                    counters.ids_seen[rid] = counters.ids_seen.get(rid, 0) + 1
+                    if opts.drop and rng.random() < opts.drop:
+                        counters.dropped_ids += 1
+                        continue
+                    kept.append((rid, fake_translation(rid, jp)))
+            return kept, max(1, len(text) // 2)
+
+        def respond(self, req: dict) -> None:
+            kept, in_tokens = self.blocks_for(req)
+            out = "\n\n".join(f"[{rid}]\n{en}" for rid, en in kept)
+            out_tokens = max(1, len(out) // 4)
+            if req.get("stream"):
+                self.stream(out, in_tokens, out_tokens)
+            else:
+                time.sleep(opts.latency + out_tokens * opts.per_token)
+                self._send(200, response_body(out, in_tokens, out_tokens))
+            with counters.lock:
+                counters.ok += 1
+
+        def stream(self, out: str, in_tokens: int, out_tokens: int) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            seq = 0
+
+            def event(payload: dict) -> None:
+                nonlocal seq
+                payload["sequence_number"] = seq
+                seq += 1
+                self.wfile.write(f"event: {payload['type']}\ndata: {json.dumps(payload)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+            body = response_body(out, in_tokens, out_tokens)
+            event({"type": "response.created", "response": {**body, "status": "in_progress", "output": []}})
+            time.sleep(opts.latency)
+            step = 16  # characters per delta, ~4 tokens
+            with counters.lock:
+                cut_at = len(out) // 2 if rng.random() < opts.cut else None
+            for i in range(0, len(out), step):
+                if cut_at is not None and i >= cut_at:
+                    return  # connection closes without response.completed
+                piece = out[i:i + step]
+                time.sleep(max(1, len(piece) // 4) * opts.per_token)
+                event({"type": "response.output_text.delta", "item_id": "msg_stub", "output_index": 0,
+                       "content_index": 0, "delta": piece, "logprobs": []})
+            event({"type": "response.completed", "response": body})
+
+    return Handler
+
+
+class StubServer:
+    """Runs the stand-in on a background thread; use as a context manager."""
+
+    def __init__(self, opts: Optional[StubOptions] = None, host: str = "127.0.0.1", port: int = 0):
+        self.opts = opts or StubOptions()
+        self.counters = StubCounters()
+        rng = random.Random(self.opts.seed)
+        self.httpd = ThreadingHTTPServer((host, port), make_handler(self.opts, self.counters, rng))
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.05)
+    ap.add_argument("--per-token", type=float, default=0.0005)
+    ap.add_argument("--fail-429", type=float, default=0.0)
+    ap.add_argument("--fail-5xx", type=float, default=0.0)
+    ap.add_argument("--drop", type=float, default=0.0)
+    ns = ap.parse_args()
+    opts = StubOptions(ns.latency, ns.per_token, ns.fail_429, ns.fail_5xx, ns.drop)
+    srv = StubServer(opts, port=ns.port)
+    print(f"Responses stand-in on {srv.base_url} (Ctrl+C to stop)")
+    try:
+        srv.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
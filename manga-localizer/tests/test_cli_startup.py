@@ -0,0 +1,21 @@
+"""Cold-start budget for the headless batch path (see benchmarks/bench_cli_startup.py)."""
+import os
+import subprocess
+import sys
+
+from benchmarks import bench_cli_startup
+
+
+def test_batch_cold_start_within_budget_and_without_qt():
+    _bare, batch, qt = bench_cli_startup.measure(repeat=3)
+    assert qt == []
+    assert batch <= bench_cli_startup.BUDGET_S
+
+
+def test_stub_backend_without_persistent_engine(tmp_path):
+    src = tmp_path / "chapter"
+    bench_cli_startup.make_folder(src)
+    env = dict(os.environ, HOME=str(tmp_path / "home"), USERPROFILE=str(tmp_path / "home"))
+    cmd = bench_cli_startup.batch_cmd(src, tmp_path / "out") + ["--no-persistent"]
+    subprocess.run(cmd, cwd=bench_cli_startup.ROOT, env=env, check=True, capture_output=True)
+    assert (tmp_path / "out" / "chapter" / "001.png").is_file()
@@ -0,0 +1,20 @@
+"""Time-to-first-paint regression check (see benchmarks/bench_gui_startup.py)."""
+import pytest
+
+pytest.importorskip("PySide6.QtWidgets")
+
+from benchmarks import bench_gui_startup  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def runs():
+    return bench_gui_startup.measure(repeat=3)
+
+
+def test_first_paint_within_budget(runs):
+    assert bench_gui_startup.first_paint(runs) <= bench_gui_startup.BUDGET_S
+
+
+def test_run_modules_load_after_first_paint(runs):
+    at = runs[0]["at_ms"]
+    assert at["import run modules"] > at["first paint"]